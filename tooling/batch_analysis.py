@@ -0,0 +1,192 @@
+import argparse
+import contextlib
+import csv
+import dataclasses
+import glob
+import hashlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from empire_cache import open_atomic
+from empire_designs import load_empires
+from update_empire_analysis import REPORT_PLUGINS, run_report_plugins
+
+# Analyse vieler Designs-Dateien (z.B. von mehreren Spielern oder aus Sicherungen).
+# Jede Datei wird in einem eigenen Prozess geparst und erhält ihre eigenen Berichte;
+# danach werden alle Imperien zusammengeführt, inhaltsgleiche Imperien aus mehreren
+# Dateien nur einmal gezählt und die Berichte für den Gesamtbestand geschrieben.
+
+# === Eingaben ===
+
+def collect_input_files(paths, pattern="*.txt"):
+    """Dateien aus den Argumenten; Verzeichnisse werden nach `pattern` durchsucht. Doppelte entfallen."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, pattern))))
+        else:
+            files.append(path)
+    return list(dict.fromkeys(os.path.normpath(filepath) for filepath in files))
+
+def report_dir_for(filepath, output_dir):
+    """
+    Eigenes Berichtsverzeichnis pro Datei, z.B. batch_reports/spieler1_user_empire_designs_v3.4_1a2b3c4d/.
+    Der kurze Hash über den absoluten Pfad hält Dateien wie a/b_c.txt und a_b/c.txt auseinander.
+    """
+    relative = os.path.splitext(os.path.relpath(filepath))[0]
+    path_hash = hashlib.blake2b(os.path.abspath(filepath).encode('utf-8'), digest_size=4).hexdigest()
+    return os.path.join(output_dir, f"{relative.replace(os.sep, '_').lstrip('._') or 'input'}_{path_hash}")
+
+# === Pro Datei (im Worker-Prozess) ===
+
+def _plugins_into(directory, plugins):
+    return [(stage_name, generate_report, os.path.join(directory, output_filename))
+            for stage_name, generate_report, output_filename in plugins]
+
+def _run_reports_quietly(empires, directory, plugins):
+    """Führt die Berichte aus und gibt die Namen der fehlgeschlagenen zurück."""
+    # Die Berichte melden jede geschriebene Datei; bei vielen Dateien wäre das nur Rauschen
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        _, _, failed = run_report_plugins(empires, _plugins_into(directory, plugins))
+    return sorted(failed)
+
+def analyse_file(filepath, output_dir, plugins=REPORT_PLUGINS):
+    """
+    Parst eine Datei, schreibt ihre Berichte und gibt (Datei, Imperien, Sekunden, Fehler,
+    fehlgeschlagene Berichte) zurück.
+    """
+    start = time.perf_counter()
+    try:
+        empires = load_empires(filepath)
+        file_report_dir = report_dir_for(filepath, output_dir)
+        os.makedirs(file_report_dir, exist_ok=True)
+        failed = _run_reports_quietly(empires, file_report_dir, plugins)
+    except Exception as e:
+        return filepath, [], time.perf_counter() - start, str(e), []
+    return filepath, empires, time.perf_counter() - start, None, failed
+
+def _analyse_file_task(task):
+    return analyse_file(*task)
+
+# === Zusammenführen ===
+
+# Feldnamen je Modellklasse, ohne die Position in der Datei (dataclasses.fields() ist für jeden Aufruf zu teuer)
+_FIELD_NAMES = {}
+
+def _record_key(record):
+    if not dataclasses.is_dataclass(record):
+        return record
+    names = _FIELD_NAMES.get(type(record))
+    if names is None:
+        names = _FIELD_NAMES[type(record)] = tuple(field.name for field in dataclasses.fields(record)
+                                                    if field.name != 'index')
+    return tuple(_record_key(getattr(record, name)) for name in names)
+
+def content_key(empire):
+    """Hashbarer Schlüssel über den gesamten Inhalt eines Imperiums (ohne Position in der Datei)."""
+    return _record_key(empire)
+
+# Trennzeichen zwischen Key und Variantennummer, z.B. "The Galactic Papacy#2"
+VARIANT_SEPARATOR = "#"
+
+def merge_empires(results):
+    """
+    Führt die Imperien aller Dateien zusammen. Inhaltsgleiche Imperien werden nur einmal
+    übernommen; gleichnamige Imperien mit unterschiedlichem Inhalt bleiben getrennt und
+    erhalten ab der zweiten Variante (in der Reihenfolge ihres ersten Auftretens) den Key
+    "<Key>#2", "<Key>#3", ..., damit jeder Gesamtbericht sie unterscheiden kann.
+    Gibt (Imperien, Dateien je Imperium) zurück, sources[i] gehört zu merged[i].
+    """
+    merged = []
+    sources = []
+    positions = {}
+    variant_counts = {}
+    for filepath, empires, *_ in results:
+        for empire in empires:
+            identity = content_key(empire)
+            position = positions.get(identity)
+            if position is None:
+                position = positions[identity] = len(merged)
+                key = empire.key
+                if key is not None:
+                    variant = variant_counts[key] = variant_counts.get(key, 0) + 1
+                    if variant > 1:
+                        key = f"{key}{VARIANT_SEPARATOR}{variant}"
+                merged.append(dataclasses.replace(empire, index=position, key=key))
+                sources.append([])
+            sources[position].append(filepath)
+    return merged, sources
+
+def write_sources_csv(merged, sources, output_filepath):
+    """Schreibt, in welchen Dateien jedes Imperium (bzw. jede Variante) vorkommt: N;Reich;Dateien."""
+    rows = [(len(filepaths), empire.key, ";".join(sorted(filepaths))) for empire, filepaths in zip(merged, sources)]
+    with open_atomic(output_filepath, newline='', encoding='utf-8') as csvfile:
+        csv_writer = csv.writer(csvfile, delimiter=';')
+        csv_writer.writerow(['N', 'Reich', 'Dateien'])
+        csv_writer.writerows(sorted(rows, key=lambda row: str(row[1])))
+
+def run_batch(paths, output_dir="batch_reports", jobs=None, pattern="*.txt", plugins=REPORT_PLUGINS):
+    """
+    Analysiert alle Dateien parallel und schreibt Einzel- und Gesamtberichte.
+
+    Returns:
+        tuple: (results, merged, merged_failed) mit results = [(Datei, Imperien, Sekunden, Fehler,
+               fehlgeschlagene Berichte)], merged = Liste der de-duplizierten Imperien und
+               merged_failed = die fehlgeschlagenen Gesamtberichte.
+    """
+    files = collect_input_files(paths, pattern)
+    if not files:
+        raise FileNotFoundError(f"Keine Dateien gefunden in: {', '.join(paths)}")
+    jobs = jobs or os.cpu_count() or 1
+    tasks = [(filepath, output_dir, plugins) for filepath in files]
+    if jobs > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(files))) as executor:
+            results = list(executor.map(_analyse_file_task, tasks))
+    else:
+        results = [_analyse_file_task(task) for task in tasks]
+
+    merged, sources = merge_empires(results)
+    merged_dir = os.path.join(output_dir, "merged")
+    os.makedirs(merged_dir, exist_ok=True)
+    merged_failed = _run_reports_quietly(merged, merged_dir, plugins)
+    write_sources_csv(merged, sources, os.path.join(merged_dir, "empire_sources.csv"))
+    return results, merged, merged_failed
+
+# === Main Execution ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analysiert viele Designs-Dateien parallel und führt die Berichte zusammen.")
+    parser.add_argument("paths", nargs="+", help="Designs-Dateien oder Verzeichnisse")
+    parser.add_argument("-o", "--output-dir", default="batch_reports",
+                        help="Zielverzeichnis der Berichte (Standard: %(default)s)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Anzahl paralleler Prozesse (Standard: Anzahl der CPU-Kerne)")
+    parser.add_argument("--pattern", default="*.txt",
+                        help="Dateimuster innerhalb von Verzeichnissen (Standard: %(default)s)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        batch_results, merged_empires, merged_failed = run_batch(args.paths, args.output_dir, args.jobs, args.pattern)
+    except FileNotFoundError as e:
+        print(f"Fehler: {e}")
+        sys.exit(1)
+
+    total_empires = 0
+    failed_files = 0
+    for filepath, empires, seconds, error, failed in batch_results:
+        if error:
+            print(f"  {filepath}: Fehler: {error}")
+            failed_files += 1
+            continue
+        print(f"  {filepath}: {len(empires)} Imperien ({seconds * 1000:.1f} ms)")
+        total_empires += len(empires)
+        if failed:
+            print(f"    Fehlgeschlagene Berichte: {', '.join(failed)}")
+            failed_files += 1
+    if merged_failed:
+        print(f"  Gesamtberichte fehlgeschlagen: {', '.join(merged_failed)}")
+    print(f"{len(batch_results)} Dateien, {total_empires} Imperien, davon {len(merged_empires)} verschieden "
+          f"({time.perf_counter() - start:.2f} s). Berichte in: {args.output_dir}")
+    sys.exit(1 if failed_files or merged_failed else 0)
@@ -0,0 +1,265 @@
+import argparse
+import os
+import re
+import shutil
+import sys
+import tempfile
+
+from compact_designs import format_block
+from empire_designs import Node, Quoted, iter_top_level_block_offsets, parse_text
+from empire_offsets import decode_block
+
+# Deklarative Massen-Änderungen an der Designs-Datei in einem einzigen Durchlauf.
+# Regeln (eine pro Zeile bzw. pro -r):
+#   species.trait: trait_x -> trait_y             Wert umbenennen (auch anonyme Werte, z.B. civics)
+#   civics: civic_alt -> civic_neu where origin=origin_default
+#   set spawn_enabled=no where origin=origin_default and authority=auth_imperial
+#   set species.name_list="HUMAN1"
+# Unveränderte Blöcke (und alles zwischen den Blöcken) werden byte-genau übernommen,
+# nur betroffene Blöcke werden im Stil des Spiels neu geschrieben.
+
+_VALUE = r'"[^"]*"|[^\s"]+'
+_RENAME_RE = re.compile(
+    rf'^(?P<path>[\w.]+)\s*:\s*(?P<old>{_VALUE})\s*->\s*(?P<new>{_VALUE})(?:\s+where\s+(?P<where>.+))?$')
+_SET_RE = re.compile(
+    rf'^set\s+(?P<path>[\w.]+)\s*=\s*(?P<value>{_VALUE})(?:\s+where\s+(?P<where>.+))?$')
+_CONDITION_RE = re.compile(rf'^(?P<path>[\w.]+)\s*=\s*(?P<value>{_VALUE})$')
+
+_UTF8_BOM = b'\xef\xbb\xbf'
+
+# === Regeln ===
+
+def _parse_value(text):
+    """'"x"' -> Quoted('x'), sonst das unquotierte Wort."""
+    return Quoted(text[1:-1]) if text.startswith('"') else text
+
+def _parse_where(text):
+    conditions = []
+    if text:
+        for condition in re.split(r'\s+and\s+', text.strip()):
+            match = _CONDITION_RE.match(condition.strip())
+            if match is None:
+                raise ValueError(f"Ungültige Bedingung '{condition}'")
+            conditions.append((match['path'].split('.'), _parse_value(match['value'])))
+    return tuple(conditions)
+
+class Rule:
+    """Eine Änderungsregel: kind ist 'rename' oder 'set'."""
+    __slots__ = ('text', 'kind', 'path', 'old', 'new', 'conditions')
+
+    def __init__(self, text, kind, path, old, new, conditions):
+        self.text = text
+        self.kind = kind
+        self.path = path
+        self.old = old
+        self.new = new
+        self.conditions = conditions
+
+def parse_rule(text):
+    """Parst eine Regelzeile; löst bei ungültiger Syntax einen ValueError aus."""
+    text = text.strip()
+    match = _RENAME_RE.match(text)
+    if match:
+        return Rule(text, 'rename', match['path'].split('.'), _parse_value(match['old']),
+                    _parse_value(match['new']), _parse_where(match['where']))
+    match = _SET_RE.match(text)
+    if match:
+        return Rule(text, 'set', match['path'].split('.'), None, _parse_value(match['value']),
+                    _parse_where(match['where']))
+    raise ValueError(f"Ungültige Regel '{text}'")
+
+def read_rules_file(filepath):
+    """Liest Regeln aus einer Datei; leere Zeilen und Kommentare (#) werden übersprungen."""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return [parse_rule(line) for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+# === Anwenden auf einen Block ===
+
+def _parents(node, segments):
+    """Alle Nodes, die über `segments` (Schlüssel der Reihe nach) von `node` aus erreichbar sind."""
+    nodes = [node]
+    for segment in segments:
+        nodes = [value for current in nodes for key, value in current.entries
+                 if key == segment and isinstance(value, Node)]
+    return nodes
+
+def _path_values(node, path):
+    """Alle Skalarwerte unter `path`; zeigt der Pfad auf einen Block, dessen anonyme Werte."""
+    values = []
+    for parent in _parents(node, path[:-1]):
+        for key, value in parent.entries:
+            if key == path[-1]:
+                values.extend(value.values() if isinstance(value, Node) else (value,))
+    return values
+
+def _matches(node, conditions):
+    return all(value in _path_values(node, path) for path, value in conditions)
+
+def _rename(node, rule):
+    changes = 0
+    for parent in _parents(node, rule.path[:-1]):
+        for i, (key, value) in enumerate(parent.entries):
+            if key != rule.path[-1]:
+                continue
+            # Zeigt der Pfad auf einen Block (z.B. civics={ ... }), werden dessen anonyme Werte umbenannt
+            target, indexes = (value, range(len(value.entries))) if isinstance(value, Node) else (parent, (i,))
+            for j in indexes:
+                entry_key, entry_value = target.entries[j]
+                if isinstance(entry_value, Node) or entry_value != rule.old:
+                    continue
+                if target is value and entry_key is not None:
+                    continue
+                new = rule.new
+                if isinstance(entry_value, Quoted) and not isinstance(new, Quoted):
+                    new = Quoted(new) # Anführungszeichen des Originals beibehalten
+                target.entries[j] = (entry_key, new)
+                changes += 1
+    return changes
+
+def _set(node, rule):
+    changes = 0
+    parents = _parents(node, rule.path[:-1])
+    for parent in parents:
+        found = False
+        for i, (key, value) in enumerate(parent.entries):
+            if key == rule.path[-1]:
+                found = True
+                if isinstance(value, Node) or value != rule.new or type(value) is not type(rule.new):
+                    parent.entries[i] = (key, rule.new)
+                    changes += 1
+        if not found:
+            parent.entries.append((rule.path[-1], rule.new))
+            changes += 1
+    return changes
+
+def apply_rules(node, rules, counts):
+    """Wendet alle Regeln der Reihe nach auf den Node eines Imperiums an. True, wenn sich etwas geändert hat."""
+    changed = False
+    for rule_index, rule in enumerate(rules):
+        if not _matches(node, rule.conditions):
+            continue
+        changes = _rename(node, rule) if rule.kind == 'rename' else _set(node, rule)
+        if changes:
+            counts[rule_index][0] += changes
+            counts[rule_index][1] += 1
+            changed = True
+    return changed
+
+def edit_block(block, rules, counts):
+    """
+    Gibt den neu geschriebenen Block (bytes) zurück oder None, wenn keine Regel greift.
+    Ungültiges UTF-8 wird wie in empire_offsets.decode_block byte-genau durchgereicht.
+    """
+    block_text = decode_block(block)
+    root = parse_text(block_text)
+    edited = False
+    for _, value in root.entries:
+        if isinstance(value, Node) and apply_rules(value, rules, counts):
+            edited = True
+    if not edited:
+        return None
+    newline = '\r\n' if '\r\n' in block_text else '\n'
+    return newline.join(format_block(key, value, newline) for key, value in root.entries
+                        if isinstance(value, Node)).encode('utf-8', 'surrogateescape')
+
+# === Datei ===
+
+def bulk_edit_file(input_filepath, output_filepath, rules, dry_run=False):
+    """
+    Streamt die Designs-Datei einmal und wendet die Regeln an. Alles außer den betroffenen
+    Blöcken wird unverändert kopiert. Geschrieben wird über eine temporäre Datei, die per
+    shutil.move an ihren Platz verschoben wird (wie in empty_lines.py).
+
+    Returns:
+        tuple: (edited_blocks, counts) mit counts[i] = [Änderungen, Imperien] für rules[i]
+    """
+    counts = [[0, 0] for _ in rules]
+    edited_blocks = 0
+    temp_file_path = None
+    try:
+        with open(input_filepath, 'rb') as scanner, open(input_filepath, 'rb') as copier:
+            writer = None
+            if not dry_run:
+                writer = tempfile.NamedTemporaryFile(mode='wb', dir=os.path.dirname(output_filepath) or '.',
+                                                     prefix="." + os.path.basename(output_filepath) + "_tmp_",
+                                                     delete=False)
+                temp_file_path = writer.name
+            with writer or open(os.devnull, 'wb') as output:
+                copied_until = 0
+                for offset, block in iter_top_level_block_offsets(scanner):
+                    if offset == 0 and block.startswith(_UTF8_BOM):
+                        offset, block = len(_UTF8_BOM), block[len(_UTF8_BOM):]
+                    new_block = edit_block(block, rules, counts)
+                    if new_block is None:
+                        continue
+                    edited_blocks += 1
+                    # Alles seit dem letzten geänderten Block unverändert übernehmen
+                    copier.seek(copied_until)
+                    shutil.copyfileobj(_LimitedReader(copier, offset - copied_until), output)
+                    output.write(new_block)
+                    copied_until = offset + len(block)
+                copier.seek(copied_until)
+                shutil.copyfileobj(copier, output)
+        if not dry_run:
+            shutil.move(temp_file_path, output_filepath)
+            temp_file_path = None
+    finally:
+        if temp_file_path and os.path.exists(temp_file_path):
+            os.remove(temp_file_path)
+    return edited_blocks, counts
+
+class _LimitedReader:
+    """Liest höchstens `remaining` Bytes aus `reader` (für shutil.copyfileobj)."""
+
+    def __init__(self, reader, remaining):
+        self._reader = reader
+        self._remaining = remaining
+
+    def read(self, size=-1):
+        if size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._reader.read(size)
+        self._remaining -= len(data)
+        return data
+
+# === Main Execution ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Wendet Massen-Änderungen auf alle Imperien der Designs-Datei an.")
+    parser.add_argument("input", nargs="?", default="user_empire_designs_v3.4.txt",
+                        help="Pfad zur Designs-Datei (Standard: %(default)s)")
+    parser.add_argument("-r", "--rule", action="append", default=[],
+                        help="Regel, z.B. 'species.trait: trait_x -> trait_y' oder "
+                             "'set spawn_enabled=no where origin=origin_default' (mehrfach möglich)")
+    parser.add_argument("-f", "--rules-file", help="Datei mit einer Regel pro Zeile")
+    parser.add_argument("-o", "--output",
+                        help="Zieldatei; ohne Angabe wird die Eingabe nach einer Sicherung (<Datei>.bak) ersetzt")
+    parser.add_argument("-n", "--dry-run", action="store_true", help="Nur zählen, nichts schreiben")
+    args = parser.parse_args()
+
+    try:
+        rules = [parse_rule(rule) for rule in args.rule]
+        if args.rules_file:
+            rules.extend(read_rules_file(args.rules_file))
+    except (ValueError, OSError) as e:
+        print(f"Fehler: {e}")
+        sys.exit(1)
+    if not rules:
+        print("Keine Regeln angegeben (-r oder -f).")
+        sys.exit(1)
+
+    output_filepath = args.output or args.input
+    try:
+        if not args.dry_run and os.path.abspath(output_filepath) == os.path.abspath(args.input):
+            shutil.copy2(args.input, args.input + ".bak")
+            print(f"Sicherung erstellt: {args.input}.bak")
+        edited_blocks, counts = bulk_edit_file(args.input, output_filepath, rules, args.dry_run)
+    except FileNotFoundError as e:
+        print(f"Fehler: Datei '{e.filename}' nicht gefunden.")
+        sys.exit(1)
+
+    for rule, (changes, empires) in zip(rules, counts):
+        print(f"{changes:6} Änderungen in {empires:5} Imperien: {rule.text}")
+    if args.dry_run:
+        print(f"Probelauf: {edited_blocks} Imperien wären betroffen, nichts geschrieben.")
+    else:
+        print(f"{edited_blocks} Imperien geändert, geschrieben: {output_filepath}")
@@ -0,0 +1,181 @@
+import argparse
+import os
+import shutil
+import sys
+import time
+
+from empire_cache import open_atomic
+from empire_designs import Node, Quoted, iter_top_level_blocks, load_empires, parse_text
+
+# Kanonischer, kompakter Serializer für `user_empire_designs`-Dateien.
+# Jeder Top-Level-Block wird geparst und als eine einzige Zeile wieder ausgegeben:
+#   "The Galactic Papacy"={key="The Galactic Papacy" ship_prefix={key="Holy" literal=yes} ...}
+# Einrückung, Leerzeilen und Zeilen nur aus Leerraum (z.B. in `variables`-Blöcken) entfallen.
+# Werte in Anführungszeichen bleiben in Anführungszeichen, die Reihenfolge aller Einträge bleibt
+# erhalten, sodass der Baum nach dem erneuten Parsen identisch ist (Round-Trip-Prüfung).
+
+# === Serializer ===
+
+def _scalar(value):
+    return f'"{value}"' if isinstance(value, Quoted) else value
+
+def serialize_node(node):
+    """
+    Serialisiert den Inhalt eines Nodes (ohne äußere Klammern) kanonisch: Einträge durch ein
+    Leerzeichen getrennt, keine Leerzeichen um '=' und Klammern. Iterativ, damit auch tief
+    geschachtelte Blöcke nicht an die Rekursionsgrenze stoßen.
+    """
+    parts = []
+    stack = [iter(node.entries)]
+    first_in_block = [True]
+    while stack:
+        for key, value in stack[-1]:
+            if not first_in_block[-1]:
+                parts.append(' ')
+            first_in_block[-1] = False
+            if key is not None:
+                parts.append(_scalar(key))
+                parts.append('=')
+            if isinstance(value, Node):
+                parts.append('{')
+                stack.append(iter(value.entries))
+                first_in_block.append(True)
+                break
+            parts.append(_scalar(value))
+        else:
+            stack.pop()
+            first_in_block.pop()
+            if stack:
+                parts.append('}')
+    return ''.join(parts)
+
+def format_block(key, node, newline='\r\n'):
+    """
+    Serialisiert einen Top-Level-Block im Stil des Spiels (Tabs, `key=` und `{` auf eigenen Zeilen),
+    z.B. für Blöcke, die von bulk_edit.py verändert wurden. Iterativ wie serialize_node.
+    """
+    lines = [f"{_scalar(key)}=", "{"]
+    stack = [iter(node.entries)]
+    while stack:
+        tabs = "\t" * len(stack)
+        for entry_key, value in stack[-1]:
+            prefix = tabs if entry_key is None else f"{tabs}{_scalar(entry_key)}="
+            if isinstance(value, Node):
+                if entry_key is not None:
+                    lines.append(prefix)
+                lines.append(tabs + "{")
+                stack.append(iter(value.entries))
+                break
+            lines.append(prefix + _scalar(value))
+        else:
+            stack.pop()
+            lines.append("\t" * len(stack) + "}")
+    return newline.join(lines)
+
+def _identity(value):
+    """Vergleichswert eines Schlüssels oder Skalars; Quoted und ungequotete Werte sind verschieden."""
+    return isinstance(value, Quoted), value
+
+def trees_equal(a, b):
+    """
+    Vergleicht zwei Nodes strukturell: gleiche Einträge in gleicher Reihenfolge, gleiche
+    Schlüssel und Werte einschließlich der Anführungszeichen. Iterativ wie serialize_node.
+    """
+    stack = [(a, b)]
+    while stack:
+        left, right = stack.pop()
+        if len(left.entries) != len(right.entries):
+            return False
+        for (key_a, value_a), (key_b, value_b) in zip(left.entries, right.entries):
+            if _identity(key_a) != _identity(key_b):
+                return False
+            if isinstance(value_a, Node) and isinstance(value_b, Node):
+                stack.append((value_a, value_b))
+            elif isinstance(value_a, Node) or isinstance(value_b, Node) or _identity(value_a) != _identity(value_b):
+                return False
+    return True
+
+def compact_block(block_text):
+    """
+    Serialisiert einen Top-Level-Block kompakt und prüft den Round-Trip: Der kompakte Text
+    muss wieder zum selben Baum geparst werden wie der Originaltext (parse → serialize → parse).
+    Gibt None zurück, wenn der Block leer ist.
+    """
+    tree = parse_text(block_text)
+    compact = serialize_node(tree)
+    if not compact:
+        return None
+    if not trees_equal(parse_text(compact), tree):
+        raise ValueError(f"Round-Trip fehlgeschlagen für Block: {compact[:80]}")
+    return compact
+
+# === Datei ===
+
+def detect_newline(filepath):
+    """'\\r\\n', wenn die Datei (wie vom Spiel geschrieben) CRLF verwendet, sonst '\\n'."""
+    with open(filepath, 'rb') as f:
+        return '\r\n' if b'\r\n' in f.read(64 * 1024) else '\n'
+
+def compact_file(input_filepath, output_filepath):
+    """
+    Schreibt die kompakte Form der Designs-Datei, ein Imperium pro Zeile. Die Eingabe wird
+    blockweise gestreamt; die Ausgabe wird atomar geschrieben (siehe open_atomic) und ersetzt
+    die Zieldatei erst nach erfolgreicher Round-Trip-Prüfung aller Blöcke.
+    Die Eingabe wird ohne Zeilenende-Übersetzung gelesen (newline=''), damit CR und CRLF
+    innerhalb von Strings (z.B. in species_bio) unverändert erhalten bleiben und die
+    Round-Trip-Prüfung gegen den Rohtext des Blocks läuft.
+    Gibt die Anzahl der geschriebenen Blöcke zurück.
+    """
+    newline = detect_newline(input_filepath)
+    block_count = 0
+    with open_atomic(output_filepath, encoding='utf-8', newline='') as writer:
+        with open(input_filepath, 'r', encoding='utf-8-sig', newline='') as reader:
+            for block_text in iter_top_level_blocks(reader):
+                compact = compact_block(block_text)
+                if compact is not None:
+                    writer.write(compact + newline)
+                    block_count += 1
+    return block_count
+
+def best_parse_time(filepath, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        load_empires(filepath)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+# === Main Execution ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Schreibt eine Designs-Datei in kanonischer, kompakter Form (ein Imperium pro Zeile).")
+    parser.add_argument("input", nargs="?", default="user_empire_designs_v3.4.txt",
+                        help="Pfad zur Designs-Datei (Standard: %(default)s)")
+    parser.add_argument("output", nargs="?",
+                        help="Zieldatei; ohne Angabe wird die Eingabe nach einer Sicherung (<Datei>.bak) ersetzt")
+    parser.add_argument("--repeats", type=int, default=3, help="Wiederholungen der Parse-Messung (bestes Ergebnis zählt)")
+    args = parser.parse_args()
+
+    output_filepath = args.output or args.input
+    in_place = os.path.abspath(output_filepath) == os.path.abspath(args.input)
+    try:
+        input_size = os.path.getsize(args.input)
+        parse_before = best_parse_time(args.input, args.repeats)
+        if in_place:
+            shutil.copy2(args.input, args.input + ".bak")
+            print(f"Sicherung erstellt: {args.input}.bak")
+        block_count = compact_file(args.input, output_filepath)
+    except FileNotFoundError as e:
+        print(f"Fehler: Datei '{e.filename}' nicht gefunden.")
+        sys.exit(1)
+    except ValueError as e:
+        print(f"Fehler: {e}")
+        sys.exit(1)
+
+    output_size = os.path.getsize(output_filepath)
+    parse_after = best_parse_time(output_filepath, args.repeats)
+    print(f"{block_count} Imperien kompakt geschrieben: {output_filepath}")
+    print(f"  Größe: {input_size:,} -> {output_size:,} Bytes "
+          f"({(1 - output_size / input_size) * 100 if input_size else 0:.1f}% kleiner)")
+    print(f"  Parsen: {parse_before * 1000:.1f} ms -> {parse_after * 1000:.1f} ms "
+          f"(Speedup {parse_before / parse_after if parse_after else float('inf'):.2f}x)")
@@ -0,0 +1,100 @@
+import argparse
+import csv
+import itertools
+import os
+import sys
+
+from bitset_matrix import intersection_counts
+from empire_cache import load_empires_cached, open_atomic
+from empire_index import INDEX_FIELDS, build_index
+from sqlite_export import write_database
+
+# Kreuztabellen zwischen Civics, Ethiken, Origins und Autoritäten aus einem einzigen Parse.
+# Jede Tabelle ist das dünn besetzte Matrixprodukt AᵀB der Inzidenzmatrizen Imperium × Wert.
+# Die Spalten der Inzidenzmatrizen sind die Bitmengen des invertierten Index (empire_index.py),
+# jeder Eintrag ist popcount(Spalte_a & Spalte_b) (bitset_matrix.py). Nullen werden nie gespeichert.
+
+# Feld -> Feldpfad, Teilmenge von INDEX_FIELDS
+COOCCURRENCE_FIELDS = {field: INDEX_FIELDS[field] for field in ('civic', 'ethic', 'origin', 'authority')}
+
+SCHEMA = """
+CREATE TABLE cooccurrence (
+    field_a TEXT NOT NULL, value_a TEXT NOT NULL,
+    field_b TEXT NOT NULL, value_b TEXT NOT NULL,
+    n INTEGER NOT NULL
+);
+"""
+
+INDEXES = """
+CREATE INDEX idx_cooccurrence_a ON cooccurrence(field_a, value_a);
+CREATE INDEX idx_cooccurrence_b ON cooccurrence(field_b, value_b);
+"""
+
+# === Berechnung ===
+
+def cooccurrence_pairs(fields):
+    """
+    Die auszuwertenden Feldpaare, einschließlich Civic × Civic und Ethik × Ethik. Felder mit
+    höchstens einem Wert je Imperium (Origin, Autorität) werden nicht mit sich selbst gekreuzt.
+    """
+    return [(field_a, field_b) for field_a, field_b in itertools.combinations_with_replacement(fields, 2)
+            if field_a != field_b or fields[field_a].endswith('[]')]
+
+def build_cooccurrence(empires, fields=COOCCURRENCE_FIELDS):
+    """
+    Alle paarweisen Kreuztabellen der Felder aus einem Durchlauf über die Imperien (Aufbau der
+    Bitmengen-Spalten). Jeder Wert zählt pro Imperium nur einmal. Innerhalb desselben Feldes wird
+    nur die obere Dreiecksmatrix ohne Diagonale gezählt (Wert_a < Wert_b).
+
+    Returns:
+        dict: {(Feld_a, Feld_b): {(Wert_a, Wert_b): Anzahl}}, nur Einträge mit Anzahl > 0
+    """
+    columns = build_index(empires, fields).postings
+    return {(field_a, field_b): intersection_counts(columns[field_a], None if field_a == field_b else columns[field_b])
+            for field_a, field_b in cooccurrence_pairs(fields)}
+
+# === Ausgabe ===
+
+def write_cooccurrence_csv(field_a, field_b, table, output_filepath):
+    """Schreibt N;<Feld_a>;<Feld_b>, sortiert nach den Werten."""
+    with open_atomic(output_filepath, newline='', encoding='utf-8') as csvfile:
+        csv_writer = csv.writer(csvfile, delimiter=';')
+        csv_writer.writerow(['N', field_a, field_b])
+        for (value_a, value_b), count in sorted(table.items()):
+            csv_writer.writerow([count, value_a, value_b])
+
+def export_cooccurrence_sqlite(tables, output_filepath="cooccurrence.sqlite"):
+    """Schreibt alle Kreuztabellen in eine Tabelle `cooccurrence` (atomar, siehe write_database)."""
+    rows = [(field_a, value_a, field_b, value_b, count)
+            for (field_a, field_b), table in tables.items()
+            for (value_a, value_b), count in table.items()]
+    write_database(output_filepath, SCHEMA, {'cooccurrence': rows}, INDEXES)
+
+def generate_cooccurrence_reports(empires, output_dir="cooccurrence_reports"):
+    """
+    Schreibt je Feldpaar eine CSV-Datei (z.B. civic_origin.csv) und alle Paare zusammen
+    in cooccurrence.sqlite. Kann als Plugin von update_empire_analysis.py verwendet werden.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    tables = build_cooccurrence(empires)
+    for (field_a, field_b), table in tables.items():
+        write_cooccurrence_csv(field_a, field_b, table, os.path.join(output_dir, f"{field_a}_{field_b}.csv"))
+    export_cooccurrence_sqlite(tables, os.path.join(output_dir, "cooccurrence.sqlite"))
+    print(f"\n{len(tables)} Kreuztabellen geschrieben nach: {output_dir}")
+
+# === Main Execution ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Kreuztabellen zwischen Civics, Ethiken, Origins und Autoritäten (CSV und SQLite).")
+    parser.add_argument("input", nargs="?", default="user_empire_designs_v3.4.txt",
+                        help="Pfad zur Designs-Datei (Standard: %(default)s)")
+    parser.add_argument("-o", "--output-dir", default="cooccurrence_reports",
+                        help="Zielverzeichnis der Berichte (Standard: %(default)s)")
+    args = parser.parse_args()
+
+    try:
+        empires, _ = load_empires_cached(args.input)
+    except FileNotFoundError:
+        print(f"Fehler: Datei '{args.input}' nicht gefunden.")
+        sys.exit(1)
+    generate_cooccurrence_reports(empires, args.output_dir)
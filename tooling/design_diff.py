@@ -0,0 +1,156 @@
+import argparse
+import sys
+from collections import defaultdict
+
+from compact_designs import serialize_node
+from empire_designs import Node, parse_text
+from empire_offsets import decode_block, load_offsets
+
+# Semantischer Vergleich zweier Designs-Dateien, z.B. der aktuellen Datei mit ihrer
+# Sicherung `<Datei>.bak`. Jeder Top-Level-Block wird über den Hash aus dem Offset-Index
+# (empire_offsets.py) verglichen; gleiche Blöcke werden übersprungen, ohne sie zu parsen.
+# Nur die übrigen Blöcke werden (per seek) gelesen und geparst. Stimmt ihre kanonische Form
+# (compact_designs.serialize_node) überein, hat sich nur die Formatierung geändert (wie
+# nach dem Entfernen leerer Zeilen); sonst werden sie feldweise verglichen. Namen, die in
+# einer Datei mehrfach vorkommen, werden gemeldet; verglichen wird jeweils der erste Block.
+
+# === Felder ===
+
+def flatten_fields(node):
+    """
+    Bildet einen Block auf {Feldpfad: Tupel der Werte} ab, z.B. 'species.trait' ->
+    ('trait_a', 'trait_b'). Anonyme Werte und Blöcke erhalten das Pfadsegment '[]'
+    (z.B. 'civics.[]'). Anführungszeichen werden ignoriert, die Reihenfolge bleibt erhalten.
+    """
+    fields = defaultdict(list)
+    stack = [(node, '')]
+    while stack:
+        current, prefix = stack.pop()
+        for key, value in current.entries:
+            path = prefix + ('[]' if key is None else str(key))
+            if isinstance(value, Node):
+                stack.append((value, path + '.'))
+            else:
+                fields[path].append(str(value))
+    return {path: tuple(values) for path, values in fields.items()}
+
+def _read_block(reader, entry):
+    """Liest und parst den Block eines Eintrags aus dem Offset-Index."""
+    offset, length, _ = entry
+    reader.seek(offset)
+    return parse_text(decode_block(reader.read(length)))
+
+def _block_fields(block):
+    for _, value in block.entries:
+        if isinstance(value, Node):
+            return flatten_fields(value)
+    return {}
+
+def diff_fields(old_fields, new_fields):
+    """Liste (Pfad, alte Werte, neue Werte) aller Felder, die sich unterscheiden."""
+    return [(path, old_fields.get(path, ()), new_fields.get(path, ()))
+            for path in sorted(old_fields.keys() | new_fields.keys())
+            if old_fields.get(path, ()) != new_fields.get(path, ())]
+
+# === Vergleich ===
+
+def diff_designs(old_filepath, new_filepath):
+    """
+    Vergleicht zwei Designs-Dateien in linearer Zeit.
+
+    Returns:
+        dict: {'added': [Name], 'removed': [Name], 'modified': {Name: [(Pfad, alt, neu)]},
+               'unchanged': int, 'reformatted': int, 'duplicates': {'old': {Name: Anzahl},
+               'new': {Name: Anzahl}}}, wobei 'reformatted' die Blöcke zählt, deren Text sich
+               nur in Leerraum/Formatierung unterscheidet.
+    """
+    old_offsets, old_duplicates, _ = load_offsets(old_filepath)
+    new_offsets, new_duplicates, _ = load_offsets(new_filepath)
+    result = {
+        'added': sorted(new_offsets.keys() - old_offsets.keys()),
+        'removed': sorted(old_offsets.keys() - new_offsets.keys()),
+        'modified': {},
+        'unchanged': 0,
+        'reformatted': 0,
+        'duplicates': {'old': old_duplicates, 'new': new_duplicates},
+    }
+    with open(old_filepath, 'rb') as old_reader, open(new_filepath, 'rb') as new_reader:
+        for name in sorted(old_offsets.keys() & new_offsets.keys()):
+            old_entry, new_entry = old_offsets[name], new_offsets[name]
+            if old_entry[2] == new_entry[2]:
+                result['unchanged'] += 1 # Gleicher Hash: kein Parsen nötig
+                continue
+            old_block, new_block = _read_block(old_reader, old_entry), _read_block(new_reader, new_entry)
+            if serialize_node(old_block) == serialize_node(new_block):
+                result['unchanged'] += 1 # Gleiche kanonische Form: nur Formatierung geändert
+                result['reformatted'] += 1
+                continue
+            changes = diff_fields(_block_fields(old_block), _block_fields(new_block))
+            if changes:
+                result['modified'][name] = changes
+            else:
+                result['unchanged'] += 1
+                result['reformatted'] += 1
+    return result
+
+# Längere Werte (z.B. mehrzeilige species_bio) werden in der Ausgabe gekürzt
+MAX_VALUE_WIDTH = 120
+
+def _format_values(values):
+    if not values:
+        return "(fehlt)"
+    text = values[0] if len(values) == 1 else "[" + ", ".join(values) + "]"
+    return text.replace('\r', '\\r').replace('\n', '\\n')
+
+def _format_change(old_values, new_values):
+    """'alt -> neu'; bei langen Werten ab kurz vor der ersten abweichenden Stelle gekürzt."""
+    old_text, new_text = _format_values(old_values), _format_values(new_values)
+    if max(len(old_text), len(new_text)) <= MAX_VALUE_WIDTH:
+        return f"{old_text} -> {new_text}"
+    common = 0
+    while common < min(len(old_text), len(new_text)) and old_text[common] == new_text[common]:
+        common += 1
+    start = max(common - 20, 0)
+
+    def clip(text):
+        clipped = text[start:start + MAX_VALUE_WIDTH]
+        return ("..." if start else "") + clipped + ("..." if start + MAX_VALUE_WIDTH < len(text) else "")
+
+    return f"{clip(old_text)} -> {clip(new_text)}"
+
+def print_diff(result, names_only=False, old_filepath="alt", new_filepath="neu"):
+    for filepath, duplicates in ((old_filepath, result['duplicates']['old']), (new_filepath, result['duplicates']['new'])):
+        if duplicates:
+            print(f"Warnung: mehrfach vorhandene Namen in '{filepath}' ({len(duplicates)}), verglichen wird jeweils der erste Block:")
+            for name, count in sorted(duplicates.items()):
+                print(f"  {name} ({count}x)")
+    for title, names in (("Hinzugefügt", result['added']), ("Entfernt", result['removed'])):
+        print(f"{title} ({len(names)}):")
+        for name in names:
+            print(f"  {name}")
+    print(f"Geändert ({len(result['modified'])}):")
+    for name, changes in result['modified'].items():
+        print(f"  {name}")
+        if not names_only:
+            for path, old_values, new_values in changes:
+                print(f"    {path}: {_format_change(old_values, new_values)}")
+    print(f"Unverändert: {result['unchanged']} (davon {result['reformatted']} nur Leerraum/Formatierung)")
+
+# === Main Execution ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Semantischer Vergleich zweier Designs-Dateien (z.B. Datei und .bak).")
+    parser.add_argument("new", nargs="?", default="user_empire_designs_v3.4.txt",
+                        help="Aktuelle Designs-Datei (Standard: %(default)s)")
+    parser.add_argument("old", nargs="?", help="Vergleichsdatei (Standard: <new>.bak)")
+    parser.add_argument("--names-only", action="store_true", help="Nur Namen geänderter Imperien ausgeben")
+    args = parser.parse_args()
+
+    old_filepath = args.old or args.new + ".bak"
+    try:
+        diff_result = diff_designs(old_filepath, args.new)
+    except FileNotFoundError as e:
+        print(f"Fehler: Datei '{e.filename}' nicht gefunden.")
+        sys.exit(2)
+    print_diff(diff_result, args.names_only, old_filepath, args.new)
+    # Wie diff: 1, wenn es Unterschiede gibt
+    sys.exit(1 if diff_result['added'] or diff_result['removed'] or diff_result['modified'] else 0)
@@ -0,0 +1,163 @@
+import contextlib
+import dataclasses
+import hashlib
+import os
+import pickle
+import tempfile
+
+from empire_designs import iter_top_level_blocks, parse_empire_block
+
+# Inkrementelles Parsen mit einem persistenten Cache neben der Designs-Datei.
+# Schlüssel ist ein Hash über den Quelltext jedes Top-Level-Blocks (`"Name"={...}`),
+# Wert der bereits geparste Empire-Datensatz. Bei einem erneuten Lauf werden nur
+# geänderte oder neue Blöcke geparst; Einträge gelöschter Imperien fallen heraus.
+
+# Bei Änderungen am Parser oder am Empire-Modell erhöhen, damit alte Caches verworfen werden.
+CACHE_VERSION = 2
+
+
+def cache_path_for(filepath):
+    """Der Cache liegt neben der Designs-Datei: `<Datei>.cache`."""
+    return filepath + ".cache"
+
+
+def block_hash(block_text):
+    return hashlib.blake2b(block_text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def file_hash(filepath, chunk_size=1024 * 1024):
+    """Hash über den gesamten Dateiinhalt, blockweise gelesen."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Rechte neuer Dateien wie bei open() (mkstemp legt Dateien nur für den Besitzer lesbar an)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+NEW_FILE_MODE = 0o666 & ~_UMASK
+
+
+@contextlib.contextmanager
+def open_atomic(path, mode='w', **kwargs):
+    """
+    Wie open(), schreibt aber in eine temporäre Datei im selben Verzeichnis, die erst nach
+    fehlerfreiem Schließen per os.replace an ihren Platz verschoben wird. Leser sehen so nie
+    eine halb geschriebene Datei; bei einer Ausnahme bleibt die alte Datei erhalten.
+    """
+    fd, temp_file_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.',
+                                          prefix="." + os.path.basename(path) + "_tmp_")
+    try:
+        os.chmod(temp_file_path, NEW_FILE_MODE)
+        with open(fd, mode, **kwargs) as f:
+            yield f
+        os.replace(temp_file_path, path)
+        temp_file_path = None
+    finally:
+        if temp_file_path and os.path.exists(temp_file_path):
+            os.remove(temp_file_path)
+
+
+def write_pickle_atomic(path, payload):
+    """Schreibt `payload` als Pickle atomar über eine temporäre Datei im selben Verzeichnis."""
+    with open_atomic(path, 'wb') as f:
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def read_pickle(path, version):
+    """
+    Liest ein mit write_pickle_atomic geschriebenes Tupel `(version, *felder)` und gibt die Felder
+    zurück. Bei fehlender, beschädigter oder zu `version` unpassender Datei wird None geliefert.
+    """
+    try:
+        with open(path, 'rb') as f:
+            stored = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError, AttributeError):
+        return None
+    if not isinstance(stored, tuple) or not stored or stored[0] != version:
+        return None
+    return stored[1:]
+
+
+def load_sidecar(filepath, suffix, version, build_fn, rebuild=False):
+    """
+    Liefert den Inhalt der Begleitdatei `<filepath><suffix>` (Index, Merkmalsmatrix, ...) und baut
+    ihn mit build_fn(filepath) nur bei Bedarf neu. Stimmen Größe und Änderungszeit mit dem
+    gespeicherten Stand überein, wird die Designs-Datei nicht gelesen; andernfalls entscheidet der
+    Hash des Dateiinhalts. Der Inhalt sollte nur aus eingebauten Typen bestehen, damit die Datei
+    unabhängig davon lesbar bleibt, ob ein Modul als Skript oder als Import geladen wurde.
+
+    Returns:
+        tuple: (payload, status) mit status 'reused', 'rehashed' oder 'rebuilt'
+    """
+    sidecar_path = filepath + suffix
+    stat = os.stat(filepath)
+    stored = None if rebuild else read_pickle(sidecar_path, version)
+    if stored is not None and len(stored) == 4:
+        stored_size, stored_mtime_ns, stored_hash, payload = stored
+        if (stored_size, stored_mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+            return payload, 'reused'
+    else:
+        stored_hash = payload = None
+
+    current_hash = file_hash(filepath)
+    if stored_hash == current_hash:
+        status = 'rehashed' # Nur die Änderungszeit hat sich geändert (z.B. durch touch oder Kopieren)
+    else:
+        payload = build_fn(filepath)
+        status = 'rebuilt'
+    write_pickle_atomic(sidecar_path, (version, stat.st_size, stat.st_mtime_ns, current_hash, payload))
+    return payload, status
+
+
+def read_cache(cache_path):
+    """Liest den Cache; bei fehlender, beschädigter oder veralteter Datei wird ein leerer Cache geliefert."""
+    stored = read_pickle(cache_path, CACHE_VERSION)
+    if stored is None or len(stored) != 1 or not isinstance(stored[0], dict):
+        return {}
+    return stored[0]
+
+
+def write_cache(cache_path, records):
+    """Schreibt den Cache atomar."""
+    write_pickle_atomic(cache_path, (CACHE_VERSION, records))
+
+
+def load_empires_cached(filepath="user_empire_designs_v3.4.txt", use_cache=True):
+    """
+    Wie empire_designs.load_empires, parst aber nur Blöcke, deren Hash nicht im Cache liegt.
+    Mit use_cache=False wird der Cache weder gelesen noch geschrieben.
+
+    Returns:
+        tuple: (empires, stats) mit stats = {'reused': int, 'parsed': int, 'evicted': int}
+    """
+    cache_path = cache_path_for(filepath)
+    cached_records = read_cache(cache_path) if use_cache else {}
+
+    empires = []
+    current_records = {}
+    stats = {'reused': 0, 'parsed': 0, 'evicted': 0}
+    with open(filepath, 'r', encoding='utf-8-sig') as f:
+        for block_text in iter_top_level_blocks(f):
+            digest = block_hash(block_text)
+            record = current_records.get(digest) or cached_records.get(digest)
+            if record is not None:
+                stats['reused'] += 1
+            else:
+                record = parse_empire_block(block_text)
+                stats['parsed'] += 1
+                if record is None:
+                    continue
+            current_records[digest] = record
+            # Der Datensatz im Cache ist positionsunabhängig; der Index gilt nur für diesen Lauf.
+            empires.append(dataclasses.replace(record, index=len(empires)))
+
+    if use_cache:
+        # Alles, was nicht mehr in der Datei vorkommt, wird beim Zurückschreiben verworfen.
+        stats['evicted'] = len(cached_records.keys() - current_records.keys())
+        if stats['parsed'] or stats['evicted'] or len(cached_records) != len(current_records):
+            write_cache(cache_path, current_records)
+
+    return empires, stats
@@ -0,0 +1,453 @@
+import io
+import re
+import sys
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from stellaris_ethics import ethic_bit, mask_to_ethics
+
+# Gemeinsamer Parser für `user_empire_designs_v3.4.txt` (Clausewitz-Format).
+# Der Tokenizer arbeitet mit einem einzigen kompilierten Regex über den ganzen Text,
+# der Baum wird iterativ (ohne Rekursion) in einem Durchlauf aufgebaut.
+
+# === Tokenizer ===
+
+# Gruppen: 1 = String in Anführungszeichen (inkl. Anführungszeichen), 2 = Satzzeichen,
+# 3 = unquotiertes Wort. Kommentare (#...) matchen, liefern aber nur leere Gruppen.
+_TOKEN_RE = re.compile(
+    r'("[^"\\]*(?:\\.[^"\\]*)*")'
+    r'|([{}=])'
+    r'|([^\s{}="#]+)'
+    r'|#[^\n]*'
+)
+
+
+class Quoted(str):
+    """Skalarwert, der in der Datei in Anführungszeichen stand (z.B. key="Holy")."""
+    __slots__ = ()
+
+
+# === Generischer Baum ===
+
+class Node:
+    """
+    Ein `{ ... }`-Block. `entries` ist eine Liste von (key, value)-Paaren in Dateireihenfolge;
+    key ist None für anonyme Werte (z.B. die Einträge in `colors={ "red" "blue" }`).
+    value ist ein str (bzw. Quoted) oder ein weiterer Node.
+    """
+    __slots__ = ('entries',)
+
+    def __init__(self):
+        self.entries = []
+
+    def get(self, key, default=None):
+        """Gibt den ersten Wert zum Schlüssel zurück."""
+        for entry_key, value in self.entries:
+            if entry_key == key:
+                return value
+        return default
+
+    def get_all(self, key):
+        """Gibt alle Werte zum Schlüssel zurück (z.B. alle `trait=`-Einträge)."""
+        return [value for entry_key, value in self.entries if entry_key == key]
+
+    def values(self):
+        """Gibt alle anonymen Werte des Blocks zurück."""
+        return [value for entry_key, value in self.entries if entry_key is None]
+
+    def find(self, path, default=None):
+        """
+        Folgt einem Punkt-getrennten Pfad wie 'species.portrait' entlang der Blockstruktur
+        (jeweils erster Eintrag pro Ebene). Da nur direkte Kinder verglichen werden, kann
+        'species' nie innerhalb von 'secondary_species' treffen; die Laufzeit ist linear
+        in der Zahl der betrachteten Einträge, unabhängig von der Schachtelungstiefe.
+        """
+        value = self
+        for part in path.split('.'):
+            if not isinstance(value, Node):
+                return default
+            value = value.get(part)
+            if value is None:
+                return default
+        return value
+
+
+def parse_text(text):
+    """
+    Parst Clausewitz-Text in einem Durchlauf zu einem Baum aus Nodes.
+    Überzählige schließende Klammern werden ignoriert; ein am Dateiende nicht
+    geschlossener Top-Level-Block wird verworfen.
+    """
+    root = Node()
+    stack = [root]
+    entries = root.entries
+    pending = None  # Skalar, bei dem noch unklar ist, ob ein '=' folgt
+    key = None      # Schlüssel, der auf seinen Wert wartet
+
+    for quoted, punct, bare in _TOKEN_RE.findall(text):
+        if quoted:
+            value = Quoted(quoted[1:-1])
+        elif bare:
+            value = bare
+        elif punct == '=':
+            if pending is not None:
+                key = pending
+                pending = None
+            continue
+        elif punct == '{':
+            if pending is not None:
+                entries.append((None, pending))
+                pending = None
+            child = Node()
+            entries.append((key, child))
+            key = None
+            stack.append(child)
+            entries = child.entries
+            continue
+        elif punct == '}':
+            if pending is not None:
+                entries.append((None, pending))
+                pending = None
+            key = None
+            if len(stack) > 1:
+                stack.pop()
+                entries = stack[-1].entries
+            continue
+        else:
+            continue  # Kommentar
+
+        if key is not None:
+            entries.append((key, value))
+            key = None
+        else:
+            if pending is not None:
+                entries.append((None, pending))
+            pending = value
+
+    if pending is not None:
+        entries.append((None, pending))
+    if len(stack) > 1:
+        # Unvollständiger letzter Block (z.B. abgeschnittene Datei)
+        root.entries.pop()
+    return root
+
+
+# === Typisiertes Imperiums-Modell ===
+
+# Kompakte Datensätze mit __slots__. Wiederkehrende Werte (Origin, Authority, Portraits,
+# Traits, Civics, ...) werden interniert, sodass alle Imperien dieselben String-Objekte teilen.
+# Listen werden als Tupel gespeichert, Ethiken als Bitmaske über StellarisEthic.
+
+@dataclass(slots=True)
+class Species:
+    species_class: Optional[str] = None
+    portrait: Optional[str] = None
+    name: Optional[str] = None
+    plural: Optional[str] = None
+    adjective: Optional[str] = None
+    name_list: Optional[str] = None
+    gender: Optional[str] = None
+    traits: Tuple[str, ...] = ()
+
+
+@dataclass(slots=True)
+class Ruler:
+    gender: Optional[str] = None
+    portrait: Optional[str] = None
+    leader_class: Optional[str] = None
+    title: Optional[str] = None
+    traits: Tuple[str, ...] = ()
+
+
+@dataclass(slots=True)
+class EmpireFlag:
+    icon_category: Optional[str] = None
+    icon_file: Optional[str] = None
+    background_category: Optional[str] = None
+    background_file: Optional[str] = None
+    colors: Tuple[str, ...] = ()
+
+
+@dataclass(slots=True)
+class Empire:
+    index: int                 # Position des Blocks in der Datei (0-basiert)
+    name: Optional[str] = None # Top-Level-Bezeichner, z.B. "The Galactic Papacy"
+    key: Optional[str] = None
+    adjective: Optional[str] = None
+    species: Optional[Species] = None
+    secondary_species: Optional[Species] = None
+    ruler: Optional[Ruler] = None
+    authority: Optional[str] = None
+    government: Optional[str] = None
+    origin: Optional[str] = None
+    initializer: Optional[str] = None
+    ethics_mask: int = 0                   # Bitmaske über StellarisEthic (siehe stellaris_ethics.py)
+    unknown_ethics: Tuple[str, ...] = ()   # Ethik-Einträge, die StellarisEthic nicht kennt
+    civics: Tuple[str, ...] = ()
+    graphical_culture: Optional[str] = None
+    city_graphical_culture: Optional[str] = None
+    room: Optional[str] = None
+    planet_class: Optional[str] = None
+    planet_name: Optional[str] = None
+    system_name: Optional[str] = None
+    ship_prefix: Optional[str] = None
+    spawn_enabled: Optional[str] = None
+    flag: Optional[EmpireFlag] = None
+
+    @property
+    def ethics(self):
+        """Die Ethiken des Imperiums als Liste von StellarisEthic (in Definitionsreihenfolge)."""
+        return mask_to_ethics(self.ethics_mask)
+
+
+def _intern(value):
+    """Interniert Skalare; str() entfernt dabei die Quoted-Unterklasse."""
+    return sys.intern(str(value)) if isinstance(value, str) else None
+
+
+def _localised_key(value):
+    """Lokalisierte Namen stehen als `name={ key="..." literal=yes }` in der Datei."""
+    if isinstance(value, Node):
+        value = value.get('key')
+    return str(value) if isinstance(value, str) else None
+
+
+def _build_species(node):
+    species = Species()
+    traits = []
+    for key, value in node.entries:
+        if key == 'trait':
+            if isinstance(value, str):
+                traits.append(_intern(value))
+        elif key == 'class':
+            species.species_class = _intern(value)
+        elif key == 'portrait':
+            species.portrait = _intern(value)
+        elif key == 'species_name':
+            species.name = _localised_key(value)
+        elif key == 'species_plural':
+            species.plural = _localised_key(value)
+        elif key == 'species_adjective':
+            species.adjective = _localised_key(value)
+        elif key == 'name_list':
+            species.name_list = _intern(value)
+        elif key == 'gender':
+            species.gender = _intern(value)
+    species.traits = tuple(traits)
+    return species
+
+
+def _build_ruler(node):
+    ruler = Ruler()
+    traits = []
+    for key, value in node.entries:
+        if key == 'trait':
+            if isinstance(value, str):
+                traits.append(_intern(value))
+        elif key == 'gender':
+            ruler.gender = _intern(value)
+        elif key == 'portrait':
+            ruler.portrait = _intern(value)
+        elif key == 'leader_class':
+            ruler.leader_class = _intern(value)
+        elif key == 'ruler_title':
+            ruler.title = _localised_key(value)
+    ruler.traits = tuple(traits)
+    return ruler
+
+
+def _build_flag(node):
+    flag = EmpireFlag()
+    icon = node.get('icon')
+    if isinstance(icon, Node):
+        flag.icon_category = _intern(icon.get('category'))
+        flag.icon_file = _intern(icon.get('file'))
+    background = node.get('background')
+    if isinstance(background, Node):
+        flag.background_category = _intern(background.get('category'))
+        flag.background_file = _intern(background.get('file'))
+    colors = node.get('colors')
+    if isinstance(colors, Node):
+        flag.colors = tuple(_intern(value) for value in colors.values() if isinstance(value, str))
+    return flag
+
+
+# Top-Level-Felder, die als internierter Skalar übernommen werden (erster Eintrag gewinnt)
+_SCALAR_FIELDS = (
+    'authority', 'government', 'origin', 'initializer', 'graphical_culture',
+    'city_graphical_culture', 'room', 'planet_class', 'spawn_enabled',
+)
+_LOCALISED_FIELDS = ('adjective', 'planet_name', 'system_name', 'ship_prefix')
+
+
+def build_empire(index, name, node):
+    """Baut aus dem Node eines Top-Level-Blocks ein typisiertes Empire."""
+    empire = Empire(index=index, name=str(name) if name is not None else None)
+    civics = []
+    unknown_ethics = []
+    for key, value in node.entries:
+        if key == 'ethic':
+            if isinstance(value, str):
+                bit = ethic_bit(value)
+                if bit:
+                    empire.ethics_mask |= bit
+                else:
+                    unknown_ethics.append(_intern(value))
+        elif key in _SCALAR_FIELDS:
+            if getattr(empire, key) is None and isinstance(value, str):
+                setattr(empire, key, _intern(value))
+        elif key == 'key':
+            if empire.key is None and isinstance(value, str):
+                empire.key = str(value)
+        elif key == 'species':
+            if empire.species is None and isinstance(value, Node):
+                empire.species = _build_species(value)
+        elif key == 'secondary_species':
+            if empire.secondary_species is None and isinstance(value, Node):
+                empire.secondary_species = _build_species(value)
+        elif key == 'ruler':
+            if empire.ruler is None and isinstance(value, Node):
+                empire.ruler = _build_ruler(value)
+        elif key == 'civics':
+            if isinstance(value, Node):
+                civics.extend(_intern(v) for v in value.values() if isinstance(v, str))
+        elif key == 'empire_flag':
+            if empire.flag is None and isinstance(value, Node):
+                empire.flag = _build_flag(value)
+        elif key in _LOCALISED_FIELDS:
+            if getattr(empire, key) is None:
+                setattr(empire, key, _localised_key(value))
+        elif key == 'name' and empire.name is None:
+            empire.name = _localised_key(value)
+    empire.civics = tuple(civics)
+    empire.unknown_ethics = tuple(unknown_ethics)
+    return empire
+
+
+# === Top-Level-Blöcke ===
+
+# Für das reine Aufteilen reichen Klammern; Strings und Kommentare werden übersprungen,
+# damit darin enthaltene Klammern nicht mitgezählt werden. Ein nicht geschlossener String
+# reicht bis zum Ende des Puffers (beim Streamen wird dann auf weitere Daten gewartet).
+_BLOCK_SCAN_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*(?:"|\Z)|#[^\n]*|([{}])')
+_BLOCK_SCAN_BYTES_RE = re.compile(_BLOCK_SCAN_RE.pattern.encode('ascii'))
+
+# Lesegröße für das Streamen der Designs-Datei (Zeichen)
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+
+def iter_top_level_blocks(reader, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Liest Text inkrementell aus `reader` und liefert die Quelltexte der Top-Level-Blöcke,
+    jeweils inklusive des vorangestellten Namens (z.B. `"The Galactic Papacy"=\\n{ ... }`),
+    sobald die schließende Klammer gelesen wurde. Der Speicherbedarf ist durch den größten
+    einzelnen Block begrenzt, nicht durch die Dateigröße.
+    Nicht geschlossene Blöcke am Dateiende werden verworfen.
+    """
+    for _, block in _iter_block_spans(reader, chunk_size, _BLOCK_SCAN_RE):
+        yield block
+
+
+def iter_top_level_block_offsets(reader, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Wie iter_top_level_blocks, aber für einen binär geöffneten `reader`: liefert
+    (Byte-Offset, Block-Bytes) für jeden Block, z.B. für einen Offset-Index mit seek().
+    Die Trennzeichen sind ASCII, daher kann UTF-8 ohne Dekodieren gescannt werden.
+    """
+    return _iter_block_spans(reader, chunk_size, _BLOCK_SCAN_BYTES_RE)
+
+
+def _iter_block_spans(reader, chunk_size, scan_re):
+    """Gemeinsame Schleife für str und bytes: liefert (absoluter Offset, Block) pro Top-Level-Block."""
+    buffer = scan_re.pattern[:0]  # '' bzw. b''
+    open_brace = '{' if isinstance(buffer, str) else b'{'
+    buffer_offset = 0  # Position von buffer[0] im gesamten Datenstrom
+    depth = 0
+    block_start = 0  # Beginn des aktuellen Blocks (inkl. Name) im Puffer
+    scan_pos = 0     # Ab hier wurde der Puffer noch nicht gescannt
+    eof = False
+    while not eof:
+        chunk = reader.read(chunk_size)
+        if chunk:
+            buffer = buffer[block_start:] + chunk
+            buffer_offset += block_start
+            scan_pos -= block_start
+            block_start = 0
+        else:
+            eof = True
+
+        buffer_end = len(buffer)
+        scan_end = buffer_end
+        for match in scan_re.finditer(buffer, scan_pos):
+            brace = match.group(1)
+            if brace is None:
+                # String oder Kommentar am Pufferende könnte im nächsten Chunk weitergehen
+                if match.end() == buffer_end and not eof:
+                    scan_end = match.start()
+                    break
+            elif brace == open_brace:
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    end = match.end()
+                    block = buffer[block_start:end]
+                    stripped = block.lstrip()
+                    yield buffer_offset + block_start + len(block) - len(stripped), stripped.rstrip()
+                    block_start = end
+                elif depth < 0:
+                    depth = 0
+                    block_start = match.end()
+        scan_pos = scan_end
+
+        if depth == 0:
+            # Zwischen zwei Blöcken: führenden Leerraum (z.B. Millionen leerer Zeilen) nicht puffern
+            stripped = buffer[block_start:scan_pos].lstrip()
+            skipped = (scan_pos - block_start) - len(stripped)
+            block_start += skipped
+
+
+def split_top_level_blocks(text):
+    """Wie iter_top_level_blocks, aber für einen bereits eingelesenen Text; gibt eine Liste zurück."""
+    return list(iter_top_level_blocks(io.StringIO(text), chunk_size=max(len(text), 1)))
+
+
+def parse_empire_block(block_text, index=0):
+    """Parst den Quelltext eines einzelnen Top-Level-Blocks zu einem Empire (oder None)."""
+    for key, value in parse_text(block_text).entries:
+        if isinstance(value, Node):
+            return build_empire(index, key, value)
+    return None
+
+
+def parse_empires(text):
+    """Parst den Inhalt einer Designs-Datei und gibt die Liste aller Imperien zurück."""
+    root = parse_text(text)
+    empires = []
+    for key, value in root.entries:
+        if isinstance(value, Node):
+            empires.append(build_empire(len(empires), key, value))
+    return empires
+
+
+def iter_empires(filepath="user_empire_designs_v3.4.txt"):
+    """
+    Liest die Designs-Datei inkrementell und liefert jedes Imperium, sobald sein Block
+    vollständig gelesen ist. Fehler beim Lesen (z.B. FileNotFoundError) werden an den
+    Aufrufer weitergereicht.
+    """
+    with open(filepath, 'r', encoding='utf-8-sig') as f:
+        index = 0
+        for block_text in iter_top_level_blocks(f):
+            empire = parse_empire_block(block_text, index)
+            if empire is not None:
+                yield empire
+                index += 1
+
+
+def load_empires(filepath="user_empire_designs_v3.4.txt"):
+    """
+    Liest und parst die Designs-Datei und gibt die Liste aller Imperien zurück.
+    Fehler beim Lesen (z.B. FileNotFoundError) werden an den Aufrufer weitergereicht.
+    """
+    return list(iter_empires(filepath))
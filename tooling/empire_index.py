@@ -0,0 +1,228 @@
+import argparse
+import re
+import sys
+import time
+
+from empire_cache import load_empires_cached, load_sidecar
+from field_reports import compile_field_path
+
+# Persistenter invertierter Index (Feld, Wert) -> Imperien neben der Designs-Datei.
+# Jede Posting-Liste ist eine Bitmenge über die Positionen der Imperien (Python-int),
+# sodass AND/OR/NOT-Abfragen aus wenigen Ganzzahl-Operationen bestehen.
+# Der Index liegt neben der Designs-Datei (`<Datei>.index`) und wird über den Hash der
+# Designs-Datei invalidiert (empire_cache.load_sidecar).
+
+# Bei Änderungen am Index-Format erhöhen, damit alte Indizes neu gebaut werden.
+INDEX_VERSION = 3
+INDEX_SUFFIX = ".index"
+
+# Abfragefeld -> Feldpfad im Empire-Modell (siehe field_reports.compile_field_path)
+INDEX_FIELDS = {
+    'trait': 'species.trait[]',
+    'secondary_trait': 'secondary_species.trait[]',
+    'civic': 'civics[]',
+    'ethic': 'ethic[]',
+    'origin': 'origin',
+    'authority': 'authority',
+    'government': 'government',
+    'portrait': 'species.portrait',
+    'secondary_portrait': 'secondary_species.portrait',
+    'ruler_portrait': 'ruler.portrait',
+    'class': 'species.class',
+}
+
+# Abfragefelder, die zusätzlich in weiteren Feldern suchen: 'trait=x' trifft auch Imperien,
+# deren sekundäre Spezies den Trait hat ('secondary_trait=x' nur diese)
+QUERY_FIELD_ALIASES = {
+    'trait': ('secondary_trait',),
+}
+
+
+# === Aufbau und Persistenz ===
+
+class EmpireIndex:
+    """Invertierter Index: keys[i] ist der Key des i-ten Imperiums, postings[feld][wert] eine Bitmenge."""
+
+    __slots__ = ('keys', 'postings')
+
+    def __init__(self, keys, postings):
+        self.keys = keys
+        self.postings = postings
+
+    @property
+    def all_bits(self):
+        return (1 << len(self.keys)) - 1
+
+    def lookup(self, field, value):
+        """Bitmenge der Imperien mit `field=value`. Ohne Feld wird in allen Feldern gesucht."""
+        if field is None:
+            bits = 0
+            for value_map in self.postings.values():
+                bits |= value_map.get(value, 0)
+            return bits
+        if field not in self.postings:
+            raise ValueError(f"Unbekanntes Feld '{field}' (bekannt: {', '.join(self.postings)})")
+        bits = self.postings[field].get(value, 0)
+        for alias in QUERY_FIELD_ALIASES.get(field, ()):
+            bits |= self.postings.get(alias, {}).get(value, 0)
+        return bits
+
+    def values(self, field):
+        """Alle Werte eines Felds wie in lookup(), einschließlich der Werte aus QUERY_FIELD_ALIASES."""
+        values = set(self.postings[field])
+        for alias in QUERY_FIELD_ALIASES.get(field, ()):
+            values.update(self.postings.get(alias, ()))
+        return sorted(values)
+
+    def keys_for(self, bits):
+        """Sortierte Keys der Imperien einer Bitmenge."""
+        keys = []
+        while bits:
+            low_bit = bits & -bits
+            keys.append(self.keys[low_bit.bit_length() - 1])
+            bits ^= low_bit
+        return sorted(keys)
+
+
+def build_index(empires, fields=INDEX_FIELDS):
+    """Baut den Index in einem Durchlauf über die bereits geparsten Imperien."""
+    getters = {field: compile_field_path(path) for field, path in fields.items()}
+    postings = {field: {} for field in fields}
+    keys = []
+    for i, empire in enumerate(empires):
+        keys.append(empire.key if empire.key is not None else f"UNKNOWN_KEY_EMPIRE_{i+1}")
+        bit = 1 << i
+        for field, get_values in getters.items():
+            value_map = postings[field]
+            for value in get_values(empire):
+                value_map[value] = value_map.get(value, 0) | bit
+    return EmpireIndex(keys, postings)
+
+
+def _build_index_state(filepath):
+    empires, _ = load_empires_cached(filepath)
+    index = build_index(empires)
+    return {slot: getattr(index, slot) for slot in EmpireIndex.__slots__}
+
+
+def load_index(filepath="user_empire_designs_v3.4.txt", rebuild=False):
+    """
+    Liefert einen zur Designs-Datei passenden Index und baut ihn bei Bedarf neu.
+
+    Returns:
+        tuple: (index, status) mit status 'reused', 'rehashed' oder 'rebuilt'
+    """
+    state, status = load_sidecar(filepath, INDEX_SUFFIX, INDEX_VERSION, _build_index_state, rebuild)
+    return EmpireIndex(**state), status
+
+
+# === Abfragen ===
+
+# Klammern oder ein Wort ohne Leerraum/Klammern (z.B. 'trait=trait_intelligent', 'AND')
+_QUERY_TOKEN_RE = re.compile(r'[()]|[^\s()]+')
+
+
+def evaluate_query(index, query):
+    """
+    Wertet eine Abfrage wie 'trait=trait_intelligent AND NOT (origin=origin_default OR civic=civic_x)'
+    aus und gibt die Bitmenge der Treffer zurück. NOT bindet stärker als AND, AND stärker als OR;
+    aufeinanderfolgende Terme ohne Operator werden mit AND verknüpft. Ein Term ohne '=' sucht
+    den Wert in allen Feldern.
+    """
+    tokens = _QUERY_TOKEN_RE.findall(query)
+    position = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else None
+
+    def take():
+        nonlocal position
+        position += 1
+        return tokens[position - 1]
+
+    def parse_or():
+        bits = parse_and()
+        while peek() is not None and peek().upper() == 'OR':
+            take()
+            bits |= parse_and()
+        return bits
+
+    def parse_and():
+        bits = parse_not()
+        while peek() is not None and peek() != ')' and peek().upper() != 'OR':
+            if peek().upper() == 'AND':
+                take()
+            bits &= parse_not()
+        return bits
+
+    def parse_not():
+        token = peek()
+        if token is None:
+            raise ValueError("Unerwartetes Ende der Abfrage")
+        if token.upper() == 'NOT':
+            take()
+            return index.all_bits & ~parse_not()
+        if token == '(':
+            take()
+            bits = parse_or()
+            if peek() != ')':
+                raise ValueError("Schließende Klammer fehlt")
+            take()
+            return bits
+        if token == ')' or token.upper() in ('AND', 'OR'):
+            raise ValueError(f"Unerwartetes '{token}'")
+        take()
+        field, separator, value = token.partition('=')
+        return index.lookup(field, value) if separator else index.lookup(None, token)
+
+    bits = parse_or()
+    if peek() is not None:
+        raise ValueError(f"Unerwartetes '{peek()}'")
+    return bits
+
+
+# === Main Execution ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Abfragen über den invertierten Imperien-Index, z.B. "
+                    "\"trait=trait_intelligent AND civic=civic_gospel_of_the_masses\".")
+    parser.add_argument("query", nargs="?", help="Abfrage mit AND/OR/NOT und Klammern; Felder: "
+                                                 + ", ".join(INDEX_FIELDS)
+                                                 + " (trait sucht auch in den Traits der sekundären Spezies)")
+    parser.add_argument("-i", "--input", default="user_empire_designs_v3.4.txt",
+                        help="Pfad zur Designs-Datei (Standard: %(default)s)")
+    parser.add_argument("--rebuild", action="store_true", help="Index unabhängig vom Hash neu bauen")
+    parser.add_argument("--values", metavar="FIELD", help="Alle Werte eines Felds mit Anzahl auflisten")
+    parser.add_argument("-c", "--count", action="store_true", help="Nur die Anzahl der Treffer ausgeben")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        empire_index, status = load_index(args.input, rebuild=args.rebuild)
+    except FileNotFoundError:
+        print(f"Fehler: Datei '{args.input}' nicht gefunden.")
+        sys.exit(1)
+    load_seconds = time.perf_counter() - start
+
+    if args.values:
+        if args.values not in empire_index.postings:
+            print(f"Fehler: Unbekanntes Feld '{args.values}'")
+            sys.exit(1)
+        for value in empire_index.values(args.values):
+            print(f"{empire_index.lookup(args.values, value).bit_count():5} {value}")
+    elif args.query:
+        start = time.perf_counter()
+        try:
+            result_bits = evaluate_query(empire_index, args.query)
+        except ValueError as e:
+            print(f"Fehler in der Abfrage: {e}")
+            sys.exit(1)
+        query_seconds = time.perf_counter() - start
+        if not args.count:
+            for empire_key in empire_index.keys_for(result_bits):
+                print(empire_key)
+        print(f"{result_bits.bit_count()} von {len(empire_index.keys)} Imperien "
+              f"(Index {status}, {load_seconds * 1000:.1f} ms geladen, Abfrage {query_seconds * 1000:.2f} ms)",
+              file=sys.stderr)
+    else:
+        print(f"Index für '{args.input}': {len(empire_index.keys)} Imperien ({status}).")
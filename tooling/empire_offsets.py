@@ -0,0 +1,134 @@
+import argparse
+import hashlib
+import re
+import sys
+
+from empire_cache import load_sidecar
+from empire_designs import iter_top_level_block_offsets, parse_empire_block
+
+# Offset-Index neben der Designs-Datei: Name -> (Byte-Offset, Länge, Hash) jedes
+# Top-Level-Blocks. Damit wird ein einzelnes Imperium per seek() gelesen und geparst,
+# ohne die restliche Datei anzufassen. Der Index liegt neben der Designs-Datei
+# (`<Datei>.offsets`) und wird wie empire_index.py über empire_cache.load_sidecar
+# aufgefrischt; der Hash jedes Blocks schützt zusätzlich davor, veraltete Offsets zu
+# verwenden. Beim Aufbau wird kein Block geparst.
+
+# Bei Änderungen am Format erhöhen, damit alte Offset-Indizes neu gebaut werden.
+OFFSETS_VERSION = 4
+OFFSETS_SUFFIX = ".offsets"
+
+_UTF8_BOM = b'\xef\xbb\xbf'
+# Name am Anfang eines Blocks: `"The Galactic Papacy"=` oder `name=`
+_BLOCK_NAME_RE = re.compile(rb'"([^"]*)"|([^\s{}="#]+)')
+
+
+# Ungültiges UTF-8 in einem Block wird wie in empty_lines.py über surrogateescape byte-genau
+# durchgereicht, statt den Aufbau des ganzen Index abzubrechen.
+_ERRORS = 'surrogateescape'
+
+
+def _bytes_hash(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def decode_block(block):
+    """Dekodiert die Bytes eines Blocks als UTF-8; ungültige Bytes bleiben als Surrogate erhalten."""
+    return block.decode('utf-8', _ERRORS)
+
+
+# === Aufbau und Persistenz ===
+
+def build_offsets(filepath):
+    """
+    Scannt die Datei einmal binär.
+
+    Returns:
+        tuple: ({Name: (Offset, Länge, Hash)}, {Name: Anzahl} der mehrfach vorkommenden
+               Namen). Kommt ein Name mehrfach vor, gilt (wie im Spiel sichtbar) der erste Block.
+    """
+    offsets = {}
+    counts = {}
+    with open(filepath, 'rb') as f:
+        for offset, block in iter_top_level_block_offsets(f):
+            if offset == 0 and block.startswith(_UTF8_BOM):
+                offset, block = len(_UTF8_BOM), block[len(_UTF8_BOM):]
+            match = _BLOCK_NAME_RE.match(block)
+            if match is None:
+                continue
+            name = decode_block(match.group(1) if match.group(1) is not None else match.group(2))
+            counts[name] = counts.get(name, 0) + 1
+            if name not in offsets:
+                offsets[name] = (offset, len(block), _bytes_hash(block))
+    return offsets, {name: count for name, count in counts.items() if count > 1}
+
+
+def load_offsets(filepath="user_empire_designs_v3.4.txt", rebuild=False):
+    """
+    Liefert den Offset-Index der Designs-Datei und baut ihn bei Bedarf neu.
+
+    Returns:
+        tuple: (offsets, duplicates, fresh), siehe build_offsets; fresh ist True, wenn der
+               Index in diesem Aufruf gegen den Dateiinhalt geprüft oder neu gebaut wurde
+    """
+    (offsets, duplicates), status = load_sidecar(filepath, OFFSETS_SUFFIX, OFFSETS_VERSION, build_offsets, rebuild)
+    return offsets, duplicates, status != 'reused'
+
+# === Einzelzugriff ===
+
+def read_empire_block(name, filepath="user_empire_designs_v3.4.txt"):
+    """
+    Gibt den Quelltext des Blocks `name` zurück (oder None), gelesen per seek() an den
+    gespeicherten Offset. Passt der Hash des gelesenen Blocks nicht (Datei wurde geändert,
+    ohne dass sich Größe und Änderungszeit verraten haben), wird der Index einmal neu gebaut.
+    """
+    offsets, _, fresh = load_offsets(filepath)
+    with open(filepath, 'rb') as f:
+        while True:
+            entry = offsets.get(name)
+            if entry is None:
+                return None
+            offset, length, digest = entry
+            f.seek(offset)
+            block = f.read(length)
+            if _bytes_hash(block) == digest:
+                return decode_block(block)
+            if fresh:
+                return None
+            offsets, _, fresh = load_offsets(filepath, rebuild=True)
+
+
+def get_empire(name, filepath="user_empire_designs_v3.4.txt"):
+    """Parst nur den Block des Imperiums `name` und gibt das Empire zurück (oder None)."""
+    block_text = read_empire_block(name, filepath)
+    return parse_empire_block(block_text) if block_text is not None else None
+
+# === Main Execution ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Liest ein einzelnes Imperium per Offset-Index aus der Designs-Datei.")
+    parser.add_argument("name", nargs="?", help="Name des Imperiums, z.B. \"The Galactic Papacy\"")
+    parser.add_argument("-i", "--input", default="user_empire_designs_v3.4.txt",
+                        help="Pfad zur Designs-Datei (Standard: %(default)s)")
+    parser.add_argument("--raw", action="store_true", help="Den Quelltext des Blocks statt der Felder ausgeben")
+    parser.add_argument("--list", action="store_true", help="Alle Namen mit Offset und Länge auflisten")
+    args = parser.parse_args()
+
+    try:
+        if args.list or not args.name:
+            for empire_name, (offset, length, _) in sorted(load_offsets(args.input)[0].items(), key=lambda item: item[1]):
+                print(f"{offset:>12} {length:>8}  {empire_name}")
+        elif args.raw:
+            block_text = read_empire_block(args.name, args.input)
+            if block_text is None:
+                print(f"Imperium '{args.name}' nicht gefunden.")
+                sys.exit(1)
+            print(block_text)
+        else:
+            empire = get_empire(args.name, args.input)
+            if empire is None:
+                print(f"Imperium '{args.name}' nicht gefunden.")
+                sys.exit(1)
+            for field_name in empire.__slots__:
+                print(f"{field_name}: {getattr(empire, field_name)}")
+    except FileNotFoundError:
+        print(f"Fehler: Datei '{args.input}' nicht gefunden.")
+        sys.exit(1)
@@ -1,63 +1,20 @@
-import re
 import csv
 import os # Für Dateiprüfung und Dummy-Erstellung
 from collections import defaultdict
 
-# === Parsing Logic ===
+from empire_cache import open_atomic
+from empire_designs import iter_empires
 
-def parse_empire_origin_and_key(empire_content_str):
-    """
-    Parst einen String-Block der Definition eines einzelnen Imperiums, 
-    um dessen Key und Origin zu extrahieren.
-    Ein Imperium hat nur einen Origin. Nimmt die erste gefundene 'origin='-Zeile.
-    """
-    empire_origin = None
-    empire_key = None
-    
-    lines = empire_content_str.splitlines()
-    for line in lines:
-        stripped_line = line.strip()
-        # Extrahiere Key (nimm den ersten gefundenen)
-        if stripped_line.startswith("key=") and empire_key is None:
-            match = re.match(r'key="([^"]+)"', stripped_line)
-            if match:
-                empire_key = match.group(1)
-        # Extrahiere Origin (nimm den ersten gefundenen)
-        elif stripped_line.startswith("origin=") and empire_origin is None:
-            match = re.match(r'origin="([^"]+)"', stripped_line)
-            if match:
-                empire_origin = match.group(1)
-                
-    return {'key': empire_key, 'origin': empire_origin}
-
-def split_into_empire_blocks(file_content): # Wiederverwendet
-    """Teilt den gesamten Dateiinhalt in Strings auf, die jeweils einen Imperiumsblock darstellen."""
-    empire_blocks_content = []
-    balance = 0
-    current_block_start_index = -1
-    for i, char in enumerate(file_content):
-        if char == '{':
-            if balance == 0:
-                current_block_start_index = i + 1
-            balance += 1
-        elif char == '}':
-            balance -= 1
-            if balance == 0 and current_block_start_index != -1:
-                empire_blocks_content.append(file_content[current_block_start_index:i])
-                current_block_start_index = -1
-            elif balance < 0: 
-                balance = 0 # Bei fehlerhafter Struktur zurücksetzen
-                current_block_start_index = -1
-    return empire_blocks_content
+# === Parsing Logic ===
 
 def extract_origins_data_from_file(filepath="user_empire_designs_v3.4.txt"):
     """
-    Liest die Stellaris User Empire Designs Datei, parst jedes Imperium
-    und extrahiert dessen Key und Origin.
+    Liest die Stellaris User Empire Designs Datei über den gemeinsamen Parser
+    und extrahiert Key und Origin jedes Imperiums.
     """
     try:
-        with open(filepath, 'r', encoding='utf-8-sig') as f:
-            content = f.read()
+        # Die Datei wird blockweise gestreamt, statt sie komplett einzulesen
+        return extract_origins_data(iter_empires(filepath))
     except FileNotFoundError:
         # Dieser Fall wird im Hauptblock mit einer Dummy-Datei-Option behandelt
         return []
@@ -65,17 +22,16 @@ def extract_origins_data_from_file(filepath="user_empire_designs_v3.4.txt"):
         print(f"Fehler beim Lesen der Datei '{filepath}': {e}")
         return []
 
-    empire_block_strings = split_into_empire_blocks(content)
+def extract_origins_data(empires):
+    """Extrahiert Key und Origin aus bereits geparsten Imperien."""
     parsed_empires_list = []
     
-    for i, block_str in enumerate(empire_block_strings):
-        empire_details = parse_empire_origin_and_key(block_str)
+    for i, empire in enumerate(empires):
         # Nur Imperien einbeziehen, bei denen ein Origin tatsächlich gefunden wurde
-        if empire_details.get('origin'):
+        if empire.origin:
             # Stelle einen Key-Platzhalter sicher, falls einer fehlt
-            if empire_details['key'] is None:
-                empire_details['key'] = f"UNKNOWN_KEY_EMPIRE_{i+1}"
-            parsed_empires_list.append(empire_details)
+            empire_key = empire.key if empire.key is not None else f"UNKNOWN_KEY_EMPIRE_{i+1}"
+            parsed_empires_list.append({'key': empire_key, 'origin': empire.origin})
             
     return parsed_empires_list
 
@@ -121,7 +77,7 @@ def write_origins_csv(data_for_csv, output_filepath="origins_report.csv"):
         return
 
     try:
-        with open(output_filepath, 'w', newline='', encoding='utf-8') as csvfile:
+        with open_atomic(output_filepath, newline='', encoding='utf-8') as csvfile:
             # Verwende Semikolon als Haupt-Trennzeichen gemäß Benutzerbeispiel "N;Origin;Empires"
             csv_writer = csv.writer(csvfile, delimiter=';')
             
@@ -138,6 +94,18 @@ def write_origins_csv(data_for_csv, output_filepath="origins_report.csv"):
         print(f"\nCSV-Datei erfolgreich geschrieben: {output_filepath}")
     except IOError as e:
         print(f"Fehler beim Schreiben der CSV-Datei '{output_filepath}': {e}")
+        raise
+
+# === Report Plugin ===
+
+def generate_origins_report(empires, output_filepath="origins_report.csv"):
+    """
+    Erzeugt den Origin-Bericht aus bereits geparsten Imperien.
+    Wird von update_empire_analysis.py aufgerufen, das die Datei nur einmal parst.
+    """
+    parsed_origins_data = extract_origins_data(empires)
+    grouped_by_origin = group_empires_by_origin(parsed_origins_data)
+    write_origins_csv(prepare_origin_data_for_csv(grouped_by_origin), output_filepath)
 
 # === Main Execution ===
 
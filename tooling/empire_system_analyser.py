@@ -1,86 +1,37 @@
-import re
 import csv
 import os
 from collections import defaultdict
 
-# === Parsing Logic ===
-
-def parse_empire_initializer_and_key(empire_content_str):
-    """
-    Parst einen String-Block der Definition eines einzelnen Imperiums, 
-    um dessen Key und Initializer-Wert zu extrahieren.
-    """
-    empire_initializer = None  # Standard, falls die Zeile nicht gefunden wird
-    empire_key = None
-    initializer_line_found = False # Um sicherzustellen, dass wir nur den ersten Eintrag nehmen
+from empire_cache import open_atomic
+from empire_designs import iter_empires
 
-    lines = empire_content_str.splitlines()
-    for line in lines:
-        stripped_line = line.strip()
-        
-        # Extrahiere Key (nimm den ersten gefundenen)
-        if stripped_line.startswith("key=") and empire_key is None:
-            # Erlaubt auch leere Keys, obwohl unüblich: key=""
-            match = re.match(r'key="([^"]*)"', stripped_line) 
-            if match:
-                empire_key = match.group(1)
-                
-        # Extrahiere Initializer (nimm den ersten gefundenen)
-        elif stripped_line.startswith("initializer=") and not initializer_line_found:
-            # Erlaubt explizit leere Strings: initializer=""
-            match = re.match(r'initializer="([^"]*)"', stripped_line)
-            if match:
-                empire_initializer = match.group(1) # Kann jetzt "" sein
-                initializer_line_found = True
-                
-    return {'key': empire_key, 'initializer': empire_initializer}
-
-def split_into_empire_blocks(file_content): # Wiederverwendet
-    """Teilt den gesamten Dateiinhalt in Strings auf, die jeweils einen Imperiumsblock darstellen."""
-    empire_blocks_content = []
-    balance = 0
-    current_block_start_index = -1
-    for i, char in enumerate(file_content):
-        if char == '{':
-            if balance == 0:
-                current_block_start_index = i + 1
-            balance += 1
-        elif char == '}':
-            balance -= 1
-            if balance == 0 and current_block_start_index != -1:
-                empire_blocks_content.append(file_content[current_block_start_index:i])
-                current_block_start_index = -1
-            elif balance < 0: 
-                balance = 0 
-                current_block_start_index = -1
-    return empire_blocks_content
+# === Parsing Logic ===
 
 def extract_initializers_data_from_file(filepath="user_empire_designs_v3.4.txt"):
     """
-    Liest die Stellaris User Empire Designs Datei, parst jedes Imperium
-    und extrahiert dessen Key und Initializer.
+    Liest die Stellaris User Empire Designs Datei über den gemeinsamen Parser
+    und extrahiert Key und Initializer jedes Imperiums.
+    Der Initializer ist None, wenn die Zeile fehlt, und kann "" sein.
     """
     try:
-        with open(filepath, 'r', encoding='utf-8-sig') as f:
-            content = f.read()
+        # Die Datei wird blockweise gestreamt, statt sie komplett einzulesen
+        return extract_initializers_data(iter_empires(filepath))
     except FileNotFoundError:
         return []
     except Exception as e:
         print(f"Fehler beim Lesen der Datei '{filepath}': {e}")
         return []
 
-    empire_block_strings = split_into_empire_blocks(content)
+def extract_initializers_data(empires):
+    """Extrahiert Key und Initializer aus bereits geparsten Imperien."""
     parsed_empires_list = []
     
-    for i, block_str in enumerate(empire_block_strings):
-        empire_details = parse_empire_initializer_and_key(block_str)
-        
+    for i, empire in enumerate(empires):
         # Stelle einen Key-Platzhalter sicher, falls einer fehlt, da jedes Imperium verarbeitet wird
-        if empire_details['key'] is None:
-            empire_details['key'] = f"UNKNOWN_KEY_EMPIRE_{i+1}"
+        empire_key = empire.key if empire.key is not None else f"UNKNOWN_KEY_EMPIRE_{i+1}"
         
         # Füge alle Imperien hinzu, da wir auch die ohne Initializer-Zeile oder mit leerem Initializer sehen wollen
-        parsed_empires_list.append(empire_details)
+        parsed_empires_list.append({'key': empire_key, 'initializer': empire.initializer})
             
     return parsed_empires_list
 
@@ -131,7 +82,7 @@ def write_initializers_csv(data_for_csv, output_filepath="initializers_report.cs
         return
 
     try:
-        with open(output_filepath, 'w', newline='', encoding='utf-8') as csvfile:
+        with open_atomic(output_filepath, newline='', encoding='utf-8') as csvfile:
             csv_writer = csv.writer(csvfile, delimiter=';')
             
             # Schreibe den Header
@@ -147,6 +98,18 @@ def write_initializers_csv(data_for_csv, output_filepath="initializers_report.cs
         print(f"\nCSV-Datei erfolgreich geschrieben: {output_filepath}")
     except IOError as e:
         print(f"Fehler beim Schreiben der CSV-Datei '{output_filepath}': {e}")
+        raise
+
+# === Report Plugin ===
+
+def generate_initializers_report(empires, output_filepath="initializers_report.csv"):
+    """
+    Erzeugt den Initializer-Bericht aus bereits geparsten Imperien.
+    Wird von update_empire_analysis.py aufgerufen, das die Datei nur einmal parst.
+    """
+    parsed_initializers_data = extract_initializers_data(empires)
+    grouped_by_initializer = group_empires_by_initializer(parsed_initializers_data)
+    write_initializers_csv(prepare_initializer_data_for_csv(grouped_by_initializer), output_filepath)
 
 # === Main Execution ===
 
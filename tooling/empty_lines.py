@@ -1,19 +1,103 @@
 import sys
 import os
+import re
 import tempfile
 import shutil
 
-def process_lines(reader, writer):
+# Größe der Blöcke, in denen Dateien binär verarbeitet werden (8 MiB)
+CHUNK_SIZE = 8 * 1024 * 1024
+
+# Zeilenumbruch, gefolgt von einer oder mehreren leeren Zeilen: wird durch einen einzigen '\n' ersetzt.
+# Das Muster beginnt mit einem Literal, sodass die Regex-Engine direkt von '\n' zu '\n' springt.
+# Reine ASCII-Abschnitte werden ohne Dekodieren als Bytes bereinigt. _BLANK enthält genau die
+# ASCII-Zeichen außer '\n', für die str.isspace() gilt (inkl. '\r' bei CRLF-Zeilenenden).
+_BLANK = rb' \t\r\f\v\x1c-\x1f'
+_BLANK_LINE_RUN_BYTES_RE = re.compile(rb'\n[\n' + _BLANK + rb']*\n')
+# Folge leerer Zeilen am Anfang eines Abschnitts
+_LEADING_BLANK_LINES_BYTES_RE = re.compile(rb'(?:[' + _BLANK + rb']*\n)+')
+# Abschnitte mit Nicht-ASCII-Bytes werden dekodiert, damit \s jeden Unicode-Leerraum erfasst
+# (z.B. das geschützte Leerzeichen U+00A0).
+_BLANK_LINE_RUN_RE = re.compile(r'\n\s*\n')
+# Dekodierung der Blöcke: Ungültiges UTF-8 wird über surrogateescape byte-genau durchgereicht
+_ENCODING = 'utf-8'
+_ERRORS = 'surrogateescape'
+
+def _iter_cleaned_sections(reader, chunk_size=CHUNK_SIZE):
+    """
+    Liest die Eingabe in großen Blöcken und liefert je Block (Anzahl Zeilen, bereinigte Daten).
+    Es werden nur vollständige Zeilen verarbeitet, der Rest wird in den nächsten Block übernommen.
+    """
+    carry = b''
+    while True:
+        chunk = reader.read(chunk_size)
+        if not chunk:
+            break
+        data = carry + chunk if carry else chunk
+        # Jeder Abschnitt beginnt dadurch an einem Zeilenanfang.
+        cut = data.rfind(b'\n') + 1
+        carry = data[cut:]
+        if not cut:
+            continue
+        if data.isascii():
+            leading = _LEADING_BLANK_LINES_BYTES_RE.match(data, 0, cut)
+            start = leading.end() if leading else 0
+            cleaned = _BLANK_LINE_RUN_BYTES_RE.sub(b'\n', data[start:cut])
+        else:
+            # Mit vorangestelltem '\n' werden auch leere Zeilen am Anfang des Abschnitts erfasst
+            section = '\n' + data[:cut].decode(_ENCODING, _ERRORS)
+            cleaned = _BLANK_LINE_RUN_RE.sub('\n', section)[1:].encode(_ENCODING, _ERRORS)
+        yield data.count(b'\n', 0, cut), cleaned
+    # Letzte Zeile ohne abschließenden Zeilenumbruch
+    if carry:
+        yield 1, carry if carry.decode(_ENCODING, _ERRORS).strip() else b''
+
+def process_bytes(reader, writer, chunk_size=CHUNK_SIZE):
     """
-    Liest Zeilen vom Reader, entfernt leere Zeilen und schreibt
-    die nicht-leeren Zeilen (mit ihrem ursprünglichen Zeilenumbruch) zum Writer.
+    Liest die Eingabe binär in großen Blöcken,
+    entfernt alle leeren Zeilen eines Blocks mit einem einzigen Regex-Durchlauf
+    und schreibt die verbleibenden Zeilen mit einem write() pro Block.
+    Der Speicherbedarf ist durch chunk_size (plus die längste Zeile) begrenzt.
+    Als leer gilt wie bei str.strip() jede Zeile aus (Unicode-)Leerraum. Zeilenumbrüche
+    (LF oder CRLF) bleiben byte-genau erhalten; ein einzelnes '\r' gilt nicht als Zeilenumbruch.
     """
-    for line_with_newline in reader:
-        # Zeile ohne Zeilenumbruch für die Prüfung
-        line_for_check = line_with_newline.rstrip('\n')
-        # Eine Zeile ist "leer", wenn sie nach dem Entfernen von Leerzeichen leer ist
-        if line_for_check.strip():  # line_for_check.strip() ist True, wenn nicht leer
-            writer.write(line_with_newline) # Schreibe die Originalzeile mit Zeilenumbruch
+    for _, cleaned in _iter_cleaned_sections(reader, chunk_size):
+        if cleaned:
+            writer.write(cleaned)
+
+def blank_line_ratio(filepath, chunk_size=CHUNK_SIZE):
+    """Anteil der leeren Zeilen an allen Zeilen der Datei (0.0 bei einer leeren Datei)."""
+    total_lines = 0
+    kept_lines = 0
+    with open(filepath, 'rb') as reader:
+        for line_count, cleaned in _iter_cleaned_sections(reader, chunk_size):
+            total_lines += line_count
+            # Eine letzte Zeile ohne Zeilenumbruch zählt mit
+            kept_lines += cleaned.count(b'\n') + (bool(cleaned) and not cleaned.endswith(b'\n'))
+    return (total_lines - kept_lines) / total_lines if total_lines else 0.0
+
+def clean_file_in_place(input_path):
+    """Entfernt leere Zeilen direkt in der Datei, atomar über eine temporäre Datei im selben Verzeichnis."""
+    temp_file_path = None # Für den finally-Block
+    try:
+        # Erstelle eine temporäre Datei im selben Verzeichnis wie die Quelldatei
+        # um ein atomares Verschieben (shutil.move) zu ermöglichen.
+        # delete=False, damit wir sie manuell umbenennen/verschieben können.
+        with tempfile.NamedTemporaryFile(mode='wb',
+                                         dir=os.path.dirname(input_path) or '.', # dir='.' falls input_path nur Dateiname ist
+                                         prefix="." + os.path.basename(input_path) + "_tmp_", # z.B. .meineDatei.txt_tmp_xyz
+                                         delete=False) as tmp_writer:
+            temp_file_path = tmp_writer.name
+            with open(input_path, 'rb') as reader:
+                process_bytes(reader, tmp_writer)
+
+        # Ersetze die Originaldatei atomar durch die temporäre Datei
+        shutil.move(temp_file_path, input_path)
+        temp_file_path = None # Signalisiert, dass die Datei erfolgreich verschoben wurde
+    finally:
+        # Wenn temp_file_path noch gesetzt ist (d.h. das Verschieben ist fehlgeschlagen
+        # oder ein Fehler ist vorher aufgetreten), lösche die temporäre Datei.
+        if temp_file_path and os.path.exists(temp_file_path):
+            os.remove(temp_file_path)
 
 def main():
     args = sys.argv
@@ -22,12 +106,12 @@ def main():
     try:
         if len(args) == 1:
             # Keine Argumente: Lese von stdin, schreibe nach stdout
-            process_lines(sys.stdin, sys.stdout)
+            process_bytes(sys.stdin.buffer, sys.stdout.buffer)
         elif len(args) == 2:
             # Ein Argument: Lese von angegebener Datei, schreibe nach stdout
             input_path = args[1]
-            with open(input_path, 'r', encoding='utf-8') as reader:
-                process_lines(reader, sys.stdout)
+            with open(input_path, 'rb') as reader:
+                process_bytes(reader, sys.stdout.buffer)
         elif len(args) == 3:
             input_path = args[1]
             output_path = args[2]
@@ -35,32 +119,12 @@ def main():
             # Prüfen, ob es sich um eine In-Place-Bearbeitung handelt
             # (d.h. Eingabe- und Ausgabepfad sind identisch)
             if os.path.abspath(input_path) == os.path.abspath(output_path):
-                temp_file_path = None # Für den finally-Block
-                try:
-                    # Erstelle eine temporäre Datei im selben Verzeichnis wie die Quelldatei
-                    # um ein atomares Verschieben (shutil.move) zu ermöglichen.
-                    # delete=False, damit wir sie manuell umbenennen/verschieben können.
-                    with tempfile.NamedTemporaryFile(mode='w', encoding='utf-8',
-                                                     dir=os.path.dirname(input_path) or '.', # dir='.' falls input_path nur Dateiname ist
-                                                     prefix="." + os.path.basename(input_path) + "_tmp_", # z.B. .meineDatei.txt_tmp_xyz
-                                                     delete=False) as tmp_writer:
-                        temp_file_path = tmp_writer.name
-                        with open(input_path, 'r', encoding='utf-8') as reader:
-                            process_lines(reader, tmp_writer)
-                    
-                    # Ersetze die Originaldatei atomar durch die temporäre Datei
-                    shutil.move(temp_file_path, input_path)
-                    temp_file_path = None # Signalisiert, dass die Datei erfolgreich verschoben wurde
-                finally:
-                    # Wenn temp_file_path noch gesetzt ist (d.h. das Verschieben ist fehlgeschlagen
-                    # oder ein Fehler ist vorher aufgetreten), lösche die temporäre Datei.
-                    if temp_file_path and os.path.exists(temp_file_path):
-                        os.remove(temp_file_path)
+                clean_file_in_place(input_path)
             else:
                 # Zwei unterschiedliche Argumente: Lese von input_file, schreibe nach output_file
-                with open(input_path, 'r', encoding='utf-8') as reader:
-                    with open(output_path, 'w', encoding='utf-8') as writer:
-                        process_lines(reader, writer)
+                with open(input_path, 'rb') as reader:
+                    with open(output_path, 'wb') as writer:
+                        process_bytes(reader, writer)
         else:
             # Zu viele Argumente: Zeige usage und beende mit Fehler
             print(f"Benutzung: {script_name} [<EingabeDatei> [<AusgabeDatei>]]", file=sys.stderr)
@@ -0,0 +1,187 @@
+import argparse
+import csv
+import dataclasses
+import os
+import sys
+import typing
+from collections import defaultdict
+from enum import Enum
+
+from empire_cache import open_atomic
+from empire_designs import Empire, EmpireFlag, Ruler, Species, iter_empires
+
+# Generische Berichte: gruppiert Imperien nach einem beliebigen Feldpfad des Empire-Modells
+# (z.B. 'authority', 'civics[]', 'species.trait[]') und schreibt je Pfad eine
+# N;Value;Reiche-Tabelle. Alle Pfade werden in einem einzigen Durchlauf über die Imperien indiziert.
+
+# Pfade, die standardmäßig ausgewertet werden
+DEFAULT_FIELD_PATHS = [
+    'authority',
+    'government',
+    'origin',
+    'civics[]',
+    'ethic[]',
+    'species.class',
+    'species.portrait',
+    'species.trait[]',
+    'secondary_species.portrait',
+    'ruler.leader_class',
+    'ruler.portrait',
+    'ruler.trait[]',
+    'room',
+    'graphical_culture',
+    'city_graphical_culture',
+    'planet_class',
+    'spawn_enabled',
+    'empire_flag.icon_category',
+    'empire_flag.colors[]',
+]
+
+# Schlüssel aus der Designs-Datei -> Attributname im Empire-Modell
+FIELD_ALIASES = {
+    'class': 'species_class',
+    'trait': 'traits',
+    'ethic': 'ethics',
+    'civic': 'civics',
+    'empire_flag': 'flag',
+}
+
+def _field_kinds(model):
+    """Feldname -> Modellklasse (verschachtelter Block), tuple (mehrere Werte) oder None (einzelner Wert)."""
+    kinds = {}
+    for field in dataclasses.fields(model):
+        if typing.get_origin(field.type) is tuple:
+            kinds[field.name] = tuple
+        else:
+            kinds[field.name] = next((arg for arg in typing.get_args(field.type) if dataclasses.is_dataclass(arg)), None)
+    return kinds
+
+# Modellklasse -> Art ihrer Felder (zur Prüfung der Pfade)
+_FIELD_KINDS = {model: _field_kinds(model) for model in (Empire, Species, Ruler, EmpireFlag)}
+_FIELD_KINDS[Empire]['ethics'] = tuple # Property über ethics_mask
+
+# Platzhalter für Imperien ohne Wert in einem skalaren Feld (wie im Initializer-Bericht)
+NOT_SET = "<NOT_SET>"
+
+# === Feldpfade ===
+
+def compile_field_path(path):
+    """
+    Übersetzt einen Pfad wie 'species.trait[]' in eine Funktion, die für ein Imperium
+    die Liste der Werte liefert. Ein '[]' am letzten Segment steht für ein Feld mit mehreren Werten.
+    Unbekannte Felder, '[]' an einem einzelnen Wert, ein Feld mit mehreren Werten ohne '[]' und
+    Pfade, die auf einem Block (z.B. 'species') enden, lösen einen ValueError aus.
+    """
+    is_list = path.endswith('[]')
+    names = path.removesuffix('[]').split('.')
+    segments = [FIELD_ALIASES.get(name, name) for name in names]
+    model = Empire
+    kind = None
+    for position, segment in enumerate(segments):
+        if model is None:
+            raise ValueError(f"Feld '{names[position - 1]}' im Pfad '{path}' hat keine Unterfelder")
+        kinds = _FIELD_KINDS[model]
+        if segment not in kinds:
+            raise ValueError(f"Unbekanntes Feld '{names[position]}' im Pfad '{path}'")
+        kind = kinds[segment]
+        model = kind if dataclasses.is_dataclass(kind) else None
+    if model is not None:
+        raise ValueError(f"Pfad '{path}' endet auf dem Block '{names[-1]}'; "
+                         f"bitte ein Unterfeld angeben (z.B. '{path}.{dataclasses.fields(model)[0].name}')")
+    if kind is tuple and not is_list:
+        raise ValueError(f"Feld '{names[-1]}' hat mehrere Werte; bitte '{path}[]' verwenden")
+    if kind is not tuple and is_list:
+        raise ValueError(f"Feld '{names[-1]}' hat nur einen Wert; bitte '{path.removesuffix('[]')}' verwenden")
+
+    def values(empire):
+        value = empire
+        for segment in segments:
+            value = getattr(value, segment, None)
+            if value is None:
+                return [] if is_list else [NOT_SET]
+        if is_list:
+            return [item.value if isinstance(item, Enum) else item for item in value]
+        return [value.value if isinstance(value, Enum) else value]
+
+    return values
+
+# === Index ===
+
+def build_field_index(empires, paths=DEFAULT_FIELD_PATHS):
+    """
+    Baut in einem Durchlauf über die Imperien einen Index Pfad -> Wert -> Liste der Imperiums-Keys.
+    Ein Imperium wird pro Wert nur einmal gezählt, auch wenn der Wert mehrfach vorkommt.
+    """
+    getters = {path: compile_field_path(path) for path in paths}
+    index = {path: defaultdict(list) for path in paths}
+    for i, empire in enumerate(empires):
+        empire_key = empire.key if empire.key is not None else f"UNKNOWN_KEY_EMPIRE_{i+1}"
+        for path, get_values in getters.items():
+            value_map = index[path]
+            for value in dict.fromkeys(get_values(empire)):
+                value_map[value].append(empire_key)
+    return index
+
+# === CSV Preparation ===
+
+def prepare_field_data_for_csv(value_to_empires_map):
+    """
+    Bereitet die gruppierten Daten eines Pfads für die CSV-Ausgabe vor.
+    Format: [[Anzahl, Wert, Liste_der_Imperiums_Keys], ...], sortiert nach Wert.
+    """
+    data_for_csv = [[len(empire_keys_list), value, empire_keys_list]
+                    for value, empire_keys_list in value_to_empires_map.items()]
+    return sorted(data_for_csv, key=lambda item: item[1])
+
+def report_filename(path):
+    """Dateiname des Berichts zu einem Pfad, z.B. 'species.trait[]' -> 'species_trait_report.csv'."""
+    return path.removesuffix('[]').replace('.', '_') + "_report.csv"
+
+# === CSV Output Function ===
+
+def write_field_csv(data_for_csv, output_filepath):
+    """Schreibt eine N;Value;Reiche-Tabelle mit Semikolon als Trennzeichen."""
+    try:
+        with open_atomic(output_filepath, newline='', encoding='utf-8') as csvfile:
+            csv_writer = csv.writer(csvfile, delimiter=';')
+            csv_writer.writerow(['N', 'Value', 'Reiche'])
+            for count, value, empire_keys_list in data_for_csv:
+                csv_writer.writerow([count, value, ";".join(sorted(empire_keys_list))])
+    except IOError as e:
+        print(f"Fehler beim Schreiben der CSV-Datei '{output_filepath}': {e}")
+        raise
+
+# === Report Plugin ===
+
+def generate_field_reports(empires, output_dir="field_reports", paths=DEFAULT_FIELD_PATHS):
+    """
+    Erzeugt für jeden Pfad einen Bericht in `output_dir` aus bereits geparsten Imperien.
+    Kann als Plugin von update_empire_analysis.py verwendet werden.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    index = build_field_index(empires, paths)
+    for path, value_map in index.items():
+        write_field_csv(prepare_field_data_for_csv(value_map), os.path.join(output_dir, report_filename(path)))
+    print(f"\n{len(index)} Feld-Berichte geschrieben nach: {output_dir}")
+
+# === Main Execution ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Erzeugt N;Value;Reiche-Berichte für beliebige Feldpfade.")
+    parser.add_argument("input", nargs="?", default="user_empire_designs_v3.4.txt",
+                        help="Pfad zur Designs-Datei (Standard: %(default)s)")
+    parser.add_argument("--fields", nargs="+", default=DEFAULT_FIELD_PATHS,
+                        help="Feldpfade, z.B. authority 'civics[]' 'species.trait[]'")
+    parser.add_argument("-o", "--output-dir", default="field_reports",
+                        help="Zielverzeichnis der Berichte (Standard: %(default)s)")
+    args = parser.parse_args()
+    for field_path in args.fields:
+        try:
+            compile_field_path(field_path)
+        except ValueError as e:
+            parser.error(f"--fields: {e}")
+
+    try:
+        generate_field_reports(iter_empires(args.input), args.output_dir, args.fields)
+    except FileNotFoundError:
+        print(f"Fehler: Datei '{args.input}' nicht gefunden.")
+        sys.exit(1)
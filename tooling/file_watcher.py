@@ -0,0 +1,154 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+# Beobachtet eine einzelne Datei auf Änderungen. Unter Linux wird inotify (über ctypes,
+# ohne Zusatzpakete) verwendet, sodass der Prozess im Leerlauf schläft; sonst wird
+# sparsam per os.stat() abgefragt. Schreibt das Spiel die Datei in mehreren Schüben,
+# wird erst reagiert, wenn für `debounce` Sekunden Ruhe herrscht.
+
+# inotify-Konstanten aus <sys/inotify.h>
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+
+def file_signature(filepath):
+    """(Größe, Änderungszeit in ns) der Datei oder None, wenn sie (gerade) nicht existiert."""
+    try:
+        stat = os.stat(filepath)
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class _InotifyWatch:
+    """
+    Beobachtet das Verzeichnis der Datei, damit auch Ersetzen per rename (wie es Editoren
+    und das atomare Schreiben dieser Tools tun) erkannt wird.
+    """
+
+    def __init__(self, filepath):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        self._filename = os.fsencode(os.path.basename(filepath))
+        self._fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 fehlgeschlagen")
+        directory = os.fsencode(os.path.dirname(os.path.abspath(filepath)))
+        if libc.inotify_add_watch(self._fd, directory, _WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, "inotify_add_watch fehlgeschlagen")
+
+    def wait(self, timeout):
+        """Wartet höchstens `timeout` Sekunden (None = unbegrenzt); True, wenn die Datei betroffen war."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            readable, _, _ = select.select([self._fd], [], [], remaining)
+            if not readable:
+                return False
+            if self._read_events():
+                return True
+
+    def _read_events(self):
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+        matched = False
+        offset = 0
+        while offset < len(data):
+            _, _, _, name_length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + name_length].rstrip(b'\0')
+            offset += name_length
+            matched = matched or name == self._filename
+        return matched
+
+    def close(self):
+        os.close(self._fd)
+
+
+class _PollingWatch:
+    """Fallback ohne inotify: vergleicht alle `poll_interval` Sekunden Größe und Änderungszeit."""
+
+    def __init__(self, filepath, poll_interval):
+        self._filepath = filepath
+        self._poll_interval = poll_interval
+        self._signature = file_signature(filepath)
+
+    def wait(self, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            time.sleep(self._poll_interval if remaining is None else min(self._poll_interval, remaining))
+            signature = file_signature(self._filepath)
+            if signature != self._signature:
+                self._signature = signature
+                return True
+
+    def close(self):
+        pass
+
+
+def open_watch(filepath, poll_interval=1.0, use_inotify=True):
+    """Liefert einen inotify-Beobachter, wenn verfügbar, sonst einen Polling-Beobachter."""
+    if use_inotify:
+        try:
+            return _InotifyWatch(filepath)
+        except (OSError, AttributeError):
+            pass # Kein Linux oder kein inotify (z.B. in manchen Containern)
+    return _PollingWatch(filepath, poll_interval)
+
+
+def watch_file(filepath, on_change, debounce=2.0, poll_interval=1.0, use_inotify=True):
+    """
+    Ruft `on_change()` auf, sobald sich die Datei geändert hat und danach `debounce`
+    Sekunden lang keine weitere Änderung kam. Läuft, bis KeyboardInterrupt ausgelöst wird.
+    Änderungen, die on_change selbst an der Datei vornimmt, lösen keinen neuen Lauf aus.
+
+    Löst on_change eine Ausnahme aus (z.B. weil das Spiel die Datei gerade erst zur Hälfte
+    geschrieben hat oder sie zwischenzeitlich verschwunden ist), wird der Fehler ausgegeben
+    und weiter beobachtet: Der Lauf wird bei der nächsten Änderung wiederholt, für einen neuen
+    Dateistand außerdem einmal nach `debounce` Sekunden, auch wenn keine Änderung mehr kommt.
+    """
+    watch = open_watch(filepath, poll_interval, use_inotify)
+    handled_signature = file_signature(filepath)
+    failed_signature = None
+    retry_pending = False
+    try:
+        while True:
+            watch.wait(debounce if retry_pending else None)
+            # Schübe zusammenfassen: warten, bis die Datei für `debounce` Sekunden ruhig ist
+            while watch.wait(debounce):
+                pass
+            signature = file_signature(filepath)
+            if signature is None or signature == handled_signature:
+                retry_pending = False
+                continue
+            try:
+                on_change()
+            except Exception as e:
+                print(f"Fehler beim Verarbeiten von '{filepath}': {e}")
+                print("Beobachtung läuft weiter; neuer Versuch bei der nächsten Änderung.")
+                # Denselben Dateistand nur einmal zeitgesteuert wiederholen, danach auf Änderungen warten
+                retry_pending = signature != failed_signature
+                failed_signature = signature
+                continue
+            failed_signature = None
+            retry_pending = False
+            handled_signature = file_signature(filepath)
+    finally:
+        watch.close()
@@ -0,0 +1,209 @@
+import argparse
+import csv
+import hashlib
+import random
+import sys
+from collections import defaultdict
+
+from empire_cache import load_empires_cached, open_atomic
+from field_reports import compile_field_path
+
+# Findet fast gleiche Imperien (z.B. "Wagner PMC" und "Wagnerite PMC"), ohne alle Paare zu vergleichen.
+# Jedes Imperium wird zu einer Menge von Merkmalen ('civics[]=civic_x', 'origin=origin_y', ...).
+# Verglichen wird die gewichtete Jaccard-Ähnlichkeit: Ein Merkmal mit Gewicht w zählt w-fach.
+# Deren MinHash-Signatur schätzt die Ähnlichkeit zweier Mengen; beim LSH-Banding werden die
+# Signaturen in Bänder geteilt, und nur Imperien, die in mindestens einem Band übereinstimmen,
+# werden als Kandidaten exakt verglichen. Da sich zufällige Imperien schon durch die kleinen
+# Wertebereiche (Origins, Ethiken, ...) zu 0.2-0.4 ähneln, wachsen die Buckets mit der Anzahl der
+# Imperien; Buckets mit mehr als MAX_BUCKET_SIZE Imperien werden daher übersprungen, sodass es
+# höchstens NUM_BANDS * (MAX_BUCKET_SIZE - 1) Kandidaten je Imperium gibt und der Aufwand etwa
+# linear wächst. Exakte Kopien werden vorher zusammengefasst, damit sie dabei nicht verloren gehen.
+
+# Feldpfad -> Gewicht (siehe field_reports.compile_field_path). Eine kopierte Spezies (Name,
+# Plural, Adjektiv) und Flagge verraten eine Kopie eher als Civics und Ethiken, die beim Kopieren
+# oft umgestellt werden, z.B. "Federal Republic of Almania" / "Democratic Republic of Almania".
+FEATURE_WEIGHTS = {
+    'species.name': 4,
+    'species.plural': 4,
+    'species.adjective': 4,
+    'species.class': 2,
+    'species.portrait': 2,
+    'species.name_list': 1,
+    'ruler.portrait': 2,
+    'flag.icon_file': 2,
+    'flag.background_file': 2,
+    'species.trait[]': 1,
+    'civics[]': 1,
+    'ethic[]': 1,
+    'origin': 1,
+    'authority': 1,
+}
+
+# 100 Bänder zu je 5 Zeilen: Die Schwelle des Bandings liegt bei etwa (1/100)^(1/5) = 0.40, knapp
+# unter DEFAULT_THRESHOLD. Paare ab 0.5 Ähnlichkeit werden mit 1 - (1 - 0.5^5)^100 = 95.8%
+# Wahrscheinlichkeit Kandidaten, Paare mit 0.25 nur noch mit 9.3%.
+NUM_BANDS = 100
+ROWS_PER_BAND = 5
+DEFAULT_THRESHOLD = 0.5
+
+# Größere Buckets bestehen fast nur aus zufällig ähnlichen Imperien und werden übersprungen
+MAX_BUCKET_SIZE = 5
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+# === Merkmale ===
+
+def feature_sets(empires, weights=FEATURE_WEIGHTS):
+    """Gibt (Keys, Merkmalsmengen) zurück, eine frozenset je Imperium."""
+    getters = [(path, compile_field_path(path)) for path in weights]
+    keys, features = [], []
+    for i, empire in enumerate(empires):
+        keys.append(empire.key if empire.key is not None else f"UNKNOWN_KEY_EMPIRE_{i+1}")
+        features.append(frozenset(f"{path}={value}" for path, get_values in getters for value in get_values(empire)))
+    return keys, features
+
+def feature_weight(feature, weights=FEATURE_WEIGHTS):
+    """Gewicht eines Merkmals 'pfad=wert' (Feldpfade enthalten kein '=')."""
+    return weights[feature.partition('=')[0]]
+
+def jaccard(a, b, weights=FEATURE_WEIGHTS):
+    """Gewichtete Jaccard-Ähnlichkeit: Summe der Gewichte der Schnittmenge durch die der Vereinigung."""
+    union = sum(feature_weight(feature, weights) for feature in a | b)
+    return sum(feature_weight(feature, weights) for feature in a & b) / union if union else 1.0
+
+# === MinHash / LSH ===
+
+class MinHasher:
+    """
+    MinHash mit `num_perm` Hashfunktionen h_i(x) = (a_i * x + b_i) mod p über einem 64-Bit-Hash des
+    Merkmals. Die Hashwerte eines Merkmals mit Gewicht w werden so verzerrt, als wäre es w-fach in
+    der Menge, sodass die Signatur die gewichtete Jaccard-Ähnlichkeit schätzt. Sie werden je Merkmal
+    nur einmal berechnet, da sich Merkmale (Origins, Ethiken, ...) über viele Imperien wiederholen.
+    """
+
+    def __init__(self, num_perm=NUM_BANDS * ROWS_PER_BAND, seed=1, weights=FEATURE_WEIGHTS):
+        self.weights = weights
+        rng = random.Random(seed)
+        self.coefficients = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(_MERSENNE_PRIME))
+                             for _ in range(num_perm)]
+        self._feature_hashes = {}
+
+    def _hashes(self, feature):
+        """
+        Hashwerte eines Merkmals in [0, 1). Statt w Kopien zu hashen, wird jeder gleichverteilte
+        Wert u zu 1 - (1 - u)^(1/w) transformiert: Das hat dieselbe Verteilung wie das Minimum
+        von w unabhängigen Kopien, kostet aber nur eine Hashfunktion je Permutation.
+        """
+        hashes = self._feature_hashes.get(feature)
+        if hashes is None:
+            exponent = 1.0 / feature_weight(feature, self.weights)
+            x = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+            hashes = self._feature_hashes[feature] = tuple(
+                1.0 - (1.0 - ((a * x + b) % _MERSENNE_PRIME) / _MERSENNE_PRIME) ** exponent
+                for a, b in self.coefficients)
+        return hashes
+
+    def signature(self, features):
+        """Spaltenweises Minimum über die Hashwerte aller Merkmale; None für eine leere Menge."""
+        if not features:
+            return None
+        return tuple(map(min, zip(*(self._hashes(feature) for feature in features))))
+
+def candidate_pairs(signatures, num_bands=NUM_BANDS, rows_per_band=ROWS_PER_BAND, max_bucket_size=MAX_BUCKET_SIZE):
+    """
+    Paare (i, j) mit i < j, deren Signaturen in mindestens einem Band übereinstimmen. Buckets mit mehr
+    als `max_bucket_size` Imperien werden übersprungen.
+    """
+    pairs = set()
+    for band in range(num_bands):
+        start = band * rows_per_band
+        buckets = defaultdict(list)
+        for i, signature in enumerate(signatures):
+            if signature is not None:
+                buckets[signature[start:start + rows_per_band]].append(i)
+        for members in buckets.values():
+            if len(members) > max_bucket_size:
+                continue
+            for position, i in enumerate(members):
+                for j in members[position + 1:]:
+                    pairs.add((i, j))
+    return pairs
+
+def find_near_duplicates(empires, threshold=DEFAULT_THRESHOLD, num_bands=NUM_BANDS, rows_per_band=ROWS_PER_BAND):
+    """
+    Findet Paare mit gewichteter Jaccard-Ähnlichkeit >= threshold. Die Kandidaten aus dem LSH werden exakt
+    nachgerechnet, sodass die gemeldeten Werte keine Schätzungen sind.
+
+    Returns:
+        tuple: (Liste (Ähnlichkeit, Key A, Key B, nur in A, nur in B) absteigend nach Ähnlichkeit,
+                Anzahl der geprüften Kandidatenpaare ohne exakte Kopien)
+    """
+    keys, features = feature_sets(empires)
+    # Exakte Kopien teilen sich eine Merkmalsmenge und werden nur einmal gehasht
+    copies = defaultdict(list)
+    for i, empire_features in enumerate(features):
+        if empire_features:
+            copies[empire_features].append(i)
+    unique_features = list(copies)
+    hasher = MinHasher(num_bands * rows_per_band)
+    signatures = [hasher.signature(empire_features) for empire_features in unique_features]
+    candidates = candidate_pairs(signatures, num_bands, rows_per_band)
+    similar = [(1.0, group, group) for group in copies.values() if len(group) > 1]
+    for i, j in candidates:
+        similarity = jaccard(unique_features[i], unique_features[j])
+        if similarity >= threshold:
+            similar.append((similarity, copies[unique_features[i]], copies[unique_features[j]]))
+    duplicates = []
+    for similarity, group_a, group_b in similar:
+        for i in group_a:
+            for j in group_b:
+                if group_a is group_b and j <= i:
+                    continue
+                a, b = (i, j) if str(keys[i]) <= str(keys[j]) else (j, i)
+                duplicates.append((similarity, keys[a], keys[b],
+                                   sorted(features[a] - features[b]), sorted(features[b] - features[a])))
+    duplicates.sort(key=lambda item: (-item[0], str(item[1]), str(item[2])))
+    return duplicates, len(candidates)
+
+# === CSV Output ===
+
+def write_near_duplicates_csv(duplicates, output_filepath="near_duplicates.csv"):
+    """Schreibt Ähnlichkeit;Reich A;Reich B;Nur in A;Nur in B."""
+    with open_atomic(output_filepath, newline='', encoding='utf-8') as csvfile:
+        csv_writer = csv.writer(csvfile, delimiter=';')
+        csv_writer.writerow(['Ähnlichkeit', 'Reich A', 'Reich B', 'Nur in A', 'Nur in B'])
+        for similarity, key_a, key_b, only_a, only_b in duplicates:
+            csv_writer.writerow([f"{similarity:.2f}", key_a, key_b, ";".join(only_a), ";".join(only_b)])
+    print(f"\nCSV-Datei erfolgreich geschrieben: {output_filepath}")
+
+# === Report Plugin ===
+
+def generate_near_duplicates_report(empires, output_filepath="near_duplicates.csv"):
+    """Erzeugt den Bericht über fast gleiche Imperien aus bereits geparsten Imperien."""
+    duplicates, _ = find_near_duplicates(empires)
+    write_near_duplicates_csv(duplicates, output_filepath)
+
+# === Main Execution ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Findet fast gleiche Imperien per MinHash/LSH.")
+    parser.add_argument("input", nargs="?", default="user_empire_designs_v3.4.txt",
+                        help="Pfad zur Designs-Datei (Standard: %(default)s)")
+    parser.add_argument("-t", "--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Mindestähnlichkeit (gewichtete Jaccard, 0-1, Standard: %(default)s)")
+    parser.add_argument("-o", "--output", help="Ergebnis zusätzlich als CSV schreiben")
+    args = parser.parse_args()
+
+    try:
+        empires, _ = load_empires_cached(args.input)
+    except FileNotFoundError:
+        print(f"Fehler: Datei '{args.input}' nicht gefunden.")
+        sys.exit(1)
+
+    near_duplicates, candidate_count = find_near_duplicates(empires, args.threshold)
+    for similarity, key_a, key_b, only_a, only_b in near_duplicates:
+        print(f"{similarity:.2f}  {key_a}  <->  {key_b}")
+    total_pairs = len(empires) * (len(empires) - 1) // 2
+    print(f"{len(near_duplicates)} Paare mit Ähnlichkeit >= {args.threshold} "
+          f"({candidate_count} von {total_pairs} möglichen Paaren geprüft).")
+    if args.output:
+        write_near_duplicates_csv(near_duplicates, args.output)
@@ -0,0 +1,126 @@
+import argparse
+import re
+import sys
+import time
+
+from empire_designs import parse_empire_block
+from species_analyser import extract_portraits_data, parse_empire_portraits_and_key
+
+# Benchmark für die Portrait-Extraktion: vergleicht die strukturelle Pfad-Suche
+# (species_analyser.parse_empire_portraits_and_key) und den Weg, den der Portrait-Bericht
+# tatsächlich nimmt (empire_designs.parse_empire_block + species_analyser.extract_portraits_data),
+# mit dem früheren verschachtelten Regex auf absichtlich ungünstigen, tief geschachtelten
+# oder fehlerhaften Blöcken. Gemessen wird jeweils ein vollständiger `"Name"={...}`-Block.
+
+# Das frühere Muster aus species_analyser.py (nur zum Vergleich)
+LEGACY_PRIMARY_PORTRAIT_RE = re.compile(
+    r'species\s*=\s*\{(?:[^{}]|\{(?:[^{}]|\{[^{}]*\})*\})*?portrait\s*=\s*"([^"]+)"',
+    re.DOTALL
+)
+
+# === Adversariale Eingaben ===
+
+def deep_block(depth):
+    """Portrait steht hinter einem `depth`-fach geschachtelten Block; secondary_species kommt zuerst."""
+    return (
+        'key="DEEP"\n'
+        'secondary_species={ portrait="secondary_p" }\n'
+        'species={ class="HUM" nested=' + '{ a=' * depth + '{ }' + ' }' * depth
+        + ' portrait="primary_p" }\n'
+        'ruler={ portrait="ruler_p" }\n'
+    )
+
+def wide_block(width):
+    """Viele zweifach geschachtelte Geschwister-Blöcke vor dem Portrait."""
+    return (
+        'key="WIDE"\n'
+        'species={ ' + 'v={ { key="x" value={ key="y" } } } ' * width
+        + 'portrait="primary_p" }\n'
+    )
+
+def unbalanced_block(depth):
+    """Fehlerhafter Block: viele öffnende Klammern ohne Gegenstück, kein Portrait."""
+    return 'key="BROKEN"\nspecies={ ' + 'species={ a=1 ' * depth
+
+def full_block(content):
+    """Verpackt den Inhalt wie in der Designs-Datei in einen `"Name"={...}`-Block."""
+    return '"Benchmark"=\n{\n' + content + '\n}\n'
+
+CASES = {
+    'tief': (deep_block, 'primary_p'),
+    'breit': (wide_block, 'primary_p'),
+    'fehlerhaft': (unbalanced_block, None),
+}
+
+# === Messung ===
+
+def best_time(function, argument, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function(argument)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def structural_lookup(block):
+    return parse_empire_portraits_and_key(block)['primary_portrait']
+
+def model_lookup(block):
+    empire = parse_empire_block(block)
+    portraits = extract_portraits_data([empire] if empire is not None else [])
+    return next((occurrence['portrait_name'] for occurrence in portraits
+                 if not occurrence['empire_key_ref'].startswith("secondary_")), None)
+
+def legacy_lookup(block):
+    match = LEGACY_PRIMARY_PORTRAIT_RE.search(block)
+    return match.group(1) if match else None
+
+# Gemessene Wege: (Spaltenname, Funktion)
+LOOKUPS = (
+    ('Struktur', structural_lookup),
+    ('Modell', model_lookup),
+)
+
+def run_case(case_name, sizes, repeats, with_legacy):
+    build, expected = CASES[case_name]
+    print(f"\nFall '{case_name}':")
+    print(f"  {'Größe':>8} {'Bytes':>10}"
+          + "".join(f" {lookup_name + ' ms':>12} {'ns/Byte':>8}" for lookup_name, _ in LOOKUPS)
+          + (f" {'Regex ms':>10} {'Regex korrekt':>14}" if with_legacy else ""))
+    ns_per_byte = {lookup_name: [] for lookup_name, _ in LOOKUPS}
+    for size in sizes:
+        block = full_block(build(size))
+        line = f"  {size:>8} {len(block):>10}"
+        for lookup_name, lookup in LOOKUPS:
+            seconds, result = best_time(lookup, block, repeats)
+            if result != expected:
+                print(f"  FEHLER: {lookup_name} lieferte {result!r} statt {expected!r}")
+            ns_per_byte[lookup_name].append(seconds * 1e9 / len(block))
+            line += f" {seconds * 1000:>12.2f} {ns_per_byte[lookup_name][-1]:>8.1f}"
+        if with_legacy:
+            legacy_seconds, legacy_result = best_time(legacy_lookup, block, repeats)
+            line += f" {legacy_seconds * 1000:>10.2f} {'ja' if legacy_result == expected else 'nein':>14}"
+        print(line)
+    # Bei linearer Laufzeit bleibt die Zeit pro Byte (bis auf Rauschen) konstant
+    growth = 0.0
+    for lookup_name, values in ns_per_byte.items():
+        lookup_growth = values[-1] / values[0] if values[0] else float('inf')
+        print(f"  {lookup_name}: Zeit pro Byte größte/kleinste Eingabe: {lookup_growth:.2f}x")
+        growth = max(growth, lookup_growth)
+    return growth
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark der strukturellen Portrait-Suche auf adversarialen Eingaben.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 4000, 16000, 64000],
+                        help="Schachtelungstiefe bzw. Anzahl der Blöcke pro Messung")
+    parser.add_argument("--repeats", type=int, default=3, help="Wiederholungen pro Messung (bestes Ergebnis zählt)")
+    parser.add_argument("--no-legacy", action="store_true", help="Den früheren Regex nicht mitmessen")
+    parser.add_argument("--max-growth", type=float, default=4.0,
+                        help="Maximal erlaubtes Wachstum der Zeit pro Byte, bevor der Lauf als nicht linear gilt")
+    args = parser.parse_args()
+
+    worst_growth = max(run_case(case_name, args.sizes, args.repeats, not args.no_legacy) for case_name in CASES)
+    if worst_growth > args.max_growth:
+        print(f"\nNicht linear: Zeit pro Byte wächst um {worst_growth:.2f}x (> {args.max_growth}x).")
+        sys.exit(1)
+    print(f"\nLinear: Zeit pro Byte wächst höchstens um {worst_growth:.2f}x.")
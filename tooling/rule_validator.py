@@ -0,0 +1,194 @@
+import argparse
+import csv
+import fnmatch
+import os
+import re
+import sys
+import time
+
+from empire_cache import open_atomic
+from empire_index import INDEX_FIELDS, build_index, load_index
+
+# Prüft alle Imperien gegen Kompatibilitätsregeln aus data/compatibility_rules.txt
+# (z.B. "civic=civic_shared_burden requires ethic ethic_fanatic_egalitarian").
+# Die Regeln werden gegen den invertierten Index (empire_index.py) kompiliert: Auslöser und
+# Zielwerte werden zu Bitmengen über alle Imperien, sodass jede Regel mit wenigen
+# Ganzzahl-Operationen für alle Imperien gleichzeitig geprüft wird. Nach einem Spiel-Update
+# muss nur die Regeldatei angepasst werden; der gespeicherte Index wird wiederverwendet.
+
+RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "compatibility_rules.txt")
+
+# Felder, auf die sich Regeln beziehen dürfen (Namen wie in empire_index.INDEX_FIELDS)
+RULE_FIELDS = ('ethic', 'authority', 'government', 'civic', 'origin')
+
+_GROUP_RE = re.compile(r'^@(?P<name>\w+)\s*=\s*(?P<values>.+)$')
+_RULE_RE = re.compile(r'^(?P<field>\w+)=(?P<trigger>\S+)\s+(?P<operator>requires|forbids|only)\s+'
+                      r'(?P<target_field>\w+)\s+(?P<values>.+)$')
+
+# === Regeln ===
+
+class Rule:
+    """Eine Regel: Imperien mit `field` in `triggers` müssen die Bedingung über `target_field` erfüllen."""
+    __slots__ = ('text', 'line', 'field', 'triggers', 'operator', 'target_field', 'targets')
+
+    def __init__(self, text, line, field, triggers, operator, target_field, targets):
+        self.text = text
+        self.line = line
+        self.field = field
+        self.triggers = triggers
+        self.operator = operator
+        self.target_field = target_field
+        self.targets = targets
+
+def _expand_groups(words, groups, line):
+    values = []
+    for word in words:
+        if word.startswith('@'):
+            if word[1:] not in groups:
+                raise ValueError(f"Zeile {line}: Unbekannte Gruppe '{word}'")
+            values.extend(groups[word[1:]])
+        else:
+            values.append(word)
+    return tuple(values)
+
+def parse_rules(lines):
+    """Parst Gruppen und Regeln; löst bei ungültiger Syntax einen ValueError mit Zeilennummer aus."""
+    groups = {}
+    rules = []
+    for line_number, line in enumerate(lines, 1):
+        text = line.split('#', 1)[0].strip()
+        if not text:
+            continue
+        match = _GROUP_RE.match(text)
+        if match:
+            groups[match['name']] = _expand_groups(match['values'].split(), groups, line_number)
+            continue
+        match = _RULE_RE.match(text)
+        if match is None:
+            raise ValueError(f"Zeile {line_number}: Ungültige Regel '{text}'")
+        for field in (match['field'], match['target_field']):
+            if field not in RULE_FIELDS:
+                raise ValueError(f"Zeile {line_number}: Unbekanntes Feld '{field}' (bekannt: {', '.join(RULE_FIELDS)})")
+        rules.append(Rule(text, line_number, match['field'], _expand_groups([match['trigger']], groups, line_number),
+                          match['operator'], match['target_field'],
+                          _expand_groups(match['values'].split(), groups, line_number)))
+    return rules
+
+def read_rules_file(filepath=RULES_FILE):
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return parse_rules(f)
+
+# === Kompilieren und Prüfen ===
+
+def _matching_values(patterns, value_map):
+    """Alle im Index vorkommenden Werte, auf die eines der Muster passt."""
+    return [value for value in value_map if any(fnmatch.fnmatchcase(value, pattern) for pattern in patterns)]
+
+def compile_rules(rules, index):
+    """
+    Übersetzt die Regeln in Bitmengen über die Imperien des Index. Jede kompilierte Regel ist
+    (Regel, Auslöser, Prüfung, {Wert: Bitmenge}) mit Prüfung 'requires' (mindestens ein Wert nötig)
+    oder 'forbids' (kein Wert erlaubt); 'only' wird zu 'forbids' über alle übrigen Werte des Feldes.
+
+    Passen die Auslöser oder die Zielwerte einer Regel auf keinen Wert im Index (z.B. nach einer
+    Umbenennung durch ein Spiel-Update oder bei einem Tippfehler), wird eine Warnung ausgegeben,
+    da die Regel dann nichts prüft bzw. jedes ausgelöste Imperium meldet.
+    """
+    compiled = []
+    for rule in rules:
+        trigger_map = index.postings[rule.field]
+        target_map = index.postings[rule.target_field]
+        triggers = {value: trigger_map[value] for value in _matching_values(rule.triggers, trigger_map)}
+        targets = _matching_values(rule.targets, target_map)
+        if not triggers:
+            print(f"Warnung: Zeile {rule.line}: Kein Imperium hat {rule.field} {' '.join(rule.triggers)}; "
+                  f"die Regel prüft nichts: {rule.text}")
+        if not targets:
+            print(f"Warnung: Zeile {rule.line}: Kein Imperium hat {rule.target_field} {' '.join(rule.targets)}; "
+                  f"Zielwerte veraltet oder falsch geschrieben? {rule.text}")
+        check = rule.operator
+        if check == 'only':
+            allowed = set(targets)
+            targets = [value for value in target_map if value not in allowed]
+            check = 'forbids'
+        compiled.append((rule, triggers, check, {value: target_map[value] for value in targets}))
+    return compiled
+
+def _iter_bits(bits):
+    while bits:
+        low_bit = bits & -bits
+        yield low_bit
+        bits ^= low_bit
+
+def find_rule_violations(index, compiled):
+    """
+    Prüft alle Imperien gegen alle kompilierten Regeln.
+    Gibt eine nach Reich sortierte Liste (Reich, Regel, Problem) zurück.
+    """
+    violations = []
+    for rule, triggers, check, targets in compiled:
+        triggered = 0
+        for bits in triggers.values():
+            triggered |= bits
+        matched = 0
+        for bits in targets.values():
+            matched |= bits
+        violators = triggered & ~matched if check == 'requires' else triggered & matched
+        for bit in _iter_bits(violators):
+            empire_key = index.keys[bit.bit_length() - 1]
+            cause = ", ".join(value for value, bits in triggers.items() if bits & bit)
+            if check == 'requires':
+                problem = f"{cause} erfordert {rule.target_field}: {' '.join(rule.targets)}"
+            else:
+                found = ", ".join(value for value, bits in targets.items() if bits & bit)
+                problem = f"{cause} ist nicht vereinbar mit {found}"
+            violations.append((empire_key, rule.text, problem))
+    violations.sort(key=lambda violation: str(violation[0]))
+    return violations
+
+# === CSV Output ===
+
+def write_rule_violations_csv(violations, output_filepath="rule_violations.csv"):
+    """Schreibt Reich;Regel;Problem für jeden Regelverstoß."""
+    with open_atomic(output_filepath, newline='', encoding='utf-8') as csvfile:
+        csv_writer = csv.writer(csvfile, delimiter=';')
+        csv_writer.writerow(['Reich', 'Regel', 'Problem'])
+        csv_writer.writerows(violations)
+    print(f"\nCSV-Datei erfolgreich geschrieben: {output_filepath}")
+
+# === Report Plugin ===
+
+def generate_rule_violations_report(empires, output_filepath="rule_violations.csv"):
+    """Prüft bereits geparste Imperien gegen die Regeldatei und schreibt die Verstöße."""
+    index = build_index(empires, {field: INDEX_FIELDS[field] for field in RULE_FIELDS})
+    write_rule_violations_csv(find_rule_violations(index, compile_rules(read_rules_file(), index)), output_filepath)
+
+# === Main Execution ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prüft alle Imperien gegen die Kompatibilitätsregeln.")
+    parser.add_argument("input", nargs="?", default="user_empire_designs_v3.4.txt",
+                        help="Pfad zur Designs-Datei (Standard: %(default)s)")
+    parser.add_argument("-r", "--rules", default=RULES_FILE, help="Regeldatei (Standard: data/compatibility_rules.txt)")
+    parser.add_argument("-o", "--output", help="Verstöße zusätzlich als CSV schreiben")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        rules = read_rules_file(args.rules)
+        empire_index, _ = load_index(args.input)
+    except FileNotFoundError as e:
+        print(f"Fehler: Datei '{e.filename}' nicht gefunden.")
+        sys.exit(2)
+    except ValueError as e:
+        print(f"Fehler: {e}")
+        sys.exit(2)
+    rule_violations = find_rule_violations(empire_index, compile_rules(rules, empire_index))
+    elapsed = time.perf_counter() - start
+
+    for empire_key, rule_text, problem in rule_violations:
+        print(f"Warnung: Imperium '{empire_key}': {problem}  [{rule_text}]")
+    print(f"{len(empire_index.keys)} Imperien gegen {len(rules)} Regeln geprüft: "
+          f"{len(rule_violations)} Verstöße ({elapsed * 1000:.1f} ms).")
+    if args.output:
+        write_rule_violations_csv(rule_violations, args.output)
+    sys.exit(1 if rule_violations else 0)
@@ -0,0 +1,163 @@
+import argparse
+import heapq
+import math
+import sys
+import time
+
+from empire_cache import load_empires_cached, load_sidecar
+from field_reports import compile_field_path
+
+# "Welche 5 Designs sind The Galactic Papacy am ähnlichsten?"
+# Jedes Imperium wird zu einem binären Merkmalsvektor (One-Hot über Ethiken, Civics, Traits,
+# Autorität, Origin und Spezies-Klasse). Eine Zeile der Merkmalsmatrix ist ein Python-int
+# (Bit j = Merkmal j); Skalarprodukte sind popcount(a & b), sodass eine Abfrage alle Zeilen mit
+# wenigen Ganzzahl-Operationen je Imperium bewertet. Die Matrix liegt neben der Designs-Datei
+# (`<Datei>.features`) und wird wie der Index (empire_index.py) nur bei geändertem Hash neu gebaut.
+
+# Bei Änderungen am Format oder an FEATURE_PATHS erhöhen, damit alte Matrizen neu gebaut werden.
+FEATURES_VERSION = 2
+FEATURES_SUFFIX = ".features"
+
+# Feldpfade der Merkmale (siehe field_reports.compile_field_path)
+FEATURE_PATHS = (
+    'ethic[]',
+    'civics[]',
+    'species.trait[]',
+    'authority',
+    'origin',
+    'species.class',
+)
+
+METRICS = ('cosine', 'jaccard')
+
+
+# === Aufbau und Persistenz ===
+
+class FeatureMatrix:
+    """keys[i] ist der Key des i-ten Imperiums, rows[i] dessen Merkmalsvektor als Bitmenge über features."""
+
+    __slots__ = ('keys', 'features', 'rows')
+
+    def __init__(self, keys, features, rows):
+        self.keys = keys
+        self.features = features
+        self.rows = rows
+
+    def find(self, name):
+        """Position eines Imperiums: exakter Key, sonst eindeutiger Teilstring (ohne Groß-/Kleinschreibung)."""
+        if name in self.keys:
+            return self.keys.index(name)
+        matches = [i for i, key in enumerate(self.keys) if name.lower() in str(key).lower()]
+        if len(matches) == 1:
+            return matches[0]
+        if not matches:
+            raise KeyError(f"Kein Imperium '{name}' gefunden")
+        raise KeyError(f"'{name}' ist mehrdeutig: " + ", ".join(sorted(str(self.keys[i]) for i in matches)))
+
+    def feature_names(self, bits):
+        return [feature for j, feature in enumerate(self.features) if bits >> j & 1]
+
+
+def build_feature_matrix(empires, paths=FEATURE_PATHS):
+    """Kodiert alle Imperien in einem Durchlauf; jedes neue Merkmal erhält die nächste Spalte."""
+    getters = [(path, compile_field_path(path)) for path in paths]
+    feature_ids = {}
+    keys, rows = [], []
+    for i, empire in enumerate(empires):
+        keys.append(empire.key if empire.key is not None else f"UNKNOWN_KEY_EMPIRE_{i+1}")
+        row = 0
+        for path, get_values in getters:
+            for value in get_values(empire):
+                feature = f"{path}={value}"
+                feature_id = feature_ids.get(feature)
+                if feature_id is None:
+                    feature_id = feature_ids[feature] = len(feature_ids)
+                row |= 1 << feature_id
+        rows.append(row)
+    return FeatureMatrix(keys, list(feature_ids), rows)
+
+
+def _build_feature_state(filepath):
+    empires, _ = load_empires_cached(filepath)
+    matrix = build_feature_matrix(empires)
+    return {slot: getattr(matrix, slot) for slot in FeatureMatrix.__slots__}
+
+
+def load_feature_matrix(filepath="user_empire_designs_v3.4.txt", rebuild=False):
+    """
+    Liefert eine zur Designs-Datei passende Merkmalsmatrix und baut sie bei Bedarf neu.
+
+    Returns:
+        tuple: (matrix, status) mit status 'reused', 'rehashed' oder 'rebuilt'
+    """
+    state, status = load_sidecar(filepath, FEATURES_SUFFIX, FEATURES_VERSION, _build_feature_state, rebuild)
+    return FeatureMatrix(**state), status
+
+
+# === Abfragen ===
+
+def similarities(matrix, query_row, metric='cosine'):
+    """
+    Ähnlichkeit von `query_row` zu allen Zeilen der Matrix.
+    Für binäre Vektoren ist das Skalarprodukt popcount(a & b) und |a|² = popcount(a).
+    """
+    query_count = query_row.bit_count()
+    if metric == 'cosine':
+        return [((query_row & row).bit_count() / math.sqrt(query_count * row.bit_count())
+                 if query_count and row else 0.0) for row in matrix.rows]
+    if metric == 'jaccard':
+        return [((query_row & row).bit_count() / (query_row | row).bit_count()
+                 if query_row | row else 0.0) for row in matrix.rows]
+    raise ValueError(f"Unbekannte Metrik '{metric}' (bekannt: {', '.join(METRICS)})")
+
+
+def most_similar(matrix, name, k=5, metric='cosine'):
+    """
+    Die k ähnlichsten Imperien zu `name` (ohne das Imperium selbst).
+
+    Returns:
+        list: [(Ähnlichkeit, Key, gemeinsame Merkmale)] absteigend nach Ähnlichkeit
+    """
+    position = matrix.find(name)
+    query_row = matrix.rows[position]
+    scores = similarities(matrix, query_row, metric)
+    best = heapq.nsmallest(k, (i for i in range(len(scores)) if i != position),
+                           key=lambda i: (-scores[i], str(matrix.keys[i])))
+    return [(scores[i], matrix.keys[i], matrix.feature_names(query_row & matrix.rows[i])) for i in best]
+
+
+# === Main Execution ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Findet die ähnlichsten Imperien zu einem Imperium.")
+    parser.add_argument("name", help="Key des Imperiums (oder eindeutiger Teil davon)")
+    parser.add_argument("-i", "--input", default="user_empire_designs_v3.4.txt",
+                        help="Pfad zur Designs-Datei (Standard: %(default)s)")
+    parser.add_argument("-k", type=int, default=5, help="Anzahl der Ergebnisse (Standard: %(default)s)")
+    parser.add_argument("-m", "--metric", choices=METRICS, default='cosine', help="Ähnlichkeitsmaß (Standard: %(default)s)")
+    parser.add_argument("--rebuild", action="store_true", help="Merkmalsmatrix unabhängig vom Hash neu bauen")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Gemeinsame Merkmale anzeigen")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        feature_matrix, status = load_feature_matrix(args.input, rebuild=args.rebuild)
+    except FileNotFoundError:
+        print(f"Fehler: Datei '{args.input}' nicht gefunden.")
+        sys.exit(1)
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    try:
+        results = most_similar(feature_matrix, args.name, args.k, args.metric)
+    except KeyError as e:
+        print(f"Fehler: {e.args[0]}")
+        sys.exit(1)
+    query_seconds = time.perf_counter() - start
+
+    for score, empire_key, shared in results:
+        print(f"{score:.3f}  {empire_key}")
+        if args.verbose:
+            print("       " + ", ".join(shared))
+    print(f"{len(feature_matrix.keys)} Imperien, {len(feature_matrix.features)} Merkmale "
+          f"(Matrix {status}, {load_seconds * 1000:.1f} ms geladen, Abfrage {query_seconds * 1000:.2f} ms)",
+          file=sys.stderr)
@@ -1,103 +1,79 @@
-import re
 import csv
 import os
 from collections import defaultdict
 
+from empire_cache import open_atomic
+from empire_designs import Node, iter_empires, parse_text
+
 # === Parsing Logic ===
 
+# Portrait-Pfade innerhalb eines Imperiumsblocks
+PORTRAIT_PATHS = {
+    'primary_portrait': 'species.portrait',
+    'secondary_portrait': 'secondary_species.portrait',
+    'ruler_portrait': 'ruler.portrait',
+}
+# Top-Level-Blöcke der Portrait-Pfade (species, secondary_species, ruler)
+_PORTRAIT_BLOCKS = {path.split('.')[0] for path in PORTRAIT_PATHS.values()}
+
 def parse_empire_portraits_and_key(empire_content_str):
     """
     Parst einen String-Block der Definition eines einzelnen Imperiums, um dessen Key,
-    primäres Spezies-Portrait und sekundäres Spezies-Portrait zu extrahieren.
+    primäres und sekundäres Spezies-Portrait sowie das Herrscher-Portrait zu extrahieren.
+    Akzeptiert wird sowohl der vollständige Block (`"Name"={ key=... }`) als auch nur sein
+    Inhalt (`key=... species={...}`).
+    Statt verschachtelter Regexe wird der Block einmal in einen Baum geparst und die
+    Portraits werden über Pfade (z.B. 'species.portrait') nachgeschlagen. Das ist linear
+    in der Blockgröße und unabhängig von der Schachtelungstiefe.
     """
-    empire_key = None
-    primary_portrait = None
-    secondary_portrait = None
-
-    # 1. Extrahiere den top-level Key des Imperiums
-    key_match = re.search(r'^\s*key\s*=\s*"([^"]+)"', empire_content_str, re.MULTILINE)
-    if key_match:
-        empire_key = key_match.group(1)
-
-    # 2. Extrahiere das primäre Spezies-Portrait
-    # Das Regex sucht nach 'species = {', dann nicht-gierig nach beliebigen Zeichen 
-    # (inkl. einfacher geschachtelter Blöcke), bis es 'portrait = "..."' findet.
-    # (?:[^{}]|\{(?:[^{}]|\{[^{}]*\})*\})*? ist der Teil, der versucht, Inhalt 
-    # innerhalb von Klammern zu navigieren, ohne durch andere einfache Blöcke verwirrt zu werden.
-    primary_portrait_match = re.search(
-        r'species\s*=\s*\{(?:[^{}]|\{(?:[^{}]|\{[^{}]*\})*\})*?portrait\s*=\s*"([^"]+)"',
-        empire_content_str,
-        re.DOTALL  # re.DOTALL lässt '.' auch Newlines matchen
-    )
-    if primary_portrait_match:
-        primary_portrait = primary_portrait_match.group(1)
-
-    # 3. Extrahiere das sekundäre Spezies-Portrait (falls vorhanden)
-    secondary_portrait_match = re.search(
-        r'secondary_species\s*=\s*\{(?:[^{}]|\{(?:[^{}]|\{[^{}]*\})*\})*?portrait\s*=\s*"([^"]+)"',
-        empire_content_str,
-        re.DOTALL
-    )
-    if secondary_portrait_match:
-        secondary_portrait = secondary_portrait_match.group(1)
-        
-    return {'key': empire_key, 'primary_portrait': primary_portrait, 'secondary_portrait': secondary_portrait}
+    block = parse_text(empire_content_str)
+    # Vollständiger Block: der einzige Eintrag ist `"Name"={...}`, ausgewertet wird dessen Inhalt.
+    # Ein Inhalt, der nur aus z.B. `species={...}` besteht, bleibt unverändert.
+    if len(block.entries) == 1:
+        name, value = block.entries[0]
+        if isinstance(value, Node) and name not in _PORTRAIT_BLOCKS:
+            block = value
+    empire_key = block.get('key')
+    result = {'key': str(empire_key) if isinstance(empire_key, str) else None}
+    for field_name, path in PORTRAIT_PATHS.items():
+        portrait = block.find(path)
+        result[field_name] = str(portrait) if isinstance(portrait, str) else None
+    return result
 
 
-def split_into_empire_blocks(file_content): # Wiederverwendet
-    """Teilt den gesamten Dateiinhalt in Strings auf, die jeweils einen Imperiumsblock darstellen."""
-    empire_blocks_content = []
-    balance = 0
-    current_block_start_index = -1
-    for i, char in enumerate(file_content):
-        if char == '{':
-            if balance == 0:
-                current_block_start_index = i + 1
-            balance += 1
-        elif char == '}':
-            balance -= 1
-            if balance == 0 and current_block_start_index != -1:
-                empire_blocks_content.append(file_content[current_block_start_index:i])
-                current_block_start_index = -1
-            elif balance < 0: 
-                balance = 0 
-                current_block_start_index = -1
-    return empire_blocks_content
-
 def extract_portraits_data_from_file(filepath="user_empire_designs_v3.4.txt"):
     """
-    Liest die Stellaris User Empire Designs Datei, parst jedes Imperium
+    Liest die Stellaris User Empire Designs Datei über den gemeinsamen Parser
     und extrahiert Portrait-Instanzen (primär und sekundär).
     Gibt eine Liste von Dictionaries zurück: {'portrait_name': str, 'empire_key_ref': str}
     """
     try:
-        with open(filepath, 'r', encoding='utf-8-sig') as f:
-            content = f.read()
+        # Die Datei wird blockweise gestreamt, statt sie komplett einzulesen
+        return extract_portraits_data(iter_empires(filepath))
     except FileNotFoundError:
         return [] # Wird im Hauptteil behandelt
     except Exception as e:
         print(f"Fehler beim Lesen der Datei '{filepath}': {e}")
         return []
 
-    empire_block_strings = split_into_empire_blocks(content)
+def extract_portraits_data(empires):
+    """Extrahiert Portrait-Instanzen (primär und sekundär) aus bereits geparsten Imperien."""
     all_portrait_occurrences = []
     
-    for i, block_str in enumerate(empire_block_strings):
-        empire_details = parse_empire_portraits_and_key(block_str)
-        
-        raw_empire_key = empire_details.get('key')
+    for i, empire in enumerate(empires):
+        raw_empire_key = empire.key
         # Verwende einen Platzhalter, falls ein Imperiumsblock überraschenderweise keinen Key hat, aber Portraits liefert
         if raw_empire_key is None:
             raw_empire_key = f"UNKNOWN_KEY_BLOCK_{i+1}" 
 
-        if empire_details.get('primary_portrait'):
+        if empire.species and empire.species.portrait:
             all_portrait_occurrences.append({
-                'portrait_name': empire_details['primary_portrait'],
+                'portrait_name': empire.species.portrait,
                 'empire_key_ref': raw_empire_key 
             })
-        if empire_details.get('secondary_portrait'):
+        if empire.secondary_species and empire.secondary_species.portrait:
             all_portrait_occurrences.append({
-                'portrait_name': empire_details['secondary_portrait'],
+                'portrait_name': empire.secondary_species.portrait,
                 'empire_key_ref': f"secondary_{raw_empire_key}" # Präfix für sekundäre Spezies
             })
             
@@ -141,7 +117,7 @@ def write_portraits_csv(data_for_csv, output_filepath="portraits_report.csv"):
         return
 
     try:
-        with open(output_filepath, 'w', newline='', encoding='utf-8') as csvfile:
+        with open_atomic(output_filepath, newline='', encoding='utf-8') as csvfile:
             csv_writer = csv.writer(csvfile, delimiter=';')
             
             # Header: N;Name;Reiche
@@ -157,6 +133,18 @@ def write_portraits_csv(data_for_csv, output_filepath="portraits_report.csv"):
         print(f"\nCSV-Datei erfolgreich geschrieben: {output_filepath}")
     except IOError as e:
         print(f"Fehler beim Schreiben der CSV-Datei '{output_filepath}': {e}")
+        raise
+
+# === Report Plugin ===
+
+def generate_portraits_report(empires, output_filepath="portraits_report.csv"):
+    """
+    Erzeugt den Portrait-Bericht aus bereits geparsten Imperien.
+    Wird von update_empire_analysis.py aufgerufen, das die Datei nur einmal parst.
+    """
+    parsed_portrait_data = extract_portraits_data(empires)
+    grouped_by_portrait = group_by_portrait_name(parsed_portrait_data)
+    write_portraits_csv(prepare_portrait_data_for_csv(grouped_by_portrait), output_filepath)
 
 # === Main Execution ===
 if __name__ == "__main__":
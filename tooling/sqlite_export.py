@@ -0,0 +1,156 @@
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+
+from empire_cache import NEW_FILE_MODE, load_empires_cached
+
+# Export aller geparsten Imperien in normalisierte Tabellen einer SQLite-Datei.
+# Statt Keys aus den Semikolon-Zellen der CSV-Berichte herauszuparsen, können
+# Auswertungen direkt als SQL-Abfrage laufen, z.B.
+#   SELECT e.key FROM empires e JOIN civics c ON c.empire_id = e.id WHERE c.civic = 'civic_technocracy';
+
+SCHEMA = """
+CREATE TABLE empires (
+    id INTEGER PRIMARY KEY,          -- Position des Blocks in der Designs-Datei
+    name TEXT, key TEXT, adjective TEXT,
+    authority TEXT, government TEXT, origin TEXT, initializer TEXT,
+    ethics_mask INTEGER,             -- Bitmaske über StellarisEthic (siehe stellaris_ethics.py)
+    graphical_culture TEXT, city_graphical_culture TEXT, room TEXT,
+    planet_class TEXT, planet_name TEXT, system_name TEXT, ship_prefix TEXT, spawn_enabled TEXT
+);
+CREATE TABLE species (
+    empire_id INTEGER NOT NULL REFERENCES empires(id),
+    role TEXT NOT NULL,              -- 'primary' oder 'secondary'
+    class TEXT, portrait TEXT, name TEXT, plural TEXT, adjective TEXT, name_list TEXT, gender TEXT,
+    PRIMARY KEY (empire_id, role)
+);
+CREATE TABLE species_traits (
+    empire_id INTEGER NOT NULL REFERENCES empires(id), role TEXT NOT NULL, trait TEXT NOT NULL
+);
+CREATE TABLE rulers (
+    empire_id INTEGER PRIMARY KEY REFERENCES empires(id),
+    gender TEXT, portrait TEXT, leader_class TEXT, title TEXT
+);
+CREATE TABLE ruler_traits (empire_id INTEGER NOT NULL REFERENCES empires(id), trait TEXT NOT NULL);
+CREATE TABLE civics (empire_id INTEGER NOT NULL REFERENCES empires(id), civic TEXT NOT NULL);
+CREATE TABLE ethics (
+    empire_id INTEGER NOT NULL REFERENCES empires(id), ethic TEXT NOT NULL,
+    known INTEGER NOT NULL           -- 0 für Ethiken, die StellarisEthic nicht kennt
+);
+CREATE TABLE flags (
+    empire_id INTEGER PRIMARY KEY REFERENCES empires(id),
+    icon_category TEXT, icon_file TEXT, background_category TEXT, background_file TEXT
+);
+CREATE TABLE flag_colors (
+    empire_id INTEGER NOT NULL REFERENCES empires(id), position INTEGER NOT NULL, color TEXT NOT NULL
+);
+"""
+
+# Indizes werden erst nach dem Einfügen angelegt, das ist schneller als sie bei jedem Insert zu pflegen.
+INDEXES = """
+CREATE INDEX idx_empires_key ON empires(key);
+CREATE INDEX idx_empires_origin ON empires(origin);
+CREATE INDEX idx_empires_authority ON empires(authority);
+CREATE INDEX idx_empires_government ON empires(government);
+CREATE INDEX idx_species_portrait ON species(portrait);
+CREATE INDEX idx_species_class ON species(class);
+CREATE INDEX idx_species_traits_trait ON species_traits(trait, empire_id);
+CREATE INDEX idx_ruler_traits_trait ON ruler_traits(trait, empire_id);
+CREATE INDEX idx_civics_civic ON civics(civic, empire_id);
+CREATE INDEX idx_ethics_ethic ON ethics(ethic, empire_id);
+CREATE INDEX idx_ethics_empire ON ethics(empire_id);
+CREATE INDEX idx_civics_empire ON civics(empire_id);
+CREATE INDEX idx_species_traits_empire ON species_traits(empire_id);
+"""
+
+_EMPIRE_COLUMNS = ('name', 'key', 'adjective', 'authority', 'government', 'origin', 'initializer',
+                   'ethics_mask', 'graphical_culture', 'city_graphical_culture', 'room', 'planet_class',
+                   'planet_name', 'system_name', 'ship_prefix', 'spawn_enabled')
+
+# === Zeilen ===
+
+def empire_rows(empires):
+    """Zerlegt die Imperien in Zeilen pro Tabelle: {Tabelle: [Zeile, ...]}."""
+    rows = {table: [] for table in ('empires', 'species', 'species_traits', 'rulers', 'ruler_traits',
+                                    'civics', 'ethics', 'flags', 'flag_colors')}
+    for empire_id, empire in enumerate(empires):
+        rows['empires'].append((empire_id, *(getattr(empire, column) for column in _EMPIRE_COLUMNS)))
+        for role, species in (('primary', empire.species), ('secondary', empire.secondary_species)):
+            if species is None:
+                continue
+            rows['species'].append((empire_id, role, species.species_class, species.portrait, species.name,
+                                    species.plural, species.adjective, species.name_list, species.gender))
+            rows['species_traits'].extend((empire_id, role, trait) for trait in species.traits)
+        if empire.ruler is not None:
+            ruler = empire.ruler
+            rows['rulers'].append((empire_id, ruler.gender, ruler.portrait, ruler.leader_class, ruler.title))
+            rows['ruler_traits'].extend((empire_id, trait) for trait in ruler.traits)
+        rows['civics'].extend((empire_id, civic) for civic in empire.civics)
+        rows['ethics'].extend((empire_id, ethic.value, 1) for ethic in empire.ethics)
+        rows['ethics'].extend((empire_id, ethic, 0) for ethic in empire.unknown_ethics)
+        if empire.flag is not None:
+            flag = empire.flag
+            rows['flags'].append((empire_id, flag.icon_category, flag.icon_file,
+                                  flag.background_category, flag.background_file))
+            rows['flag_colors'].extend((empire_id, position, color) for position, color in enumerate(flag.colors))
+    return rows
+
+# === Export ===
+
+def write_database(output_filepath, schema, rows, indexes=""):
+    """
+    Baut eine neue SQLite-Datei aus `schema` und {Tabelle: [Zeilen]}. Alle Zeilen werden mit
+    executemany in einer einzigen Transaktion eingefügt, die Indizes erst danach angelegt.
+    Die Datei wird zuerst unter einem temporären Namen aufgebaut und erst danach an ihren
+    Platz verschoben, sodass Leser nie eine halb geschriebene Datenbank sehen. Die Rechte
+    entsprechen wie bei open_atomic denen einer mit open() angelegten Datei.
+    """
+    fd, temp_file_path = tempfile.mkstemp(dir=os.path.dirname(output_filepath) or '.',
+                                          prefix="." + os.path.basename(output_filepath) + "_tmp_")
+    os.close(fd)
+    try:
+        os.chmod(temp_file_path, NEW_FILE_MODE)
+        connection = sqlite3.connect(temp_file_path)
+        try:
+            # Die temporäre Datei wird bei einem Abbruch ohnehin verworfen
+            connection.execute("PRAGMA journal_mode = OFF")
+            connection.execute("PRAGMA synchronous = OFF")
+            connection.executescript(schema)
+            with connection:
+                for table, table_rows in rows.items():
+                    if table_rows:
+                        placeholders = ", ".join("?" * len(table_rows[0]))
+                        connection.executemany(f"INSERT INTO {table} VALUES ({placeholders})", table_rows)
+            connection.executescript(indexes)
+            connection.execute("ANALYZE")
+        finally:
+            connection.close()
+        os.replace(temp_file_path, output_filepath)
+        temp_file_path = None
+    finally:
+        if temp_file_path and os.path.exists(temp_file_path):
+            os.remove(temp_file_path)
+
+def export_sqlite(empires, output_filepath="empire_designs.sqlite"):
+    """Schreibt alle Imperien in eine neue SQLite-Datei (siehe write_database)."""
+    rows = empire_rows(empires)
+    write_database(output_filepath, SCHEMA, rows, INDEXES)
+    print(f"\nSQLite-Datenbank geschrieben: {output_filepath} ({len(rows['empires'])} Imperien)")
+
+# === Main Execution ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exportiert alle Imperien in eine SQLite-Datenbank.")
+    parser.add_argument("input", nargs="?", default="user_empire_designs_v3.4.txt",
+                        help="Pfad zur Designs-Datei (Standard: %(default)s)")
+    parser.add_argument("-o", "--output", default="empire_designs.sqlite",
+                        help="Ziel-Datenbank (Standard: %(default)s)")
+    args = parser.parse_args()
+
+    try:
+        empires, _ = load_empires_cached(args.input)
+    except FileNotFoundError:
+        print(f"Fehler: Datei '{args.input}' nicht gefunden.")
+        sys.exit(1)
+    export_sqlite(empires, args.output)
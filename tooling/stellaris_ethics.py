@@ -0,0 +1,120 @@
+from enum import Enum
+
+# Gemeinsame Ethik-Definition für alle Analyse-Skripte.
+# Jede Ethik besitzt ein Bit, sodass die Ethiken eines Imperiums als kleine
+# Ganzzahl (Bitmaske) gespeichert und verglichen werden können.
+
+class StellarisEthic(Enum):
+    # Xenophil vs. Xenophob
+    XIL = "ethic_xenophile"
+    FAN_XIL = "ethic_fanatic_xenophile"
+    XOB = "ethic_xenophobe"
+    FAN_XOB = "ethic_fanatic_xenophobe"
+
+    # Egalitär vs. Autoritär
+    EGA = "ethic_egalitarian"
+    FAN_EGA = "ethic_fanatic_egalitarian"
+    AUT = "ethic_authoritarian"
+    FAN_AUT = "ethic_fanatic_authoritarian"
+
+    # Materialistisch vs. Spiritualistisch
+    MAT = "ethic_materialist"
+    FAN_MAT = "ethic_fanatic_materialist"
+    SPI = "ethic_spiritualist"
+    FAN_SPI = "ethic_fanatic_spiritualist"
+
+    # Pazifist vs. Militarist
+    PAC = "ethic_pacifist"
+    FAN_PAC = "ethic_fanatic_pacifist"
+    MIL = "ethic_militarist"
+    FAN_MIL = "ethic_fanatic_militarist"
+
+    # Gestaltbewusstsein
+    GES = "ethic_gestalt_consciousness"
+
+    @classmethod
+    def from_string(cls, s):
+        try:
+            return cls(s)  # Sucht nach dem Wert (z.B. "ethic_xenophile")
+        except ValueError:
+            return None
+
+    def is_fanatic(self):
+        return self.name.startswith('FAN_')
+
+    def is_simple(self): # Nicht-fanatisch und nicht-gestalt
+        return not self.name.startswith('FAN_') and self != StellarisEthic.GES
+
+    @property
+    def bit(self):
+        return ETHIC_BITS[self]
+
+# Bit pro Ethik in Definitionsreihenfolge
+ETHIC_BITS = {ethic: 1 << i for i, ethic in enumerate(StellarisEthic)}
+_BIT_BY_STRING = {ethic.value: bit for ethic, bit in ETHIC_BITS.items()}
+
+def ethic_bit(ethic_str):
+    """Gibt das Bit zum Ethik-String (z.B. "ethic_xenophile") zurück, 0 bei unbekannten Ethiken."""
+    return _BIT_BY_STRING.get(ethic_str, 0)
+
+def mask_to_ethics(mask):
+    """Wandelt eine Bitmaske in die Liste der enthaltenen Ethiken (in Definitionsreihenfolge) um."""
+    return [ethic for ethic, bit in ETHIC_BITS.items() if mask & bit]
+
+# === Achsen, Kosten und gültige Kombinationen ===
+
+ETHIC_POINTS = 3 # Ethik-Punkte, die ein Imperium vergeben muss
+
+ETHIC_AXES = {
+    'XENO': (StellarisEthic.XIL, StellarisEthic.FAN_XIL, StellarisEthic.XOB, StellarisEthic.FAN_XOB),
+    'POLITIC': (StellarisEthic.EGA, StellarisEthic.FAN_EGA, StellarisEthic.AUT, StellarisEthic.FAN_AUT),
+    'INTERNAL': (StellarisEthic.MAT, StellarisEthic.FAN_MAT, StellarisEthic.SPI, StellarisEthic.FAN_SPI),
+    'WAR': (StellarisEthic.PAC, StellarisEthic.FAN_PAC, StellarisEthic.MIL, StellarisEthic.FAN_MIL),
+}
+AXIS_MASKS = {axis: sum(ethic.bit for ethic in ethics) for axis, ethics in ETHIC_AXES.items()}
+FANATIC_MASK = sum(ethic.bit for ethic in StellarisEthic if ethic.is_fanatic())
+SIMPLE_MASK = sum(ethic.bit for ethic in StellarisEthic if ethic.is_simple())
+GESTALT_MASK = StellarisEthic.GES.bit
+
+def ethic_cost(mask):
+    """Ethik-Kosten einer Bitmaske: einfach = 1, fanatisch = 2, Gestaltbewusstsein = 3."""
+    cost = (mask & SIMPLE_MASK).bit_count() + 2 * (mask & FANATIC_MASK).bit_count()
+    if mask & GESTALT_MASK:
+        cost += ETHIC_POINTS
+    return cost
+
+def _build_valid_ethic_combinations():
+    """Alle gültigen Kombinationen: höchstens eine Ethik pro Achse, Kosten ≤ 3, Gestalt nur allein."""
+    masks = [0]
+    for ethics in ETHIC_AXES.values():
+        masks = [mask | bit for mask in masks for bit in (0, *(ethic.bit for ethic in ethics))]
+    valid = {mask: ethic_cost(mask) for mask in masks if mask and ethic_cost(mask) <= ETHIC_POINTS}
+    valid[GESTALT_MASK] = ETHIC_POINTS
+    return valid
+
+# Bitmaske -> Kosten, für jede gültige Kombination (Nachschlagen in O(1))
+VALID_ETHIC_COMBINATIONS = _build_valid_ethic_combinations()
+# Gültige Kombinationen, die alle Ethik-Punkte ausschöpfen (wie sie im Spiel wählbar sind)
+FULL_ETHIC_COMBINATIONS = frozenset(
+    mask for mask, cost in VALID_ETHIC_COMBINATIONS.items() if cost == ETHIC_POINTS
+)
+
+def ethics_issue(mask):
+    """
+    Prüft eine Ethik-Bitmaske. Gibt None zurück, wenn die Kombination gültig ist,
+    sonst eine kurze Beschreibung des Problems.
+    """
+    if mask in VALID_ETHIC_COMBINATIONS:
+        return None
+    if not mask:
+        return "Keine Ethik"
+    if mask & GESTALT_MASK:
+        return "Gestaltbewusstsein mit weiteren Ethiken kombiniert"
+    for axis, axis_mask in AXIS_MASKS.items():
+        if (mask & axis_mask).bit_count() > 1:
+            return f"Mehrere Ethiken auf der Achse {axis}"
+    return f"Ethik-Kosten {ethic_cost(mask)} > {ETHIC_POINTS}"
+
+def mask_to_names(mask):
+    """Sortiertes Tupel der abgekürzten Ethik-Namen einer Bitmaske, z.B. ('AUT', 'FAN_MAT')."""
+    return tuple(sorted(ethic.name for ethic in mask_to_ethics(mask)))
@@ -0,0 +1,139 @@
+import argparse
+import random
+
+from stellaris_ethics import FULL_ETHIC_COMBINATIONS, mask_to_ethics
+
+# Erzeugt synthetische `user_empire_designs`-Dateien im Format des Spiels
+# (Tabs, CRLF, `"Name"=\n{ ... }`), z.B. für Benchmarks der Analyse-Skripte.
+
+ORIGINS = [
+    "origin_default", "origin_remnants", "origin_clone_army", "origin_void_dwellers",
+    "origin_shattered_ring", "origin_lost_colony", "origin_mechanists", "origin_syncretic_evolution",
+    "origin_life_seeded", "origin_post_apocalyptic", "origin_scion", "origin_necrophage",
+]
+AUTHORITIES = ["auth_democratic", "auth_oligarchic", "auth_dictatorial", "auth_imperial", "auth_corporate"]
+GOVERNMENTS = ["gov_representative_democracy", "gov_military_junta", "gov_star_empire", "gov_megachurch"]
+CIVICS = [
+    "civic_gospel_of_the_masses", "civic_corporate_hedonism", "civic_technocracy", "civic_meritocracy",
+    "civic_distinguished_admiralty", "civic_citizen_service", "civic_beacon_of_liberty",
+    "civic_imperial_cult", "civic_police_state", "civic_mining_guilds", "civic_agrarian_idyll",
+]
+TRAITS = [
+    "trait_intelligent", "trait_charismatic", "trait_traditional", "trait_deviants", "trait_unruly",
+    "trait_strong", "trait_industrious", "trait_thrifty", "trait_adaptive", "trait_nomadic",
+    "trait_rapid_breeders", "trait_slow_learners", "trait_solitary", "trait_sedentary",
+]
+SPECIES_CLASSES = {"HUM": "human", "MAM": "mam", "REP": "rep", "AVI": "avi", "FUN": "fun", "PLANT": "pla", "NECROID": "nec"}
+ROOMS = ["desert8_room", "ethic_spaceship_room", "personality_federation_builders", "military_room"]
+FLAG_COLORS = ["yellow", "off_white", "black", "red", "blue", "green", "null"]
+UNICODE_SUFFIXES = ["Ünïcødé", "Σύνταγμα", "帝国", "Содружество", "Ἀρχή", "🚀"]
+# Sortiert, damit derselbe Seed immer dieselbe Datei erzeugt
+_FULL_COMBINATIONS = sorted(FULL_ETHIC_COMBINATIONS)
+
+NEWLINE = "\r\n"
+
+
+def _loc(indent, key):
+    tabs = "\t" * indent
+    return f"{NEWLINE}{tabs}{{{NEWLINE}{tabs}\tkey=\"{key}\"{NEWLINE}{tabs}\tliteral=yes{NEWLINE}{tabs}}}"
+
+
+def _nested_variables(indent, depth, leaf):
+    """`key="%ADJ%" variables={ { key="adjective" value={ ... } } }`, `depth`-fach verschachtelt."""
+    tabs = "\t" * indent
+    if depth <= 0:
+        return f"{NEWLINE}{tabs}{{{NEWLINE}{tabs}\tkey=\"{leaf}\"{NEWLINE}{tabs}\tliteral=yes{NEWLINE}{tabs}}}"
+    return (f"{NEWLINE}{tabs}{{{NEWLINE}{tabs}\tkey=\"%ADJ%\"{NEWLINE}{tabs}\tvariables={NEWLINE}{tabs}\t{{"
+            f"{NEWLINE}{tabs}\t\t{NEWLINE}{tabs}\t\t{{{NEWLINE}{tabs}\t\t\tkey=\"adjective\"{NEWLINE}{tabs}\t\t\tvalue="
+            f"{_nested_variables(indent + 3, depth - 1, leaf)}"
+            f"{NEWLINE}{tabs}\t\t}}{NEWLINE} {NEWLINE}{tabs}\t}}{NEWLINE}{tabs}}}")
+
+
+def generate_empire(rng, index, nesting_depth=2, unicode_names=False):
+    """Erzeugt den Quelltext eines einzelnen, zufälligen Imperiums."""
+    name = f"Synthetic Empire {index}"
+    if unicode_names:
+        name += " " + rng.choice(UNICODE_SUFFIXES)
+    species_class, portrait_prefix = rng.choice(list(SPECIES_CLASSES.items()))
+    ethics = mask_to_ethics(rng.choice(_FULL_COMBINATIONS))
+    lines = [f"\"{name}\"=", "{", f"\tkey=\"{name}\""]
+    lines.append("\tship_prefix=" + _loc(1, "SYN"))
+    lines.append("\tspecies=" + NEWLINE + "\t{")
+    lines.append(f"\t\tclass=\"{species_class}\"")
+    lines.append(f"\t\tportrait=\"{portrait_prefix}{rng.randint(1, 20)}\"")
+    lines.append("\t\tspecies_name=" + _loc(2, f"Species {index}"))
+    lines.append("\t\tspecies_adjective=" + _nested_variables(2, nesting_depth, f"Adj {index}"))
+    lines.append("\t\tname_list=\"HUMAN1\"")
+    lines.append("\t\tgender=male")
+    for trait in rng.sample(TRAITS, rng.randint(1, 5)):
+        lines.append(f"\t\ttrait=\"{trait}\"")
+    lines.append("\t}")
+    lines.append("\tname=" + _loc(1, name))
+    lines.append(f"\tauthority=\"{rng.choice(AUTHORITIES)}\"")
+    lines.append(f"\tgovernment=\"{rng.choice(GOVERNMENTS)}\"")
+    lines.append("\tplanet_name=" + _loc(1, f"Planet {index}"))
+    lines.append("\tplanet_class=\"pc_continental\"")
+    lines.append("\tinitializer=\"\"")
+    lines.append("\tgraphical_culture=\"mammalian_01\"")
+    lines.append("\tempire_flag=" + NEWLINE + "\t{")
+    lines.append("\t\ticon=" + NEWLINE + "\t\t{" + NEWLINE + "\t\t\tcategory=\"humanity\"" + NEWLINE
+                 + f"\t\t\tfile=\"flag_humanity_{rng.randint(1, 40)}.dds\"" + NEWLINE + "\t\t}")
+    lines.append("\t\tcolors=" + NEWLINE + "\t\t{")
+    for color in rng.sample(FLAG_COLORS, 4):
+        lines.append(f"\t\t\t\"{color}\"")
+    lines.append("\t\t}")
+    lines.append("\t}")
+    lines.append("\truler=" + NEWLINE + "\t{")
+    lines.append("\t\tgender=male")
+    lines.append(f"\t\tportrait=\"{portrait_prefix}{rng.randint(1, 20)}\"")
+    lines.append("\t\tleader_class=\"official\"")
+    lines.append("\t}")
+    lines.append(f"\troom=\"{rng.choice(ROOMS)}\"")
+    lines.append("\tspawn_enabled=always")
+    for ethic in ethics:
+        lines.append(f"\tethic=\"{ethic.value}\"")
+    lines.append("\tcivics=" + NEWLINE + "\t{")
+    for civic in rng.sample(CIVICS, 2):
+        lines.append(f"\t\t\"{civic}\"")
+    lines.append("\t}")
+    lines.append(f"\torigin=\"{rng.choice(ORIGINS)}\"")
+    lines.append("}")
+    return NEWLINE.join(lines) + NEWLINE
+
+
+def _write_blank_lines(f, count, lines_per_write=65536):
+    block = NEWLINE * lines_per_write
+    full_writes, rest = divmod(count, lines_per_write)
+    for _ in range(full_writes):
+        f.write(block)
+    f.write(NEWLINE * rest)
+
+
+def write_synthetic_designs(filepath, empire_count, blank_lines=0, nesting_depth=2,
+                            unicode_names=False, seed=0):
+    """
+    Schreibt eine synthetische Designs-Datei mit `empire_count` Imperien. `blank_lines` leere
+    Zeilen werden gleichmäßig hinter die Imperien verteilt (wie die vom Spiel erzeugte Aufblähung).
+    Die Datei wird imperienweise geschrieben, der Speicherbedarf bleibt klein.
+    """
+    rng = random.Random(seed)
+    blank_per_gap, blank_rest = divmod(blank_lines, max(empire_count, 1))
+    with open(filepath, 'w', encoding='utf-8', newline='') as f:
+        for index in range(empire_count):
+            f.write(generate_empire(rng, index, nesting_depth, unicode_names))
+            _write_blank_lines(f, blank_per_gap)
+        _write_blank_lines(f, blank_rest)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Erzeugt eine synthetische user_empire_designs-Datei.")
+    parser.add_argument("output", help="Zieldatei")
+    parser.add_argument("--empires", type=int, default=1000, help="Anzahl der Imperien (Standard: %(default)s)")
+    parser.add_argument("--blank-lines", type=int, default=0, help="Anzahl zusätzlicher leerer Zeilen")
+    parser.add_argument("--depth", type=int, default=2, help="Verschachtelungstiefe der variables-Blöcke")
+    parser.add_argument("--unicode", action="store_true", help="Unicode-Zeichen in Imperiumsnamen verwenden")
+    parser.add_argument("--seed", type=int, default=0, help="Zufallsseed (Standard: %(default)s)")
+    args = parser.parse_args()
+
+    write_synthetic_designs(args.output, args.empires, args.blank_lines, args.depth, args.unicode, args.seed)
+    print(f"Synthetische Datei '{args.output}' mit {args.empires} Imperien geschrieben.")
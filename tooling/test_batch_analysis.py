@@ -0,0 +1,91 @@
+import csv
+import os
+import tempfile
+import unittest
+
+from batch_analysis import run_batch
+from empire_origin_analyser import generate_origins_report
+
+# Zwei sich überschneidende Designs-Dateien: "Alpha" ist in beiden gleich, "Beta" unterscheidet
+# sich in der Origin, "Gamma" gibt es nur in der zweiten Datei.
+FIRST_FILE = """"Alpha"=
+{
+\tkey="Alpha"
+\torigin="origin_default"
+}
+"Beta"=
+{
+\tkey="Beta"
+\torigin="origin_void_dwellers"
+}
+"""
+
+SECOND_FILE = """"Alpha"=
+{
+\tkey="Alpha"
+\torigin="origin_default"
+}
+"Beta"=
+{
+\tkey="Beta"
+\torigin="origin_remnants"
+}
+"Gamma"=
+{
+\tkey="Gamma"
+\torigin="origin_default"
+}
+"""
+
+
+def read_rows(filepath):
+    with open(filepath, newline='', encoding='utf-8') as csvfile:
+        return list(csv.reader(csvfile, delimiter=';'))[1:]
+
+
+class MergedReportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.files = []
+        for filename, text in (("first.txt", FIRST_FILE), ("second.txt", SECOND_FILE)):
+            filepath = os.path.join(self.directory.name, filename)
+            with open(filepath, 'w', encoding='utf-8') as f:
+                f.write(text)
+            self.files.append(filepath)
+        self.output_dir = os.path.join(self.directory.name, "reports")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_batch(self):
+        plugins = [("origins", generate_origins_report, "origins_report.csv")]
+        return run_batch(self.files, self.output_dir, jobs=1, plugins=plugins)
+
+    def test_merged_counts_overlapping_files_once(self):
+        results, merged, merged_failed = self.run_batch()
+        self.assertEqual(merged_failed, [])
+        self.assertEqual([result[3] for result in results], [None, None])
+        self.assertEqual(sorted(empire.key for empire in merged), ["Alpha", "Beta", "Beta#2", "Gamma"])
+
+        origins = read_rows(os.path.join(self.output_dir, "merged", "origins_report.csv"))
+        self.assertEqual(origins, [
+            ["2", "origin_default", "Alpha;Gamma"],
+            ["1", "origin_remnants", "Beta#2"],
+            ["1", "origin_void_dwellers", "Beta"],
+        ])
+
+    def test_sources_list_every_variant(self):
+        self.run_batch()
+        sources = read_rows(os.path.join(self.output_dir, "merged", "empire_sources.csv"))
+        first, second = self.files
+        self.assertEqual(sources, [
+            ["2", "Alpha", ";".join(sorted([first, second]))],
+            ["1", "Beta", first],
+            ["1", "Beta#2", second],
+            ["1", "Gamma", second],
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
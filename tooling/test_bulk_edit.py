@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+
+from bulk_edit import bulk_edit_file, parse_rule
+
+# "Alpha" enthält ein ungültiges UTF-8-Byte (\xff) im Adjektiv, "Beta" wird nicht geändert.
+DESIGNS_FILE = (
+    b'"Alpha"=\r\n'
+    b'{\r\n'
+    b'\tkey="Alpha"\r\n'
+    b'\tadjective="Alph\xffan"\r\n'
+    b'\torigin="origin_default"\r\n'
+    b'}\r\n'
+    b'"Beta"=\r\n'
+    b'{\r\n'
+    b'\tkey="Beta\xff"\r\n'
+    b'\torigin="origin_remnants"\r\n'
+    b'}\r\n'
+)
+
+
+class InvalidUtf8Test(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.designs_filepath = os.path.join(self.directory.name, "designs.txt")
+        with open(self.designs_filepath, 'wb') as f:
+            f.write(DESIGNS_FILE)
+        self.output_filepath = os.path.join(self.directory.name, "edited.txt")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_invalid_bytes_are_kept(self):
+        rules = [parse_rule("origin: origin_default -> origin_void_dwellers")]
+        edited_blocks, counts = bulk_edit_file(self.designs_filepath, self.output_filepath, rules)
+        self.assertEqual((edited_blocks, counts), (1, [[1, 1]]))
+        with open(self.output_filepath, 'rb') as f:
+            edited = f.read()
+        self.assertIn(b'\tadjective="Alph\xffan"\r\n', edited)
+        self.assertIn(b'\torigin="origin_void_dwellers"\r\n', edited)
+        self.assertTrue(edited.endswith(DESIGNS_FILE[DESIGNS_FILE.index(b'"Beta"'):]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+
+from compact_designs import compact_file
+from design_diff import diff_designs
+
+# Wie vom Spiel geschrieben: CRLF als Zeilenende, in species_bio zusätzlich ein einzelnes CR
+# vor dem Zeilenumbruch (wie beim "Cult of Dioa" in der mitgelieferten Datei).
+DESIGNS_FILE = (
+    b'"Alpha"=\r\n'
+    b'{\r\n'
+    b'\tkey="Alpha"\r\n'
+    b'\tspecies=\r\n'
+    b'\t{\r\n'
+    b'\t\tspecies_bio="Erste Zeile\r\r\nZweite Zeile\rDritte"\r\n'
+    b'\t}\r\n'
+    b'}\r\n'
+)
+
+
+class CompactLosslessTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.designs_filepath = os.path.join(self.directory.name, "designs.txt")
+        with open(self.designs_filepath, 'wb') as f:
+            f.write(DESIGNS_FILE)
+        self.compact_filepath = os.path.join(self.directory.name, "compact.txt")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_carriage_returns_in_strings_are_kept(self):
+        self.assertEqual(compact_file(self.designs_filepath, self.compact_filepath), 1)
+        with open(self.compact_filepath, 'rb') as f:
+            compact = f.read()
+        self.assertIn(b'species_bio="Erste Zeile\r\r\nZweite Zeile\rDritte"', compact)
+        self.assertTrue(compact.endswith(b'}}\r\n'))
+
+    def test_compact_file_has_no_semantic_changes(self):
+        compact_file(self.designs_filepath, self.compact_filepath)
+        result = diff_designs(self.designs_filepath, self.compact_filepath)
+        self.assertEqual((result['added'], result['removed'], result['modified']), ([], [], {}))
+        self.assertEqual(result['unchanged'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
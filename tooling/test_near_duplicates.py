@@ -0,0 +1,36 @@
+import random
+import unittest
+
+from empire_designs import parse_empires
+from near_duplicates import MAX_BUCKET_SIZE, NUM_BANDS, find_near_duplicates
+from synthetic_designs import generate_empire
+
+
+def synthetic_empires(count):
+    rng = random.Random(0)
+    return parse_empires(''.join(generate_empire(rng, index) for index in range(count)))
+
+
+class CandidateGrowthTest(unittest.TestCase):
+
+    def test_candidates_grow_about_linearly(self):
+        # Zufällige Imperien ähneln sich zu 0.2-0.4; bei quadratischem Aufwand wären es viermal so viele
+        _, candidates_small = find_near_duplicates(synthetic_empires(250))
+        _, candidates_large = find_near_duplicates(synthetic_empires(500))
+        self.assertLess(candidates_large, 3 * candidates_small)
+        self.assertLessEqual(candidates_large, NUM_BANDS * (MAX_BUCKET_SIZE - 1) * 500)
+
+
+class ExactCopiesTest(unittest.TestCase):
+
+    def test_copies_beyond_bucket_size_are_found(self):
+        block = generate_empire(random.Random(0), 0)
+        count = MAX_BUCKET_SIZE + 2
+        empires = parse_empires(''.join(block.replace("Synthetic Empire 0", f"Copy {i}") for i in range(count)))
+        duplicates, _ = find_near_duplicates(empires)
+        self.assertEqual(len(duplicates), count * (count - 1) // 2)
+        self.assertTrue(all(similarity == 1.0 for similarity, *_ in duplicates))
+
+
+if __name__ == "__main__":
+    unittest.main()
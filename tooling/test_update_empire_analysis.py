@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+
+from empire_cache import open_atomic
+from field_reports import write_field_csv
+from update_empire_analysis import manifest_path_for, read_manifest, run_reports
+
+DESIGNS_FILE = """"Alpha"=
+{
+\tkey="Alpha"
+\torigin="origin_default"
+}
+"""
+
+
+def generate_nothing(empires, output_filepath):
+    """Wie die Berichte ohne Daten: schreibt keine Datei."""
+    print("Keine Daten zum Schreiben in CSV vorhanden.")
+
+
+def generate_count(empires, output_filepath):
+    with open_atomic(output_filepath, encoding='utf-8') as f:
+        f.write(f"{len(empires)}\n")
+
+
+def generate_unwritable(empires, output_filepath):
+    """Schreibt in ein Verzeichnis, das es nicht gibt."""
+    write_field_csv([(len(empires), "value", ["Alpha"])], os.path.join(output_filepath, "missing", "report.csv"))
+
+
+class UpToDateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.designs_filepath = os.path.join(self.directory.name, "designs.txt")
+        with open(self.designs_filepath, 'w', encoding='utf-8') as f:
+            f.write(DESIGNS_FILE)
+        self.count_filepath = os.path.join(self.directory.name, "count.csv")
+        self.plugins = [
+            ("nothing", generate_nothing, os.path.join(self.directory.name, "nothing.csv")),
+            ("count", generate_count, self.count_filepath),
+        ]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_stages(self):
+        timings, _, failed = run_reports(self.designs_filepath, plugins=self.plugins)
+        self.assertEqual(failed, set())
+        return [stage_name for stage_name, _ in timings[1:]]
+
+    def test_report_without_output_stays_current(self):
+        self.assertEqual(self.run_stages(), ["nothing", "count"])
+        self.assertEqual(self.run_stages(), [])
+
+    def test_deleted_output_is_rebuilt(self):
+        self.run_stages()
+        os.remove(self.count_filepath)
+        self.assertEqual(self.run_stages(), ["count"])
+        self.assertTrue(os.path.exists(self.count_filepath))
+
+    def test_changed_designs_rebuild_every_report(self):
+        self.run_stages()
+        with open(self.designs_filepath, 'a', encoding='utf-8') as f:
+            f.write('"Beta"=\n{\n\tkey="Beta"\n}\n')
+        self.assertEqual(self.run_stages(), ["nothing", "count"])
+
+    def test_failed_write_is_not_recorded(self):
+        plugin = ("unwritable", generate_unwritable, os.path.join(self.directory.name, "unwritable"))
+        for _ in range(2):
+            timings, _, failed = run_reports(self.designs_filepath, plugins=[plugin])
+            self.assertEqual(failed, {"unwritable"})
+            self.assertEqual([stage_name for stage_name, _ in timings[1:]], ["unwritable"])
+        manifest = read_manifest(manifest_path_for(self.designs_filepath))
+        self.assertNotIn(os.path.abspath(plugin[2]), manifest['reports'])
+
+
+if __name__ == "__main__":
+    unittest.main()
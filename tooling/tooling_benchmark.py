@@ -0,0 +1,147 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from empire_designs import load_empires
+from empty_lines import process_bytes
+from synthetic_designs import write_synthetic_designs
+from update_empire_analysis import REPORT_PLUGINS
+
+# Benchmark der gesamten Analyse-Pipeline auf synthetischen Designs-Dateien:
+# misst Parsen, jeden Bericht und das Entfernen leerer Zeilen und schreibt die
+# Ergebnisse (Zeit, Durchsatz, Spitzen-Speicher) als JSON, damit Regressionen
+# zwischen zwei Ständen der Tools vergleichbar sind.
+
+DEFAULT_OUTPUT = "benchmark_results.json"
+
+# === Messung ===
+
+def best_time(function, repeats):
+    """Führt `function` `repeats`-mal aus und gibt (beste Zeit in Sekunden, letztes Ergebnis) zurück."""
+    best = float('inf')
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def peak_memory(function):
+    """Spitzen-Speicher (Bytes, Python-Allokationen) eines einzelnen Aufrufs, gemessen mit tracemalloc."""
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def clean_empty_lines(input_filepath, output_filepath):
+    with open(input_filepath, 'rb') as reader, open(output_filepath, 'wb') as writer:
+        process_bytes(reader, writer)
+
+# === Stufen ===
+
+def benchmark_file(designs_filepath, work_dir, repeats, measure_memory):
+    """Misst alle Stufen auf einer Datei und gibt eine Liste von Stufen-Ergebnissen zurück."""
+    file_size = os.path.getsize(designs_filepath)
+    stages = []
+
+    def record(stage_name, function, input_bytes):
+        seconds, result = best_time(function, repeats)
+        stage = {
+            'stage': stage_name,
+            'seconds': seconds,
+            'mb_per_second': input_bytes / seconds / 1e6 if seconds else None,
+        }
+        if measure_memory:
+            stage['peak_memory_bytes'] = peak_memory(function)
+        stages.append(stage)
+        return result
+
+    empires = record('parse', lambda: load_empires(designs_filepath), file_size)
+    for stage_name, generate_report, output_filename in REPORT_PLUGINS:
+        output_filepath = os.path.join(work_dir, output_filename)
+        # Die Berichte geben Fortschrittsmeldungen aus, die die Messung nicht stören sollen
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            record(stage_name, lambda: generate_report(empires, output_filepath), file_size)
+    cleaned_filepath = os.path.join(work_dir, "cleaned.txt")
+    record('empty_lines', lambda: clean_empty_lines(designs_filepath, cleaned_filepath), file_size)
+    return len(empires), file_size, stages
+
+def run_benchmark(empire_counts, blank_lines=0, nesting_depth=2, unicode_names=False, seed=0,
+                  repeats=3, measure_memory=True):
+    """
+    Erzeugt für jede Imperiumsanzahl eine synthetische Datei in einem temporären Verzeichnis,
+    misst alle Stufen und gibt die Ergebnisse als JSON-fähiges Dictionary zurück.
+    """
+    results = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {
+            'blank_lines': blank_lines,
+            'nesting_depth': nesting_depth,
+            'unicode_names': unicode_names,
+            'seed': seed,
+            'repeats': repeats,
+        },
+        'runs': [],
+    }
+    work_dir = tempfile.mkdtemp(prefix="empire_benchmark_")
+    try:
+        for empire_count in empire_counts:
+            designs_filepath = os.path.join(work_dir, f"designs_{empire_count}.txt")
+            write_synthetic_designs(designs_filepath, empire_count, blank_lines, nesting_depth,
+                                    unicode_names, seed)
+            parsed_count, file_size, stages = benchmark_file(designs_filepath, work_dir, repeats,
+                                                             measure_memory)
+            if parsed_count != empire_count:
+                print(f"Warnung: {parsed_count} statt {empire_count} Imperien geparst.")
+            results['runs'].append({'empires': empire_count, 'file_bytes': file_size, 'stages': stages})
+            print_run(empire_count, file_size, stages)
+            os.remove(designs_filepath)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+def print_run(empire_count, file_size, stages):
+    print(f"\n{empire_count} Imperien, {file_size / 1e6:.1f} MB:")
+    for stage in stages:
+        line = f"  {stage['stage']:<14}{stage['seconds'] * 1000:10.1f} ms"
+        if stage['mb_per_second'] is not None:
+            line += f"{stage['mb_per_second']:10.1f} MB/s"
+        if 'peak_memory_bytes' in stage:
+            line += f"{stage['peak_memory_bytes'] / 1e6:10.1f} MB Spitze"
+        print(line)
+
+def write_results(results, output_filepath=DEFAULT_OUTPUT):
+    with open(output_filepath, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
+    print(f"\nErgebnisse geschrieben: {output_filepath}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark der Analyse-Pipeline auf synthetischen Designs-Dateien.")
+    parser.add_argument("--empires", type=int, nargs="+", default=[100, 1000, 10000],
+                        help="Anzahl der Imperien pro Messung (Standard: %(default)s)")
+    parser.add_argument("--blank-lines", type=int, default=0,
+                        help="Zusätzliche leere Zeilen pro Datei (z.B. 2000000)")
+    parser.add_argument("--depth", type=int, default=2, help="Verschachtelungstiefe der variables-Blöcke")
+    parser.add_argument("--unicode", action="store_true", help="Unicode-Zeichen in Imperiumsnamen verwenden")
+    parser.add_argument("--seed", type=int, default=0, help="Zufallsseed (Standard: %(default)s)")
+    parser.add_argument("--repeats", type=int, default=3, help="Wiederholungen pro Stufe (bestes Ergebnis zählt)")
+    parser.add_argument("--no-memory", action="store_true", help="Spitzen-Speicher nicht messen (schneller)")
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT, help="JSON-Ausgabedatei (Standard: %(default)s)")
+    args = parser.parse_args()
+
+    if any(count < 1 for count in args.empires):
+        print("Fehler: --empires erwartet positive Anzahlen.")
+        sys.exit(1)
+    write_results(run_benchmark(args.empires, args.blank_lines, args.depth, args.unicode, args.seed,
+                                args.repeats, not args.no_memory), args.output)
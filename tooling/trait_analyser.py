@@ -0,0 +1,235 @@
+import argparse
+import csv
+import os
+import sys
+
+from bitset_matrix import intersection_counts
+from empire_cache import open_atomic
+from empire_designs import load_empires
+
+# Analyse der Spezies-Traits (species und secondary_species).
+# Die Inzidenzmatrix Spezies × Trait wird als Ganzzahl-Bitsets gespeichert: pro Trait eine
+# Spalte (Bit i = Zeile i enthält den Trait) und pro Zeile eine Bitmaske über die Trait-IDs.
+# Anzahlen sind dann ein popcount je Spalte, die Kookkurrenz (AᵀA ohne Diagonale) ist
+# popcount(Spalte_a & Spalte_b) je Trait-Paar (bitset_matrix.intersection_counts), und die
+# Punkteprüfung summiert pro Kostenstufe popcount(Zeile & Kostenmaske) statt über einzelne
+# Traits zu iterieren.
+
+# Trait-Kosten und Wählbarkeit (Trait;Kosten;Waehlbar;Geschaetzt), liegt im Repository.
+# Zeilen mit Geschaetzt=1 sind nicht aus den Trait-Definitionen des Spiels übernommen;
+# diese Traits gehen nicht in die Punkteprüfung ein.
+TRAIT_COSTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "trait_costs.csv")
+
+# Regeln der Spezies-Erstellung: verfügbare Trait-Punkte und maximale Anzahl gewählter Traits
+TRAIT_POINTS = 2
+MAX_TRAIT_PICKS = 5
+
+# === Kostentabelle ===
+
+def load_trait_costs(filepath=TRAIT_COSTS_FILE):
+    """
+    Liest die Kostentabelle. Gibt {Trait: (Kosten, wählbar, geschätzt)} zurück; ohne Spalte
+    `Geschaetzt` gelten alle Kosten als gesichert.
+    """
+    costs = {}
+    with open(filepath, 'r', newline='', encoding='utf-8') as csvfile:
+        for row in csv.DictReader(csvfile, delimiter=';'):
+            costs[row['Trait']] = (int(row['Kosten']), row['Waehlbar'] == '1', row.get('Geschaetzt') == '1')
+    return costs
+
+# === Inzidenzmatrix ===
+
+class TraitMatrix:
+    """
+    Spezies × Trait als Bitsets. `rows[i]` ist die Trait-Maske der Zeile i (Bit j = traits[j]),
+    `columns[j]` die Zeilen-Maske des Traits j (Bit i = labels[i]).
+    """
+    __slots__ = ('labels', 'traits', 'rows', 'columns')
+
+    def __init__(self, labels, traits, rows, columns):
+        self.labels = labels
+        self.traits = traits
+        self.rows = rows
+        self.columns = columns
+
+    def counts(self):
+        """Anzahl Zeilen je Trait (Spaltensummen)."""
+        return [column.bit_count() for column in self.columns]
+
+    def cooccurrence(self):
+        """
+        Obere Dreiecksmatrix von AᵀA ohne Diagonale: {(a, b): Anzahl} für alle Paare mit Anzahl > 0,
+        berechnet als popcount(Spalte_a & Spalte_b) über die Bitset-Spalten.
+        """
+        return intersection_counts(dict(zip(self.traits, self.columns)))
+
+def species_rows(empires):
+    """(Bezeichnung, Traits) je Spezies; sekundäre Spezies erhalten wie im Portrait-Bericht das Präfix 'secondary_'."""
+    for i, empire in enumerate(empires):
+        empire_key = empire.key if empire.key is not None else f"UNKNOWN_KEY_BLOCK_{i+1}"
+        if empire.species and empire.species.traits:
+            yield empire_key, empire.species.traits
+        if empire.secondary_species and empire.secondary_species.traits:
+            yield f"secondary_{empire_key}", empire.secondary_species.traits
+
+def build_trait_matrix(empires):
+    """Baut die Inzidenzmatrix in einem Durchlauf über alle Spezies."""
+    labels, rows = [], []
+    trait_ids = {}
+    column_lists = []
+    for row, (label, traits) in enumerate(species_rows(empires)):
+        mask = 0
+        for trait in traits:
+            trait_id = trait_ids.get(trait)
+            if trait_id is None:
+                trait_id = trait_ids[trait] = len(column_lists)
+                column_lists.append([])
+            if not mask >> trait_id & 1:
+                mask |= 1 << trait_id
+                column_lists[trait_id].append(row)
+        labels.append(label)
+        rows.append(mask)
+    columns = [sum(1 << row for row in column_rows) for column_rows in column_lists]
+    return TraitMatrix(labels, list(trait_ids), rows, columns)
+
+# === Validierung ===
+
+def find_trait_violations(matrix, trait_costs, points=TRAIT_POINTS, max_picks=MAX_TRAIT_PICKS):
+    """
+    Prüft jede Spezies gegen die Kostentabelle.
+
+    Spezies mit Traits, die nicht in der Kostentabelle stehen oder dort nur geschätzte Kosten
+    haben, werden nicht auf Punkte und Anzahl geprüft, da ihre Summe unvollständig bzw. nicht
+    belegt wäre; sie werden getrennt zurückgegeben.
+
+    Returns:
+        tuple: (Verstöße als (Bezeichnung, Kosten, Picks, Problem) für jede Spezies mit zu vielen
+                Punkten oder Traits, ungeprüfte als (Bezeichnung, [unbekannte/geschätzte Traits]))
+    """
+    cost_masks = {}
+    pickable_mask = 0
+    known_mask = 0
+    for trait_id, trait in enumerate(matrix.traits):
+        if trait not in trait_costs:
+            continue
+        cost, pickable, estimated = trait_costs[trait]
+        if estimated:
+            continue
+        known_mask |= 1 << trait_id
+        if pickable:
+            pickable_mask |= 1 << trait_id
+            cost_masks[cost] = cost_masks.get(cost, 0) | 1 << trait_id
+    unknown_mask = ((1 << len(matrix.traits)) - 1) & ~known_mask
+
+    violations, unknown = [], []
+    for row, mask in enumerate(matrix.rows):
+        if mask & unknown_mask:
+            unknown.append((matrix.labels[row], [trait for trait_id, trait in enumerate(matrix.traits)
+                                                 if (mask & unknown_mask) >> trait_id & 1]))
+            continue
+        cost = sum(cost * (mask & cost_mask).bit_count() for cost, cost_mask in cost_masks.items())
+        picks = (mask & pickable_mask).bit_count()
+        problems = []
+        if cost > points:
+            problems.append(f"{cost} Trait-Punkte (erlaubt: {points})")
+        if picks > max_picks:
+            problems.append(f"{picks} gewählte Traits (erlaubt: {max_picks})")
+        if problems:
+            violations.append((matrix.labels[row], cost, picks, "; ".join(problems)))
+    return violations, unknown
+
+# === CSV Output ===
+
+def write_traits_csv(matrix, trait_costs, output_filepath="traits_report.csv"):
+    """
+    Schreibt N;Trait;Kosten;Geschaetzt;Reiche, sortiert nach Trait. Kosten und Geschaetzt bleiben
+    leer, wenn der Trait unbekannt ist.
+    """
+    with open_atomic(output_filepath, newline='', encoding='utf-8') as csvfile:
+        csv_writer = csv.writer(csvfile, delimiter=';')
+        csv_writer.writerow(['N', 'Trait', 'Kosten', 'Geschaetzt', 'Reiche'])
+        for trait_id, trait in sorted(enumerate(matrix.traits), key=lambda item: item[1]):
+            column = matrix.columns[trait_id]
+            labels = [label for row, label in enumerate(matrix.labels) if column >> row & 1]
+            cost, _, estimated = trait_costs.get(trait, ('', None, None))
+            estimated = '' if estimated is None else int(estimated)
+            csv_writer.writerow([column.bit_count(), trait, cost, estimated, ";".join(sorted(labels))])
+    print(f"\nCSV-Datei erfolgreich geschrieben: {output_filepath}")
+
+def write_cooccurrence_csv(pairs, output_filepath="trait_cooccurrence.csv"):
+    """Schreibt N;Trait A;Trait B für jedes gemeinsam auftretende Trait-Paar."""
+    with open_atomic(output_filepath, newline='', encoding='utf-8') as csvfile:
+        csv_writer = csv.writer(csvfile, delimiter=';')
+        csv_writer.writerow(['N', 'Trait A', 'Trait B'])
+        for (trait_a, trait_b), count in sorted((tuple(sorted(pair)), count) for pair, count in pairs.items()):
+            csv_writer.writerow([count, trait_a, trait_b])
+    print(f"\nCSV-Datei erfolgreich geschrieben: {output_filepath}")
+
+def write_violations_csv(violations, output_filepath="trait_violations.csv"):
+    with open_atomic(output_filepath, newline='', encoding='utf-8') as csvfile:
+        csv_writer = csv.writer(csvfile, delimiter=';')
+        csv_writer.writerow(['Reich', 'Kosten', 'Picks', 'Problem'])
+        csv_writer.writerows(violations)
+    print(f"\nCSV-Datei erfolgreich geschrieben: {output_filepath}")
+
+def write_unknown_traits_csv(unknown, output_filepath="trait_unknown.csv"):
+    """Schreibt Reich;Ungepruefte Traits für jede Spezies, die nicht geprüft werden konnte."""
+    with open_atomic(output_filepath, newline='', encoding='utf-8') as csvfile:
+        csv_writer = csv.writer(csvfile, delimiter=';')
+        csv_writer.writerow(['Reich', 'Ungepruefte Traits'])
+        for label, traits in unknown:
+            csv_writer.writerow([label, ";".join(traits)])
+    print(f"\nCSV-Datei erfolgreich geschrieben: {output_filepath}")
+
+def write_trait_reports(matrix, trait_costs, violations, unknown, output_filepath="traits_report.csv"):
+    """Schreibt alle Trait-Berichte aus einer bereits gebauten Matrix und geprüften Verstößen."""
+    output_dir = os.path.dirname(output_filepath)
+    write_traits_csv(matrix, trait_costs, output_filepath)
+    write_cooccurrence_csv(matrix.cooccurrence(), os.path.join(output_dir, "trait_cooccurrence.csv"))
+    write_violations_csv(violations, os.path.join(output_dir, "trait_violations.csv"))
+    write_unknown_traits_csv(unknown, os.path.join(output_dir, "trait_unknown.csv"))
+
+# === Report Plugin ===
+
+def generate_traits_report(empires, output_filepath="traits_report.csv", trait_costs=None):
+    """
+    Erzeugt den Trait-Bericht aus bereits geparsten Imperien. Kookkurrenz, Regelverstöße und
+    Spezies mit Traits außerhalb der Kostentabelle oder mit geschätzten Kosten werden als trait_cooccurrence.csv,
+    trait_violations.csv und trait_unknown.csv daneben geschrieben.
+    """
+    if trait_costs is None:
+        trait_costs = load_trait_costs()
+    matrix = build_trait_matrix(empires)
+    violations, unknown = find_trait_violations(matrix, trait_costs)
+    write_trait_reports(matrix, trait_costs, violations, unknown, output_filepath)
+
+# === Main Execution ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analysiert die Spezies-Traits und prüft Trait-Punkte und -Anzahl.")
+    parser.add_argument("input", nargs="?", default="user_empire_designs_v3.4.txt",
+                        help="Pfad zur Designs-Datei (Standard: %(default)s)")
+    parser.add_argument("-o", "--output", default="traits_report.csv", help="Zieldatei (Standard: %(default)s)")
+    parser.add_argument("--costs", default=TRAIT_COSTS_FILE, help="Kostentabelle (Standard: data/trait_costs.csv)")
+    parser.add_argument("--show-unknown", action="store_true",
+                        help="Auch ungeprüfte Spezies (Traits außerhalb der Kostentabelle oder geschätzt) einzeln melden")
+    args = parser.parse_args()
+
+    try:
+        empires = load_empires(args.input)
+        costs_table = load_trait_costs(args.costs)
+    except FileNotFoundError as e:
+        print(f"Fehler: Datei '{e.filename}' nicht gefunden.")
+        sys.exit(1)
+
+    trait_matrix = build_trait_matrix(empires)
+    print(f"{len(trait_matrix.labels)} Spezies mit {len(trait_matrix.traits)} verschiedenen Traits gefunden.")
+    trait_violations, unknown_traits = find_trait_violations(trait_matrix, costs_table)
+    for label, cost, picks, problem in trait_violations:
+        print(f"Warnung: Spezies '{label}': {problem}")
+    if args.show_unknown:
+        for label, traits in unknown_traits:
+            print(f"Hinweis: Spezies '{label}' nicht geprüft, unbekannte oder geschätzte Kosten: {', '.join(traits)}")
+    elif unknown_traits:
+        print(f"Hinweis: {len(unknown_traits)} Spezies mit unbekannten oder geschätzten Trait-Kosten nicht geprüft "
+              f"(--show-unknown zeigt sie an).")
+    write_trait_reports(trait_matrix, costs_table, trait_violations, unknown_traits, args.output)
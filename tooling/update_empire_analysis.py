@@ -1,44 +1,353 @@
-import subprocess
-import sys
+import argparse
+import functools
+import json
 import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from cooccurrence_analyser import generate_cooccurrence_reports
+from empire_cache import file_hash, load_empires_cached, open_atomic
+from empire_list import generate_ethics_report
+from empire_origin_analyser import generate_origins_report
+from empire_system_analyser import generate_initializers_report
+from empty_lines import blank_line_ratio, clean_file_in_place
+from field_reports import DEFAULT_FIELD_PATHS, compile_field_path, generate_field_reports
+from file_watcher import watch_file
+from near_duplicates import generate_near_duplicates_report
+from rule_validator import RULES_FILE, generate_rule_violations_report
+from species_analyser import generate_portraits_report
+from sqlite_export import export_sqlite
+from trait_analyser import TRAIT_COSTS_FILE, generate_traits_report
+
+# Report plugins: (stage name, generator, output file).
+# Each generator receives the already parsed empire list and writes its CSV.
+REPORT_PLUGINS = [
+    ("ethics", generate_ethics_report, "ethics_combinations_report.csv"),
+    ("origins", generate_origins_report, "origins_report.csv"),
+    ("initializers", generate_initializers_report, "initializers_report.csv"),
+    ("portraits", generate_portraits_report, "portraits_report.csv"),
+    ("traits", generate_traits_report, "traits_report.csv"),
+    ("rules", generate_rule_violations_report, "rule_violations.csv"),
+    ("near_duplicates", generate_near_duplicates_report, "near_duplicates.csv"),
+]
+
+# Inputs of each report besides the designs file: (generator version, data files).
+# Bump a version whenever its generator's output changes, so existing reports are rebuilt.
+# Stages not listed here (e.g. the optional fields/sqlite exports) use version 1 and no data files.
+REPORT_INPUTS = {
+    "ethics": (1, ()),
+    "origins": (1, ()),
+    "initializers": (1, ()),
+    "portraits": (1, ()),
+    "traits": (3, (TRAIT_COSTS_FILE,)),
+    "rules": (1, (RULES_FILE,)),
+    "near_duplicates": (3, ()),
+}
+
+# Files a report writes next to its output file. They are checked like the output itself,
+# so deleting or editing one of them rebuilds the report.
+REPORT_SIDE_OUTPUTS = {
+    "traits": ("trait_cooccurrence.csv", "trait_violations.csv", "trait_unknown.csv"),
+}
+
+# Bump when the manifest layout changes; older manifests are then ignored.
+MANIFEST_VERSION = 2
+
+# Parsed empires shared read-only with the worker processes (set by _init_worker)
+_worker_empires = None
+
+def _init_worker(empires):
+    global _worker_empires
+    _worker_empires = empires
+
+def _run_plugin(plugin, empires=None):
+    """Runs one report plugin and returns (stage name, seconds, succeeded)."""
+    stage_name, generate_report, output_filepath = plugin
+    start = time.perf_counter()
+    try:
+        generate_report(empires if empires is not None else _worker_empires, output_filepath)
+    except Exception as e:
+        print(f"Report '{stage_name}' failed: {e}")
+        return stage_name, time.perf_counter() - start, False
+    return stage_name, time.perf_counter() - start, True
+
+# === Up-to-date checks ===
+
+def manifest_path_for(filepath):
+    """The manifest lives next to the designs file: `<file>.manifest`."""
+    return filepath + ".manifest"
+
+def read_manifest(manifest_path):
+    """Reads the manifest; a missing, damaged or outdated manifest yields an empty one."""
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest
+
+def write_manifest(manifest_path, manifest):
+    with open_atomic(manifest_path, encoding='utf-8') as f:
+        json.dump(dict(manifest, version=MANIFEST_VERSION), f, indent=1, sort_keys=True)
+
+def designs_signature(input_filepath, manifest):
+    """
+    (size, mtime_ns, hash) of the designs file. The hash is only recomputed when size or
+    modification time differ from the manifest, so a no-op run does not read the file.
+    """
+    stat = os.stat(input_filepath)
+    recorded = manifest.get('designs')
+    if recorded and recorded[:2] == [stat.st_size, stat.st_mtime_ns]:
+        return recorded
+    return [stat.st_size, stat.st_mtime_ns, file_hash(input_filepath)]
+
+def plugin_inputs(plugin, designs_hash):
+    """Everything a report depends on: designs hash, generator, version, options and data file hashes."""
+    stage_name, generate_report, _ = plugin
+    version, data_files = REPORT_INPUTS.get(stage_name, (1, ()))
+    options = {}
+    if isinstance(generate_report, functools.partial):
+        options = generate_report.keywords
+        generate_report = generate_report.func
+    return {
+        'designs': designs_hash,
+        'generator': f"{generate_report.__module__}.{generate_report.__qualname__}",
+        'version': version,
+        'options': repr(sorted(options.items())),
+        'data_files': {os.path.basename(path): file_hash(path) for path in data_files},
+    }
+
+def _file_signature(path):
+    """[size, mtime_ns] of a file, None if it is missing."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+def output_signature(plugin):
+    """
+    {path: [size, mtime_ns] or None} for every file a report wrote: the output file and its
+    side outputs (see REPORT_SIDE_OUTPUTS), or every file inside an output directory.
+    """
+    stage_name, _, output_filepath = plugin
+    if os.path.isdir(output_filepath):
+        paths = sorted(entry.path for entry in os.scandir(output_filepath) if entry.is_file())
+    else:
+        directory = os.path.dirname(output_filepath)
+        paths = [output_filepath] + [os.path.join(directory, name) for name in REPORT_SIDE_OUTPUTS.get(stage_name, ())]
+    return {path: _file_signature(path) for path in paths}
+
+def outdated_plugins(plugins, manifest, inputs):
+    """
+    The plugins whose recorded inputs differ from `inputs` or of which an output file was
+    deleted, added or modified since it was written. An output the report did not write
+    (e.g. because there was no data) is recorded as None and stays current while it is missing.
+    """
+    reports = manifest.get('reports', {})
+    outdated = []
+    for plugin in plugins:
+        output_key = os.path.abspath(plugin[2])
+        recorded = reports.get(output_key)
+        if (recorded is None or recorded['inputs'] != inputs[output_key]
+                or recorded['output'] != output_signature(plugin)):
+            outdated.append(plugin)
+    return outdated
 
-def execute_script(relative_path):
+def run_reports(input_filepath, plugins=REPORT_PLUGINS, jobs=1, use_cache=True, force=False):
     """
-    Executes another Python script using a relative path.
+    Parses the designs file once and passes the parsed empires to every report plugin
+    whose inputs changed since the last run (see `<file>.manifest`). When every report
+    is up to date, the designs file is not parsed at all.
 
     Args:
-        relative_path (str): The relative path to the Python script to execute.
+        input_filepath (str): Path to the empire designs file.
+        plugins (list): Report plugins as (stage name, generator, output file) tuples.
+        jobs (int): Number of worker processes for the report stage. 1 runs sequentially.
+        use_cache (bool): Reuse parsed empire blocks from the cache next to the designs file.
+        force (bool): Rebuild every report regardless of the manifest.
+
+    Returns:
+        tuple: (timings, reports_wall_clock, failed) where timings is a list of (stage name, seconds)
+               tuples starting with the parse stage, reports_wall_clock is the elapsed time of the
+               whole report stage and failed is the set of stage names whose generator raised an
+               exception. Skipped reports have no timing entry.
     """
-    try:
-        # Construct the absolute path to the script
-        script_path = os.path.abspath(relative_path)
+    manifest_path = manifest_path_for(input_filepath)
+    manifest = read_manifest(manifest_path)
+    designs = designs_signature(input_filepath, manifest)
+    inputs = {os.path.abspath(plugin[2]): plugin_inputs(plugin, designs[2]) for plugin in plugins}
+    outdated = list(plugins) if force else outdated_plugins(plugins, manifest, inputs)
+    if not outdated:
+        if manifest.get('designs') != designs:
+            # Only the modification time changed (e.g. touch); remember it to skip hashing next time
+            manifest['designs'] = designs
+            write_manifest(manifest_path, manifest)
+        print(f"All {len(plugins)} reports are up to date (use --force to rebuild them).")
+        return [("parse", 0.0)], 0.0, set()
+    skipped = [plugin[0] for plugin in plugins if plugin not in outdated]
+    if skipped:
+        print(f"Up to date, skipped: {', '.join(skipped)}")
 
-        # Construct the command to run the script using the same Python interpreter
-        command = [sys.executable, script_path]
+    start = time.perf_counter()
+    empires, cache_stats = load_empires_cached(input_filepath, use_cache=use_cache)
+    parse_seconds = time.perf_counter() - start
+    print_load_stats(input_filepath, empires, cache_stats)
 
-        # Execute the command
-        process = subprocess.Popen(command)
+    timings, reports_wall_clock, failed = run_report_plugins(empires, outdated, jobs)
 
-        # Wait for the script to finish
-        process.wait()
+    # Record only reports that were written successfully, so failed ones are retried next time
+    reports = manifest.setdefault('reports', {})
+    for plugin in outdated:
+        if plugin[0] not in failed:
+            output_key = os.path.abspath(plugin[2])
+            reports[output_key] = {'inputs': inputs[output_key], 'output': output_signature(plugin)}
+    manifest['designs'] = designs
+    write_manifest(manifest_path, manifest)
+    return [("parse", parse_seconds)] + timings, reports_wall_clock, failed
 
-        if process.returncode == 0:
-            print(f"Script '{relative_path}' executed successfully.")
-        else:
-            print(f"Script '{relative_path}' failed with return code: {process.returncode}")
+def print_load_stats(input_filepath, empires, cache_stats):
+    print(f"Loaded {len(empires)} empires from '{input_filepath}' "
+          f"({cache_stats['parsed']} parsed, {cache_stats['reused']} from cache, "
+          f"{cache_stats['evicted']} evicted).")
 
-    except FileNotFoundError:
-        print(f"Error: Script not found at '{script_path}'.")
-    except Exception as e:
-        print(f"An error occurred while executing '{relative_path}': {e}")
+def run_report_plugins(empires, plugins=REPORT_PLUGINS, jobs=1):
+    """
+    Passes the parsed empires to every report plugin.
+
+    Returns:
+        tuple: (timings, reports_wall_clock, failed) with one (stage name, seconds) tuple per
+               plugin and the set of stage names whose generator raised an exception.
+    """
+    start = time.perf_counter()
+    if jobs > 1:
+        # Every report writes its own file, so the outputs are identical to a sequential run.
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(empires,)) as executor:
+            results = list(executor.map(_run_plugin, plugins))
+    else:
+        results = [_run_plugin(plugin, empires) for plugin in plugins]
+    timings = [(stage_name, seconds) for stage_name, seconds, _ in results]
+    failed = {stage_name for stage_name, _, succeeded in results if not succeeded}
+    return timings, time.perf_counter() - start, failed
+
+def clean_if_bloated(input_filepath, clean_threshold):
+    """
+    Removes empty lines in place (after copying the file to `<file>.bak`) when their share
+    of all lines exceeds clean_threshold. Returns True if the file was cleaned.
+    """
+    ratio = blank_line_ratio(input_filepath)
+    if ratio <= clean_threshold:
+        return False
+    backup_filepath = input_filepath + ".bak"
+    shutil.copy2(input_filepath, backup_filepath)
+    clean_file_in_place(input_filepath)
+    print(f"{ratio:.1%} of the lines in '{input_filepath}' were empty; removed them "
+          f"(backup: '{backup_filepath}').")
+    return True
+
+def watch_and_update(input_filepath, plugins=REPORT_PLUGINS, jobs=1, clean_threshold=0.5,
+                     debounce=2.0, poll_interval=1.0, use_inotify=True, use_cache=True, force=False):
+    """
+    Runs the reports once and then again whenever the designs file changes, until interrupted.
+    Every update goes through `run_reports`, so the manifest decides which reports are stale
+    and only changed blocks are re-parsed (unless use_cache is False). `force` only applies to
+    the initial run. A failing update is reported by `watch_file` and retried; watching goes on.
+    """
+    def update(force=False):
+        clean_if_bloated(input_filepath, clean_threshold)
+        timings, reports_wall_clock, _ = run_reports(input_filepath, plugins=plugins, jobs=jobs,
+                                                     use_cache=use_cache, force=force)
+        if len(timings) > 1:
+            print_timing_summary(timings, reports_wall_clock)
+
+    update(force)
+    print(f"\nWatching '{input_filepath}' for changes (Ctrl+C to stop)...")
+    try:
+        watch_file(input_filepath, update, debounce, poll_interval, use_inotify)
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+
+def print_timing_summary(timings, reports_wall_clock):
+    """Prints the duration of every stage, the wall-clock total and the report speedup."""
+    print("\nTiming summary:")
+    for stage_name, seconds in timings:
+        print(f"  {stage_name:<14}{seconds * 1000:10.1f} ms")
+    parse_seconds = timings[0][1]
+    report_cpu_seconds = sum(seconds for _, seconds in timings[1:])
+    print(f"  {'total':<14}{(parse_seconds + reports_wall_clock) * 1000:10.1f} ms")
+    if reports_wall_clock > 0:
+        print(f"  Report stage: {reports_wall_clock * 1000:.1f} ms wall-clock for "
+              f"{report_cpu_seconds * 1000:.1f} ms of report work "
+              f"(speedup {report_cpu_seconds / reports_wall_clock:.2f}x)")
 
 if __name__ == "__main__":
-    scripts_to_execute = [
-        "./tooling/empire_list.py",
-        "./tooling/empire_origin_analyser.py",
-        "./tooling/empire_system_analyser.py",
-        "./tooling/species_analyser.py"
-    ]
-
-    for script in scripts_to_execute:
-        execute_script(script)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Regenerates all empire analysis reports from one parse.")
+    parser.add_argument("input", nargs="?", default="user_empire_designs_v3.4.txt",
+                        help="Path to the empire designs file (default: %(default)s)")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Number of worker processes for report generation (default: %(default)s)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Parse every empire block from scratch and leave the parse cache untouched")
+    parser.add_argument("--force", action="store_true",
+                        help="Rebuild every report, even if its inputs are unchanged since the last run")
+    parser.add_argument("--fields", nargs="*", metavar="PATH",
+                        help="Also write generic N;Value;Reiche reports for these field paths "
+                             "(e.g. authority 'civics[]' 'species.trait[]'); without paths the defaults are used")
+    parser.add_argument("--fields-dir", default="field_reports",
+                        help="Output directory of the field reports (default: %(default)s)")
+    parser.add_argument("--sqlite", metavar="PATH",
+                        help="Also export all parsed empires into a SQLite database at PATH")
+    parser.add_argument("--cooccurrence", nargs="?", const="cooccurrence_reports", metavar="DIR",
+                        help="Also write civic/ethic/origin/authority co-occurrence tables as CSV and SQLite "
+                             "into DIR (default: %(const)s)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and re-analyse whenever the designs file changes")
+    parser.add_argument("--debounce", type=float, default=2.0,
+                        help="Seconds without further writes before a change is processed (default: %(default)s)")
+    parser.add_argument("--poll-interval", type=float, default=1.0,
+                        help="Seconds between checks when inotify is not available (default: %(default)s)")
+    parser.add_argument("--no-inotify", action="store_true", help="Always use stat polling in watch mode")
+    parser.add_argument("--clean-threshold", type=float, default=0.5,
+                        help="In watch mode, remove empty lines once they make up more than this share "
+                             "of all lines (default: %(default)s, 1 disables the cleanup)")
+    args = parser.parse_args()
+    # Invalid field paths would otherwise only fail inside the report stage
+    for field_path in args.fields or []:
+        try:
+            compile_field_path(field_path)
+        except ValueError as e:
+            parser.error(f"--fields: {e}")
+
+    plugins = list(REPORT_PLUGINS)
+    if args.fields is not None:
+        # All field paths are indexed in a single pass over the empires
+        plugins.append(("fields", functools.partial(generate_field_reports, paths=args.fields or DEFAULT_FIELD_PATHS),
+                        args.fields_dir))
+    if args.sqlite:
+        plugins.append(("sqlite", export_sqlite, args.sqlite))
+    if args.cooccurrence:
+        plugins.append(("cooccurrence", generate_cooccurrence_reports, args.cooccurrence))
+
+    try:
+        if args.watch:
+            watch_and_update(args.input, plugins, args.jobs, args.clean_threshold, args.debounce,
+                             args.poll_interval, not args.no_inotify, not args.no_cache, args.force)
+        else:
+            timings, reports_wall_clock, failed = run_reports(args.input, plugins=plugins, jobs=args.jobs,
+                                                              use_cache=not args.no_cache, force=args.force)
+            if len(timings) > 1:
+                print_timing_summary(timings, reports_wall_clock)
+            if failed:
+                print(f"Failed reports: {', '.join(sorted(failed))}")
+                sys.exit(1)
+    except FileNotFoundError as e:
+        print(f"Error: File '{e.filename}' not found.")
+        sys.exit(1)
+    except Exception as e:
+        print(f"An error occurred while reading '{args.input}': {e}")
+        sys.exit(1)